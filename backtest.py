@@ -0,0 +1,129 @@
+import time
+import numpy as np
+import pandas as pd
+from metrics import error
+from resampler import backfill_interval, read_interval_range
+from scan_engine import DEFAULT_PARAMS, rolling_signals
+from yf_provider import get_history_arrays
+
+# --- Backtest Engine ---
+# Replays the live scanner rules on stored klines. Signals for every bar come from one vectorized
+# pass; the only Python loop is over trades taken. Like process_auto_trades, a coin holds at most
+# one open trade and enters at the signal bar's close. Exits are found with vectorized high/low
+# scans of the following bars. When a bar touches both SL and target, the SL is assumed hit
+# first. A gap through the SL fills at the bar open. Like the live scanner, only base bars are
+# stored: 4h, 1d and the other derived intervals are resampled from their base range.
+STRATEGY_BREAKOUT = "MDF + Donchian Breakout"
+STRATEGY_REVERSAL = "3-Day Candle Reversal"
+DEFAULT_FEE_PCT = 0.1
+DEFAULT_POSITION_PCT = 10.0
+EXIT_SEARCH_WINDOW = 512
+YF_INTERVALS = {"1m": "1m", "5m": "5m", "15m": "15m", "30m": "30m", "1h": "1h", "1d": "1d"}
+YF_PERIODS = [(5, "5d"), (30, "1mo"), (90, "3mo"), (180, "6mo"), (365, "1y"), (730, "2y"), (1825, "5y")]
+
+def load_history(symbol, interval, days):
+    start_ms = int((time.time() - days * 86400) * 1000)
+    try: backfill_interval(symbol, interval, start_ms)
+    except: error("backtest.backfill")
+    return read_interval_range(symbol, interval, start_ms)
+
+def load_yf_history(symbols, interval, days):
+    # Coins without Binance history, all in one batched yfinance download (yfinance caps intraday depth).
+    yf_int = YF_INTERVALS.get(interval)
+    if yf_int is None or not symbols: return {}
+    period = next((p for d, p in YF_PERIODS if d >= days), YF_PERIODS[-1][1])
+    start_ms = (time.time() - days * 86400) * 1000
+    tickers = {s.replace('USDT', '-USD'): s for s in symbols}
+    out = {}
+    for ticker, arr in get_history_arrays(list(tickers), period, yf_int).items():
+        arr = arr[arr[:, 0] >= start_ms]
+        if len(arr): out[tickers[ticker]] = {'Open time': arr[:, 0].astype('int64'), 'Open': arr[:, 1], 'High': arr[:, 2], 'Low': arr[:, 3], 'Close': arr[:, 4], 'Volume': arr[:, 5]}
+    return out
+
+def _find_exit(o, h, l, start, is_buy, sl, target):
+    lo, n = start, len(h)
+    while lo < n:
+        hi = min(n, lo + EXIT_SEARCH_WINDOW)
+        hit_sl = l[lo:hi] <= sl if is_buy else h[lo:hi] >= sl
+        hit_tp = h[lo:hi] >= target if is_buy else l[lo:hi] <= target
+        hit = hit_sl | hit_tp
+        if hit.any():
+            k = int(np.argmax(hit))
+            if hit_sl[k]: return lo + k, "🛑 SL HIT", (min(o[lo + k], sl) if is_buy else max(o[lo + k], sl))
+            return lo + k, "🎯 TARGET HIT", target
+        lo = hi
+    return None, None, None
+
+def simulate_breakout(data, symbol, params=None, fee_pct=DEFAULT_FEE_PCT):
+    p = {**DEFAULT_PARAMS, **(params or {})}
+    o, h, l, c, t = data['Open'], data['High'], data['Low'], data['Close'], data['Open time']
+    if len(c) <= max(p["donchian"], p["sl_lookback"], p["rsi_len"]) + 1: return []
+    sig = rolling_signals(h, l, c, p["donchian"], p["sl_lookback"], p["rsi_len"], p["reward"])
+    entries = np.flatnonzero(sig["Buy"] | sig["Short"])
+
+    trades, k = [], 0
+    while k < len(entries):
+        i = entries[k]
+        is_buy = bool(sig["Buy"][i])
+        sl, target, entry = sig["SL"][i], sig["Target"][i], c[i]
+        j, reason, exit_price = _find_exit(o, h, l, i + 1, is_buy, sl, target)
+        if j is None: j, reason, exit_price = len(c) - 1, "⏳ OPEN (MTM)", c[-1]
+        gross = ((exit_price - entry) / entry) * 100 if is_buy else ((entry - exit_price) / entry) * 100
+        trades.append({"Stock": symbol, "Signal": "BUY" if is_buy else "SHORT", "entry_ms": int(t[i]), "exit_ms": int(t[j]), "Entry": float(entry), "Exit": float(exit_price),
+                       "SL": float(sl), "Target": float(target), "Status": reason, "Bars": int(j - i), "P&L %": float(gross - 2 * fee_pct)})
+        # Same rule as the live book: the coin is blocked until the bar after the exit.
+        k = int(np.searchsorted(entries, j + 1))
+    return trades
+
+def simulate_reversal(data, symbol, params=None, fee_pct=DEFAULT_FEE_PCT):
+    o, c, t = data['Open'], data['Close'], data['Open time']
+    if len(c) <= 3: return []
+    green, red = c > o, c < o
+    three_green = green[2:-1] & green[1:-2] & green[:-3]
+    three_red = red[2:-1] & red[1:-2] & red[:-3]
+    idx = np.flatnonzero((three_green | three_red) & (o[3:] > 0)) + 3
+    is_short = three_green[idx - 3]
+    gross = np.where(is_short, (o[idx] - c[idx]) / o[idx], (c[idx] - o[idx]) / o[idx]) * 100
+    return [{"Stock": symbol, "Signal": "SHORT" if s else "BUY", "entry_ms": int(t[i]), "exit_ms": int(t[i]), "Entry": float(o[i]), "Exit": float(c[i]),
+             "SL": np.nan, "Target": np.nan, "Status": "3 Days GREEN" if s else "3 Days RED", "Bars": 0, "P&L %": float(g - 2 * fee_pct)}
+            for i, s, g in zip(idx, is_short, gross)]
+
+STRATEGIES = {STRATEGY_BREAKOUT: simulate_breakout, STRATEGY_REVERSAL: simulate_reversal}
+
+def summarize(trades, position_pct=DEFAULT_POSITION_PCT, capital=1000.0):
+    df = pd.DataFrame(trades)
+    if df.empty: return df, {}, pd.DataFrame()
+    df = df.sort_values(["exit_ms", "entry_ms"], kind="stable").reset_index(drop=True)
+    for col in ("entry_ms", "exit_ms"):
+        df[col.replace("_ms", " Time")] = pd.to_datetime(df[col], unit="ms", utc=True).dt.tz_convert("Asia/Kolkata").dt.strftime("%Y-%m-%d %H:%M")
+
+    pnl = df["P&L %"].to_numpy()
+    equity = capital * np.cumprod(1 + (pnl / 100) * (position_pct / 100))
+    peak = np.maximum.accumulate(np.concatenate([[capital], equity]))[1:]
+    drawdown = (equity / peak - 1) * 100
+    wins, losses = pnl[pnl > 0], pnl[pnl <= 0]
+    stats = {
+        "Total Trades": len(df), "Win Rate %": round(len(wins) / len(df) * 100, 2), "Total P&L %": round(float(pnl.sum()), 2),
+        "Equity Return %": round(float(equity[-1] / capital - 1) * 100, 2), "Max Drawdown %": round(float(drawdown.min()), 2),
+        "Avg Win %": round(float(wins.mean()), 2) if len(wins) else 0.0, "Avg Loss %": round(float(losses.mean()), 2) if len(losses) else 0.0,
+        "Profit Factor": round(float(wins.sum() / abs(losses.sum())), 2) if losses.sum() < 0 else float("inf"), "Avg Bars Held": round(float(df["Bars"].mean()), 1),
+    }
+    curve = pd.DataFrame({"Equity": equity, "Drawdown %": drawdown}, index=pd.to_datetime(df["exit_ms"], unit="ms", utc=True).dt.tz_convert("Asia/Kolkata"))
+    return df.drop(columns=["entry_ms", "exit_ms"]), stats, curve
+
+def per_symbol_stats(trades_df):
+    if trades_df.empty: return trades_df
+    g = trades_df.groupby("Stock")["P&L %"]
+    return pd.DataFrame({"Trades": g.size(), "Win Rate %": g.apply(lambda x: round((x > 0).mean() * 100, 2)), "Total P&L %": g.sum().round(2), "Best %": g.max().round(2), "Worst %": g.min().round(2)}).sort_values("Total P&L %", ascending=False)
+
+def run_backtest(symbols, interval="15m", days=30, strategy=STRATEGY_BREAKOUT, params=None, fee_pct=DEFAULT_FEE_PCT, position_pct=DEFAULT_POSITION_PCT):
+    simulate, trades, missing = STRATEGIES[strategy], [], []
+    for symbol in symbols:
+        data = load_history(symbol, interval, days)
+        if len(data['Close']) == 0: missing.append(symbol)
+        else: trades += simulate(data, symbol, params, fee_pct)
+    for symbol, data in load_yf_history(missing, interval, days).items():
+        trades += simulate(data, symbol, params, fee_pct)
+        missing.remove(symbol)
+    trades_df, stats, curve = summarize(trades, position_pct)
+    return trades_df, stats, curve, missing
@@ -0,0 +1,84 @@
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# --- Benchmark Fixtures ---
+# A fixture is one gzip JSON file of exchange answers: 1m and 1h klines for a set of template
+# symbols plus one Binance and one CoinDCX ticker row to copy the payload layout from.
+# `python benchmarks/fixtures.py record` captures it from the live APIs; `synth` writes a
+# deterministic stand-in with the same layout for machines without network access. The stub
+# server replays a fixture for any universe size by cycling the template symbols.
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+DEFAULT_FIXTURE = os.path.join(FIXTURE_DIR, "market.json.gz")
+TEMPLATE_SYMBOLS = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "XRPUSDT", "ADAUSDT", "DOGEUSDT", "AVAXUSDT",
+                    "DOTUSDT", "LINKUSDT", "TRXUSDT", "LTCUSDT", "BCHUSDT", "NEARUSDT", "UNIUSDT", "ATOMUSDT"]
+FIXTURE_INTERVALS = {"1m": 60_000, "1h": 3_600_000}
+TEMPLATE_BARS = 1000
+
+def save(fixture, path=DEFAULT_FIXTURE):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with gzip.open(path, "wt") as f: json.dump(fixture, f)
+    return path
+
+def load(path=DEFAULT_FIXTURE):
+    with gzip.open(path, "rt") as f: return json.load(f)
+
+def record(path=DEFAULT_FIXTURE, symbols=TEMPLATE_SYMBOLS, bars=TEMPLATE_BARS):
+    from candle_store import BINANCE_KLINES_URL
+    from market_client import BINANCE_API_URL, COINDCX_API_URL, fetch_json, fetch_json_many
+    klines = {}
+    for interval in FIXTURE_INTERVALS:
+        answers = fetch_json_many([(BINANCE_KLINES_URL, {"symbol": s, "interval": interval, "limit": bars}) for s in symbols])
+        for sym, rows in zip(symbols, answers):
+            if isinstance(rows, list) and rows: klines.setdefault(sym, {})[interval] = [[float(x) for x in r[:7]] for r in rows]
+    klines = {sym: ivs for sym, ivs in klines.items() if len(ivs) == len(FIXTURE_INTERVALS)}
+    if not klines: raise SystemExit("No klines recorded (is api.binance.com reachable?)")
+    binance = fetch_json(f"{BINANCE_API_URL}/api/v3/ticker/24hr") or []
+    coindcx = fetch_json(f"{COINDCX_API_URL}/exchange/ticker") or []
+    return save({
+        "source": "recorded", "recorded_at": int(time.time() * 1000), "klines": klines,
+        "binance_ticker": next((t for t in binance if str(t.get("symbol", "")).endswith("USDT")), _synth_tickers()[0]),
+        "coindcx_ticker": next((t for t in coindcx if str(t.get("market", "")).endswith("USDT")), _synth_tickers()[1]),
+    }, path)
+
+def _synth_tickers():
+    binance = {"symbol": "", "priceChange": "0", "priceChangePercent": "0", "weightedAvgPrice": "0", "prevClosePrice": "0", "lastPrice": "0",
+               "lastQty": "0", "bidPrice": "0", "bidQty": "0", "askPrice": "0", "askQty": "0", "openPrice": "0", "highPrice": "0", "lowPrice": "0",
+               "volume": "0", "quoteVolume": "0", "openTime": 0, "closeTime": 0, "firstId": 0, "lastId": 0, "count": 0}
+    coindcx = {"market": "", "change_24_hour": "0", "high": "0", "low": "0", "volume": "0", "last_price": "0", "bid": "0", "ask": "0", "timestamp": 0}
+    return binance, coindcx
+
+def _synth_series(rng, price, step, bars, vol):
+    close = price * np.exp(np.cumsum(rng.normal(0, vol, bars)))
+    open_ = np.r_[price, close[:-1]]
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, vol / 2, bars)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, vol / 2, bars)))
+    volume = rng.lognormal(3, 1, bars)
+    open_time = (int(time.time() * 1000) // step - bars + 1) * step + np.arange(bars) * step
+    return np.column_stack([open_time, open_, high, low, close, volume, open_time + step - 1]).tolist()
+
+def synth(path=DEFAULT_FIXTURE, symbols=TEMPLATE_SYMBOLS, bars=TEMPLATE_BARS, seed=7):
+    rng = np.random.default_rng(seed)
+    klines = {}
+    for sym in symbols:
+        price = float(10 ** rng.uniform(-1, 4.5))
+        klines[sym] = {"1m": _synth_series(rng, price, FIXTURE_INTERVALS["1m"], bars, 0.001), "1h": _synth_series(rng, price, FIXTURE_INTERVALS["1h"], bars, 0.008)}
+    binance, coindcx = _synth_tickers()
+    return save({"source": "synthetic", "recorded_at": int(time.time() * 1000), "klines": klines, "binance_ticker": binance, "coindcx_ticker": coindcx}, path)
+
+def ensure(path=DEFAULT_FIXTURE):
+    return path if os.path.exists(path) else synth(path)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Record or synthesize benchmark market fixtures.")
+    ap.add_argument("mode", choices=["record", "synth"])
+    ap.add_argument("--path", default=DEFAULT_FIXTURE)
+    ap.add_argument("--bars", type=int, default=TEMPLATE_BARS)
+    args = ap.parse_args()
+    print((record if args.mode == "record" else synth)(args.path, bars=args.bars))
@@ -0,0 +1,111 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+# --- Cold Start Benchmark ---
+#     python benchmarks/import_time.py [--repeat 5] [--app app.py] [--no-script]
+# Import time: each target is imported in a fresh interpreter (streamlit already loaded, as it is
+# in the server), so the figure is what a first visit to that page costs the process. The heaviest
+# modules behind each target come from `python -X importtime`. Script time: the app is run in
+# Streamlit's AppTest, in a fresh process per page, timing the first (cold) run and a rerun
+# against empty temporary stores. Pass --app to measure another checkout of app.py.
+TARGETS = {
+    "entry": ["views", "views.common", "views.theme", "metrics", "shared_cache", "trade_store"],
+    "terminal": ["views.terminal"],
+    "risk": ["views.risk"],
+    "backtest": ["views.backtest"],
+    "settings": ["views.settings"],
+    "yfinance": ["yfinance"],
+}
+SCRIPT_PAGES = ["📈 MAIN TERMINAL", "🧮 Futures Risk Calculator", "📊 Backtest Engine", "⚙️ Scanner Settings"]
+REPEAT = 5
+TOP_MODULES = 5
+
+IMPORT_PROBE = "import sys, time; import streamlit; t = time.perf_counter()\nfor m in sys.argv[1:]: __import__(m)\nprint(time.perf_counter() - t)"
+
+SCRIPT_PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+app, page = sys.argv[1], sys.argv[2]
+t = time.perf_counter()
+at = AppTest.from_file(app, default_timeout=600)
+at.session_state["page_select"] = page
+at.run()
+# Checkouts without the keyed menu open on the terminal first; their cold time includes it.
+if page != at.sidebar.radio[0].value: at.sidebar.radio[0].set_value(page).run()
+cold = time.perf_counter() - t
+t = time.perf_counter()
+at.run()
+print(json.dumps({"cold_s": cold, "rerun_s": time.perf_counter() - t, "errors": len(at.exception)}))
+"""
+
+def _import_seconds(modules, cwd):
+    out = subprocess.run([sys.executable, "-c", IMPORT_PROBE, *modules], cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+def _heaviest(modules, cwd):
+    # -X importtime lines are "import time: self | cumulative | name", children indented under their
+    # parent. Only what the targets pulled in after streamlit counts, one level below each target.
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", "import streamlit, sys\nfor m in sys.argv[1:]: __import__(m)", *modules],
+                         cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+    rows, after = [], False
+    for line in err.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit(): continue
+        name = parts[2][1:].rstrip()
+        if name == "streamlit":
+            after = True
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        if after and depth <= 1 and name.strip() not in modules: rows.append((int(parts[1]) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:TOP_MODULES]
+
+def measure_imports(cwd, repeat):
+    out = {}
+    for name, modules in TARGETS.items():
+        runs = [_import_seconds(modules, cwd) for _ in range(repeat)]
+        out[name] = {"median_ms": round(statistics.median(runs) * 1000, 1), "best_ms": round(min(runs) * 1000, 1), "heaviest": _heaviest(modules, cwd)}
+    return out
+
+def measure_script(app, repeat):
+    out = {}
+    for page in SCRIPT_PAGES:
+        runs = []
+        for _ in range(repeat):
+            tmp = tempfile.mkdtemp(prefix="crypto-cold-")
+            try:
+                env = {**os.environ, "CANDLE_DB_FILE": os.path.join(tmp, "c.db"), "TRADE_DB_FILE": os.path.join(tmp, "t.db"), "YF_CACHE_FILE": os.path.join(tmp, "y.db"),
+                       "RESULTS_DB_FILE": os.path.join(tmp, "r.db"), "PYTHONPATH": os.path.dirname(os.path.abspath(app))}
+                res = subprocess.run([sys.executable, "-c", SCRIPT_PROBE, os.path.abspath(app), page], cwd=tmp, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+                runs.append(json.loads(res.stdout.strip().splitlines()[-1]))
+            finally: shutil.rmtree(tmp, ignore_errors=True)
+        out[page] = {"cold_ms": round(statistics.median(r["cold_s"] for r in runs) * 1000, 1), "rerun_ms": round(statistics.median(r["rerun_s"] for r in runs) * 1000, 1),
+                     "errors": max(r["errors"] for r in runs)}
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description="Measure import and first-run cost of the dashboard pages.")
+    ap.add_argument("--repeat", type=int, default=REPEAT)
+    ap.add_argument("--app", default=os.path.join(REPO_DIR, "app.py"))
+    ap.add_argument("--no-imports", action="store_true")
+    ap.add_argument("--no-script", action="store_true")
+    args = ap.parse_args()
+    if not args.no_imports:
+        print(f"{'import target':<14}{'median ms':>11}{'best ms':>10}  heaviest (cumulative ms)")
+        for name, r in measure_imports(os.path.dirname(os.path.abspath(args.app)), args.repeat).items():
+            print(f"{name:<14}{r['median_ms']:>11}{r['best_ms']:>10}  " + ", ".join(f"{m} {ms:.0f}" for ms, m in r["heaviest"]))
+    if not args.no_script:
+        print(f"\n{'page':<30}{'cold ms':>10}{'rerun ms':>10}{'errors':>8}")
+        for page, r in measure_script(args.app, max(1, args.repeat // 2)).items():
+            print(f"{page:<30}{r['cold_ms']:>10}{r['rerun_ms']:>10}{r['errors']:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import argparse
+import hashlib
+import hmac
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- Mock Order Exchange ---
+# A local stand-in for the CoinDCX order endpoints (/exchange/v1/orders/create, /status, /cancel)
+# that checks the API key and HMAC signature the way the exchange does and matches orders against
+# a price per market. Market orders and marketable limits fill on arrival, resting limits fill when
+# POST /mock/price moves the price through them; a repeated client_order_id is rejected like the
+# real one. GET /mock/orders lists the book. Point the dashboard at it with COINDCX_TRADE_URL and
+# the same DCX_KEY / DCX_SECRET in the Streamlit secrets.
+DEFAULT_PORT = 8766
+DEFAULT_KEY, DEFAULT_SECRET = "mock-key", "mock-secret"
+FEE_PCT = 0.1
+
+class MockExchange:
+    def __init__(self, key=DEFAULT_KEY, secret=DEFAULT_SECRET, prices=None):
+        self.key, self.secret = key, secret.encode()
+        self.prices = dict(prices or {})
+        self.orders = {}
+        self.by_client_id = {}
+        self.lock = threading.Lock()
+
+    def verify(self, key, signature, body):
+        return key == self.key and hmac.compare_digest(hmac.new(self.secret, body, hashlib.sha256).hexdigest(), signature or "")
+
+    def _fill(self, o, price):
+        qty = o["remaining_quantity"]
+        o.update(status="filled", remaining_quantity=0.0, avg_price=price, fee_amount=round(qty * price * FEE_PCT / 100, 8), updated_at=int(time.time() * 1000))
+
+    def _match(self, o):
+        price = self.prices.get(o["market"])
+        if o["status"] not in ("open", "partially_filled"): return
+        if o["order_type"] == "market_order": return self._fill(o, price or o["price_per_unit"])
+        if price is None: return
+        if (o["side"] == "buy" and price <= o["price_per_unit"]) or (o["side"] == "sell" and price >= o["price_per_unit"]): self._fill(o, o["price_per_unit"])
+
+    def create(self, body):
+        for field in ("side", "order_type", "market", "total_quantity"):
+            if field not in body: return 400, {"code": 400, "message": f"{field} is missing"}
+        if body["order_type"] not in ("market_order", "limit_order"): return 400, {"code": 400, "message": "Invalid order type"}
+        if body["order_type"] == "limit_order" and not float(body.get("price_per_unit") or 0) > 0: return 400, {"code": 400, "message": "Price is required"}
+        coid = body.get("client_order_id")
+        with self.lock:
+            if coid and coid in self.by_client_id: return 400, {"code": 400, "message": "Duplicate client order id"}
+            now = int(time.time() * 1000)
+            o = {"id": str(uuid.uuid4()), "client_order_id": coid, "market": body["market"], "order_type": body["order_type"], "side": body["side"], "status": "open",
+                 "fee_amount": 0.0, "total_quantity": float(body["total_quantity"]), "remaining_quantity": float(body["total_quantity"]), "avg_price": 0.0,
+                 "price_per_unit": float(body.get("price_per_unit") or 0), "created_at": now, "updated_at": now}
+            self.orders[o["id"]] = o
+            if coid: self.by_client_id[coid] = o
+            self._match(o)
+            return 200, {"orders": [dict(o)]}
+
+    def _find(self, body):
+        return self.orders.get(body.get("id")) or self.by_client_id.get(body.get("client_order_id"))
+
+    def status(self, body):
+        with self.lock:
+            o = self._find(body)
+            return (200, dict(o)) if o else (404, {"code": 404, "message": "Order not found"})
+
+    def cancel(self, body):
+        with self.lock:
+            o = self._find(body)
+            if o is None: return 404, {"code": 404, "message": "Order not found"}
+            if o["status"] in ("open", "partially_filled"): o.update(status="cancelled", updated_at=int(time.time() * 1000))
+            return 200, {"code": 200, "message": "success", "status": 200}
+
+    def set_price(self, market, price):
+        with self.lock:
+            self.prices[market] = float(price)
+            for o in self.orders.values():
+                if o["market"] == market: self._match(o)
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in two writes; without TCP_NODELAY each answer waits on a delayed ACK.
+    disable_nagle_algorithm = True
+    exchange = None
+    latency = 0.0
+
+    def log_message(self, *args): pass
+
+    def _send(self, status, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD": self.wfile.write(body)
+
+    def do_HEAD(self):
+        self._send(200)
+
+    def do_GET(self):
+        if self.path == "/mock/orders":
+            with self.exchange.lock: return self._send(200, list(self.exchange.orders.values()))
+        self._send(404, {"code": 404, "message": "Not mocked"})
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+        if self.latency: time.sleep(self.latency)
+        try: body = json.loads(raw or b"{}")
+        except ValueError: return self._send(400, {"code": 400, "message": "Invalid JSON"})
+        ex = self.exchange
+        if self.path == "/mock/price":
+            ex.set_price(body["market"], body["price"])
+            return self._send(200, {"market": body["market"], "price": float(body["price"])})
+        if not self.path.startswith("/exchange/v1/orders/"): return self._send(404, {"code": 404, "message": "Not mocked"})
+        if not ex.verify(self.headers.get("X-AUTH-APIKEY"), self.headers.get("X-AUTH-SIGNATURE"), raw): return self._send(401, {"code": 401, "message": "Invalid credentials"})
+        action = {"create": ex.create, "status": ex.status, "cancel": ex.cancel}.get(self.path.rsplit("/", 1)[-1])
+        if action is None: return self._send(404, {"code": 404, "message": "Not mocked"})
+        self._send(*action(body))
+
+def serve(exchange, port=DEFAULT_PORT, latency_ms=0.0):
+    handler = type("Handler", (MockHandler,), {"exchange": exchange, "latency": latency_ms / 1000.0})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    return server
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Serve a mock CoinDCX order API for local order round trips.")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--key", default=DEFAULT_KEY)
+    ap.add_argument("--secret", default=DEFAULT_SECRET)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    args = ap.parse_args()
+    server = serve(MockExchange(args.key, args.secret), args.port, args.latency_ms)
+    print(f"READY http://127.0.0.1:{server.server_address[1]}", flush=True)
+    server.serve_forever()
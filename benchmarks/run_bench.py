@@ -0,0 +1,242 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+from fixtures import DEFAULT_FIXTURE, ensure
+
+# --- Scanner Benchmarks ---
+# Times every scan stage against the stub exchange at several universe sizes:
+#     python benchmarks/run_bench.py [--sizes 16,200,2000] [--repeat 3] [--latency-ms 0] [--straggler-ms 0] [--stages scan,mdf_full]
+# Each size runs in a fresh child process with empty stores, so cold stages (first sync, backfill,
+# fallback download) are timed once and warm stages are repeated; warm stages also get one
+# tracemalloc pass for their peak allocation. Every run is appended to benchmarks/history.jsonl
+# and printed next to the previous run, so a regression shows up as a delta. scan_first and
+# scan_stream refetch every coin: the first is the time to the first streamed batch, the second
+# the whole stream, which a --straggler-ms coin stretches to SCAN_DEADLINE at most.
+SIZES = [16, 200, 2000]
+REPEAT = 3
+SCAN_INTERVAL = "15m"
+UNIVERSE_INTERVAL = "1h"
+SWITCH_INTERVALS = ["3m", "5m", "30m"]
+BACKTEST_DAYS = 2
+SECTOR_SIZE = 8
+HISTORY_FILE = os.path.join(BENCH_DIR, "history.jsonl")
+YF_PERIOD_DAYS = {"1d": 1, "5d": 5, "1mo": 30, "3mo": 90, "6mo": 180, "1y": 365, "2y": 730, "5y": 1825}
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _stub_requests(url):
+    with urllib.request.urlopen(f"{url}/stats", timeout=5) as res: return sum(json.load(res).values())
+
+def _patch_yfinance(market):
+    # yfinance has no configurable endpoint: its downloads are answered from the same fixture in-process.
+    import yf_provider
+    def download(tickers, period, interval):
+        now = int(time.time() * 1000)
+        start = now - YF_PERIOD_DAYS.get(period, 5) * 86_400_000
+        interval = "1h" if interval == "60m" else interval
+        out = {}
+        for t in tickers:
+            sym = t.replace('-USD', 'USDT')
+            out[t] = market.bars(sym, interval, start, now)[:, :6] if sym in market.template else yf_provider.np.empty((0, len(yf_provider.YF_COLUMNS)))
+        return out
+    yf_provider._download = download
+
+def build_stages(symbols, coins):
+    import numpy as np
+    from backtest import STRATEGY_BREAKOUT, run_backtest
+    from breadth import BreadthIndex
+    from market_snapshot import MarketSnapshot, calc_sector_perf, fetch_ticker_dict, fetch_yf_quotes
+    from mdf_state import calculate_mdf_physics, mdf_physics
+    from portfolio_risk import PortfolioBook, size_signals
+    from resampler import read_interval, read_interval_batch, sync_interval
+    from scan_engine import batch_signals
+    from scan_worker import UniverseScan, crypto_trends, filter_signals, scan_signals, scan_signals_stream
+    from universe import prefilter, tradable_markets, universe_tickers
+
+    ctx = {}
+    sectors = {f"S{i // SECTOR_SIZE}": coins[i:i + SECTOR_SIZE] for i in range(0, len(coins), SECTOR_SIZE)}
+    def tickers(): ctx["tickers"] = fetch_ticker_dict()
+    def snapshot(): ctx["snapshot"] = MarketSnapshot.build(ctx["tickers"])
+    def scan_compute():
+        kept, arrays = read_interval_batch(symbols, SCAN_INTERVAL, bars=100, min_bars=50)
+        return batch_signals([s[:-4] + '-USD' for s in kept], arrays, "BOTH")
+    def tf_switch():
+        for interval in SWITCH_INTERVALS: read_interval_batch(symbols, interval, bars=100, min_bars=50)
+    def universe_pass():
+        # A whole pass with the filters off, so every symbol is synced and scanned in shards.
+        scan = UniverseScan(UNIVERSE_INTERVAL)
+        scan.min_quote_volume = scan.min_move_pct = 0.0
+        scan.plan(universe_tickers(ctx.get("tickers")), time.time())
+        while scan.running: scan.step(time.time())
+        ctx["universe"] = scan.result()
+    def scan_first():
+        # Stopping after the first batch cancels the fetches still in flight.
+        stream = scan_signals_stream(coins, SCAN_INTERVAL, max_age=0)
+        next(stream)
+        stream.close()
+    def risk_book():
+        # One open trade per coin, alternating sides, stops 2% away: the book a full-universe scan could leave running.
+        ltp = [(ctx.get("tickers") or {}).get(c, {}).get("last_price") or 1.0 for c in coins]
+        ctx["trades"] = [{"Stock": c, "Signal": "BUY" if i % 2 else "SHORT", "Entry": p, "SL": p * (0.98 if i % 2 else 1.02), "Target": p * (1.06 if i % 2 else 0.94)}
+                         for i, (c, p) in enumerate(zip(coins, ltp))]
+        ctx["book"] = PortfolioBook(ctx["trades"])
+        ctx["prices"] = np.array(ltp) * 1.001
+    def risk_returns():
+        # Cold stages run even when --stages leaves out the ones they build on.
+        if "book" not in ctx: risk_book()
+        ctx["book"].load_returns()
+    # (name, cold, fn): cold stages run once on empty caches, in this order.
+    return [
+        ("tickers", False, tickers),
+        ("snapshot", False, snapshot),
+        ("breadth", False, lambda: BreadthIndex().update_many(ctx["tickers"])),
+        ("sector_perf", False, lambda: calc_sector_perf(sectors, ctx["snapshot"])),
+        ("sync_cold", True, lambda: sync_interval(symbols, SCAN_INTERVAL, bars=100)),
+        ("sync_warm", False, lambda: sync_interval(symbols, SCAN_INTERVAL, bars=100, max_age=0)),
+        ("scan", False, lambda: filter_signals(scan_signals(coins, SCAN_INTERVAL), coins)),
+        ("scan_compute", False, scan_compute),
+        ("scan_first", False, scan_first),
+        ("scan_stream", False, lambda: list(scan_signals_stream(coins, SCAN_INTERVAL, max_age=0))),
+        ("tf_switch_cold", True, tf_switch),
+        ("tf_switch", False, tf_switch),
+        ("universe_prefilter", False, lambda: prefilter(universe_tickers(ctx.get("tickers")), tradable_markets())),
+        ("universe_cold", True, universe_pass),
+        ("universe", False, universe_pass),
+        ("risk_book", False, risk_book),
+        ("risk_returns_cold", True, risk_returns),
+        ("risk_tick", False, lambda: ctx["book"].evaluate(ctx["prices"])),
+        ("risk_size", False, lambda: size_signals(ctx["trades"], heat=1.0, margin=1.0)),
+        ("mdf_full", False, lambda: [calculate_mdf_physics(read_interval(s, SCAN_INTERVAL, 60)) for s in symbols]),
+        ("mdf_incremental", False, lambda: [mdf_physics(s, SCAN_INTERVAL) for s in symbols]),
+        ("trends_cold", True, lambda: crypto_trends(coins)),
+        ("trends", False, lambda: crypto_trends(coins)),
+        ("backtest_cold", True, lambda: run_backtest(symbols, SCAN_INTERVAL, BACKTEST_DAYS, STRATEGY_BREAKOUT)),
+        ("backtest", False, lambda: run_backtest(symbols, SCAN_INTERVAL, BACKTEST_DAYS, STRATEGY_BREAKOUT)),
+        ("yf_fallback_cold", True, lambda: fetch_yf_quotes(coins)),
+        ("yf_fallback", False, lambda: fetch_yf_quotes(coins)),
+    ]
+
+def measure(fn, cold, repeat, url):
+    runs, before = [], _stub_requests(url)
+    for i in range(1 if cold else repeat):
+        t = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - t)
+        if i == 0: requests = _stub_requests(url) - before
+    out = {"runs": len(runs), "median_s": statistics.median(runs), "best_s": min(runs), "requests": requests}
+    if not cold:
+        tracemalloc.start()
+        fn()
+        out["peak_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+    return out
+
+def run_child(n, url, fixture, repeat, only):
+    from fixtures import load
+    from stub_server import FixtureMarket
+    import rate_limiter
+    # The stub is not the exchange: lift the weight budget so the limiter does not dominate the timings.
+    rate_limiter.WEIGHT_LIMITS[url.split("//", 1)[1]] = 10 ** 9
+    market = FixtureMarket(load(fixture), n)
+    _patch_yfinance(market)
+    symbols = market.symbols
+    coins = [s[:-4] + '-USD' for s in symbols]
+    results = {}
+    for name, cold, fn in build_stages(symbols, coins):
+        if only and name not in only and not cold: continue
+        stats = measure(fn, cold, repeat, url)
+        if not only or name in only: results[name] = stats
+    results["_process"] = {"max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+    return results
+
+def run_size(n, fixture, repeat, latency_ms, straggler_ms, only):
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    stub = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, "stub_server.py"), "--fixture", fixture, "--symbols", str(n), "--port", str(port), "--latency-ms", str(latency_ms),
+                             "--straggler-ms", str(straggler_ms)],
+                            stdout=subprocess.PIPE, text=True)
+    tmp = tempfile.mkdtemp(prefix="crypto-bench-")
+    try:
+        stub.stdout.readline()
+        env = {**os.environ, "BINANCE_API_URL": url, "COINDCX_API_URL": url, "CANDLE_DB_FILE": os.path.join(tmp, "candles.db"),
+               "TRADE_DB_FILE": os.path.join(tmp, "trades.db"), "YF_CACHE_FILE": os.path.join(tmp, "yf.db"), "RESULTS_DB_FILE": os.path.join(tmp, "results.db")}
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", str(n), "--url", url, "--fixture", fixture, "--repeat", str(repeat)]
+        if only: cmd += ["--stages", ",".join(only)]
+        out = subprocess.run(cmd, env=env, cwd=tmp, stdout=subprocess.PIPE, check=True, text=True).stdout
+        return json.loads(out.strip().splitlines()[-1])
+    finally:
+        stub.terminate()
+        stub.wait()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def _commit():
+    try: return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout.strip()
+    except: return ""
+
+def _previous(history_file, sizes):
+    try:
+        with open(history_file) as f: runs = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError: return None
+    return next((r for r in reversed(runs) if set(map(str, sizes)) & set(r["results"])), None)
+
+def report(record, previous):
+    print(f"commit {record['commit'] or '-'}  python {record['python']}  latency {record['latency_ms']}ms  straggler {record.get('straggler_ms', 0.0)}ms  repeat {record['repeat']}")
+    for n, stages in record["results"].items():
+        proc = stages.get("_process", {})
+        print(f"\n== {n} symbols (max RSS {proc.get('max_rss_mb', '-')} MB) ==")
+        print(f"{'stage':<18}{'median ms':>11}{'best ms':>10}{'us/sym':>10}{'sym/s':>10}{'peak KB':>10}{'reqs':>7}{'vs last':>9}")
+        old = (previous or {}).get("results", {}).get(n, {})
+        for name, s in stages.items():
+            if name.startswith("_"): continue
+            per_sym = s["median_s"] / int(n)
+            delta = f"{(s['median_s'] / old[name]['median_s'] - 1) * 100:+.0f}%" if name in old and old[name]["median_s"] > 0 else ""
+            print(f"{name:<18}{s['median_s'] * 1000:>11.2f}{s['best_s'] * 1000:>10.2f}{per_sym * 1e6:>10.1f}{1 / per_sym if per_sym else 0:>10.0f}"
+                  f"{s.get('peak_kb', ''):>10}{s['requests']:>7}{delta:>9}")
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the scanner stages against a local stub exchange.")
+    ap.add_argument("--sizes", default=",".join(map(str, SIZES)))
+    ap.add_argument("--repeat", type=int, default=REPEAT)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--straggler-ms", type=float, default=0.0)
+    ap.add_argument("--stages", default="")
+    ap.add_argument("--fixture", default=DEFAULT_FIXTURE)
+    ap.add_argument("--history", default=HISTORY_FILE)
+    ap.add_argument("--child", type=int)
+    ap.add_argument("--url")
+    args = ap.parse_args()
+    only = [s for s in args.stages.split(",") if s]
+    if args.child:
+        print(json.dumps(run_child(args.child, args.url, args.fixture, args.repeat, only)))
+        return
+
+    fixture = ensure(args.fixture)
+    sizes = [int(s) for s in args.sizes.split(",")]
+    record = {"ts": time.strftime("%Y-%m-%d %H:%M:%S"), "commit": _commit(), "python": platform.python_version(), "machine": platform.machine(),
+              "latency_ms": args.latency_ms, "straggler_ms": args.straggler_ms, "repeat": args.repeat, "results": {}}
+    for n in sizes:
+        print(f"running {n} symbols...", file=sys.stderr, flush=True)
+        record["results"][str(n)] = run_size(n, fixture, args.repeat, args.latency_ms, args.straggler_ms, only)
+    report(record, _previous(args.history, sizes))
+    with open(args.history, "a") as f: f.write(json.dumps(record) + "\n")
+
+if __name__ == "__main__":
+    main()
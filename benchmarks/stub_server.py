@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from candle_store import INTERVAL_MS, MAX_KLINE_LIMIT
+from fixtures import DEFAULT_FIXTURE, FIXTURE_INTERVALS, ensure, load
+from resampler import resample
+
+# --- Exchange Stub Server ---
+# Serves /api/v3/klines, /api/v3/ticker/24hr, /exchange/ticker and both market lists
+# (/api/v3/exchangeInfo, /exchange/v1/markets_details) for a universe of any size from one
+# fixture. Symbol i replays template symbol i % templates with its prices scaled, and each
+# template's bar returns are cycled (de-meaned, so prices stay periodic) to cover any time range.
+# A bar depends only on its open time, so overlapping requests always agree. Intervals the fixture
+# lacks are aggregated from 1m or 1h with the app's own resampler. GET /stats returns request
+# counts per path. Point the app at it with BINANCE_API_URL / COINDCX_API_URL. --straggler-ms holds
+# back the first symbol's klines, to time a scan against one slow coin.
+DEFAULT_PORT = 8765
+DAY_MS = 86_400_000
+
+class FixtureMarket:
+    def __init__(self, fixture, n_symbols):
+        templates = list(fixture["klines"])
+        names = templates[:n_symbols] + [f"SYN{i:05d}USDT" for i in range(max(0, n_symbols - len(templates)))]
+        self.symbols = names
+        self.template = {sym: templates[i % len(templates)] for i, sym in enumerate(names)}
+        self.scale = {sym: 1.0 if i < len(templates) else 0.25 + (i * 7919 % 1000) / 250.0 for i, sym in enumerate(names)}
+        self.binance_row, self.coindcx_row = fixture["binance_ticker"], fixture["coindcx_ticker"]
+        self.series = {}
+        for tpl, ivs in fixture["klines"].items():
+            for interval, rows in ivs.items():
+                arr = np.asarray(rows, dtype=float)
+                close = arr[:, 4]
+                rets = np.diff(np.log(close), prepend=np.log(arr[0, 1]))
+                prefix = np.cumsum(rets - rets.mean())
+                self.series[(tpl, interval)] = (float(close[-1]) / np.exp(prefix[-1]), prefix, arr[:, 1] / close, arr[:, 2] / close, arr[:, 3] / close, arr[:, 5])
+
+    def base_bars(self, symbol, interval, first_ms, last_ms):
+        # Bars of a fixture interval with open times in [first_ms, last_ms], as an (n x 7) array.
+        step = FIXTURE_INTERVALS[interval]
+        anchor, prefix, o, h, l, v = self.series[(self.template[symbol], interval)]
+        k = np.arange(first_ms // step, last_ms // step + 1)
+        if not len(k): return np.empty((0, 7))
+        m = k % len(prefix)
+        close = anchor * self.scale[symbol] * np.exp(prefix[m])
+        return np.column_stack([k * step, close * o[m], close * h[m], close * l[m], close, v[m], k * step + step - 1])
+
+    def bars(self, symbol, interval, first_ms, last_ms):
+        if interval in FIXTURE_INTERVALS: return self.base_bars(symbol, interval, first_ms, last_ms)
+        step = INTERVAL_MS[interval]
+        base = "1m" if step < FIXTURE_INTERVALS["1h"] else "1h"
+        first_ms = first_ms // step * step
+        return resample(self.base_bars(symbol, base, first_ms, last_ms // step * step + step - 1), interval)
+
+    def klines(self, symbol, interval, start=None, end=None, limit=500):
+        step = INTERVAL_MS[interval]
+        limit = min(int(limit), MAX_KLINE_LIMIT)
+        now_bar = int(time.time() * 1000) // step * step
+        last = min(now_bar, int(end) // step * step) if end else now_bar
+        if start is not None:
+            first = -(-int(start) // step) * step
+            last = min(last, first + (limit - 1) * step)
+        else: first = last - (limit - 1) * step
+        if first > last: return []
+        rows = self.bars(symbol, interval, first, last)
+        return [[int(r[0]), f"{r[1]:.8f}", f"{r[2]:.8f}", f"{r[3]:.8f}", f"{r[4]:.8f}", f"{r[5]:.4f}", int(r[6]), f"{r[4] * r[5]:.4f}", 100, "0", "0", "0"] for r in rows]
+
+    def day_stats(self, symbol):
+        now = int(time.time() * 1000)
+        day = self.base_bars(symbol, "1h", now - DAY_MS, now)
+        last = self.base_bars(symbol, "1m", now, now)[-1]
+        open_, ltp = day[0, 1], last[4]
+        return ltp, open_, max(day[:, 2].max(), ltp), min(day[:, 3].min(), ltp), float(day[:, 5].sum()), float((day[:, 4] * day[:, 5]).sum())
+
+    def binance_tickers(self):
+        out = []
+        for sym in self.symbols:
+            ltp, open_, high, low, vol, qvol = self.day_stats(sym)
+            out.append({**self.binance_row, "symbol": sym, "lastPrice": f"{ltp:.8f}", "openPrice": f"{open_:.8f}", "highPrice": f"{high:.8f}", "lowPrice": f"{low:.8f}",
+                        "priceChange": f"{ltp - open_:.8f}", "priceChangePercent": f"{(ltp / open_ - 1) * 100:.3f}", "volume": f"{vol:.4f}", "quoteVolume": f"{qvol:.4f}"})
+        return out
+
+    def coindcx_tickers(self):
+        out = []
+        for sym in self.symbols:
+            ltp, open_, high, low, vol, qvol = self.day_stats(sym)
+            out.append({**self.coindcx_row, "market": sym, "last_price": f"{ltp:.8f}", "high": f"{high:.8f}", "low": f"{low:.8f}",
+                        "change_24_hour": f"{(ltp / open_ - 1) * 100:.3f}", "volume": f"{qvol:.4f}", "timestamp": int(time.time())})
+        return out
+
+    def exchange_info(self):
+        return {"timezone": "UTC", "symbols": [{"symbol": sym, "status": "TRADING", "baseAsset": sym[:-4], "quoteAsset": "USDT", "isSpotTradingAllowed": True} for sym in self.symbols]}
+
+    def markets_details(self):
+        return [{"coindcx_name": sym, "pair": f"B-{sym[:-4]}_USDT", "base_currency_short_name": "USDT", "target_currency_short_name": sym[:-4], "status": "active", "ecode": "B"}
+                for sym in self.symbols]
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    market = None
+    latency = 0.0
+    straggle = 0.0
+    stats = {}
+    stats_lock = threading.Lock()
+
+    def log_message(self, *args): pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if url.path == "/stats": return self._send(200, self.stats)
+        with self.stats_lock: self.stats[url.path] = self.stats.get(url.path, 0) + 1
+        if self.latency: time.sleep(self.latency)
+        m = self.market
+        if url.path == "/api/v3/klines":
+            if q.get("symbol") not in m.template: return self._send(400, {"code": -1121, "msg": "Invalid symbol."})
+            if q.get("interval") not in INTERVAL_MS: return self._send(400, {"code": -1120, "msg": "Invalid interval."})
+            if self.straggle and q["symbol"] == m.symbols[0]: time.sleep(self.straggle)
+            return self._send(200, m.klines(q["symbol"], q["interval"], q.get("startTime"), q.get("endTime"), q.get("limit", 500)))
+        if url.path == "/api/v3/ticker/24hr": return self._send(200, m.binance_tickers())
+        if url.path == "/exchange/ticker": return self._send(200, m.coindcx_tickers())
+        if url.path == "/api/v3/exchangeInfo": return self._send(200, m.exchange_info())
+        if url.path == "/exchange/v1/markets_details": return self._send(200, m.markets_details())
+        self._send(404, {"code": -1, "msg": "Not stubbed."})
+
+def serve(market, port=DEFAULT_PORT, latency_ms=0.0, straggler_ms=0.0):
+    handler = type("Handler", (StubHandler,), {"market": market, "latency": latency_ms / 1000.0, "straggle": straggler_ms / 1000.0, "stats": {}})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    return server
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Serve fixture market data on the Binance / CoinDCX REST paths.")
+    ap.add_argument("--fixture", default=DEFAULT_FIXTURE)
+    ap.add_argument("--symbols", type=int, default=200)
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--straggler-ms", type=float, default=0.0)
+    args = ap.parse_args()
+    server = serve(FixtureMarket(load(ensure(args.fixture)), args.symbols), args.port, args.latency_ms, args.straggler_ms)
+    print(f"READY http://127.0.0.1:{server.server_address[1]}", flush=True)
+    server.serve_forever()
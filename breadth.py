@@ -0,0 +1,129 @@
+import bisect
+import math
+import threading
+import time
+import numpy as np
+from sortedcontainers import SortedList
+
+# --- Market Breadth Index ---
+# The whole universe in columnar arrays (one row per coin) plus rankings kept in SortedLists, so
+# a tick is an O(log n) remove and insert instead of re-sorting (or shifting) thousands of pairs. Advance/decline counts,
+# % change buckets and the set of coins at their 24h high are adjusted on the same update.
+# Streamed tickers update it per tick; the dashboard feeds REST rows for coins the stream lacks.
+PCT_BUCKETS = [-10.0, -5.0, -2.0, 0.0, 2.0, 5.0, 10.0]
+BUCKET_LABELS = ["< -10%", "-10 to -5%", "-5 to -2%", "-2 to 0%", "0 to 2%", "2 to 5%", "5 to 10%", "> 10%"]
+NEW_HIGH_TOLERANCE = 0.001
+INITIAL_CAPACITY = 1024
+
+class BreadthIndex:
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self._lock = threading.Lock()
+        self.slot = {}
+        self.coins = []
+        self.ltp, self.pct, self.high, self.volume, self.updated = (np.zeros(capacity) for _ in range(5))
+        self.by_pct = SortedList()
+        self.by_volume = SortedList()
+        self.bucket_counts = [0] * (len(PCT_BUCKETS) + 1)
+        self.adv = self.dec = 0
+        self.at_high = set()
+
+    def _grow(self):
+        for name in ("ltp", "pct", "high", "volume", "updated"):
+            arr = getattr(self, name)
+            setattr(self, name, np.concatenate([arr, np.zeros(len(arr))]))
+
+    def _rank(self, coin, pct, volume):
+        self.by_pct.add((pct, coin))
+        self.by_volume.add((volume, coin))
+        self.bucket_counts[bisect.bisect_right(PCT_BUCKETS, pct)] += 1
+        self.adv += pct > 0
+        self.dec += pct < 0
+
+    def _unrank(self, coin, pct, volume):
+        self.by_pct.remove((pct, coin))
+        self.by_volume.remove((volume, coin))
+        self.bucket_counts[bisect.bisect_right(PCT_BUCKETS, pct)] -= 1
+        self.adv -= pct > 0
+        self.dec -= pct < 0
+
+    def _update(self, coin, ltp, pct, high, volume, now):
+        if math.isnan(pct) or math.isnan(volume): return
+        high = max(high, ltp) if high > 0 else 0.0
+        i = self.slot.get(coin)
+        if i is None:
+            i = self.slot[coin] = len(self.coins)
+            self.coins.append(coin)
+            if i >= len(self.pct): self._grow()
+            self._rank(coin, pct, volume)
+        elif self.pct[i] != pct or self.volume[i] != volume:
+            self._unrank(coin, float(self.pct[i]), float(self.volume[i]))
+            self._rank(coin, pct, volume)
+        self.ltp[i], self.pct[i], self.high[i], self.volume[i], self.updated[i] = ltp, pct, high, volume, now
+        self._mark_high(coin, i)
+
+    def _mark_high(self, coin, i):
+        if self.high[i] > 0 and self.ltp[i] >= self.high[i] * (1 - NEW_HIGH_TOLERANCE): self.at_high.add(coin)
+        else: self.at_high.discard(coin)
+
+    def update(self, coin, ltp, pct, high=0.0, volume=0.0):
+        with self._lock: self._update(coin, float(ltp), float(pct), float(high), float(volume), time.time())
+
+    def update_many(self, ticker_dict):
+        # ticker_dict: {coin: {"last_price", "change_pct", "high", "volume"}} as returned by fetch_ticker_dict.
+        now = time.time()
+        with self._lock:
+            for coin, t in ticker_dict.items():
+                self._update(coin, float(t['last_price']), float(t['change_pct']), float(t.get('high', 0.0)), float(t.get('volume', 0.0)), now)
+
+    def remove(self, coin):
+        with self._lock:
+            i = self.slot.pop(coin, None)
+            if i is None: return
+            self._unrank(coin, float(self.pct[i]), float(self.volume[i]))
+            self.at_high.discard(coin)
+            last = len(self.coins) - 1
+            if i != last:
+                moved = self.coins[last]
+                self.coins[i] = moved
+                self.slot[moved] = i
+                for arr in (self.ltp, self.pct, self.high, self.volume, self.updated): arr[i] = arr[last]
+            self.coins.pop()
+
+    def prune(self, max_age):
+        with self._lock:
+            cutoff = time.time() - max_age
+            stale = [c for c, i in self.slot.items() if self.updated[i] < cutoff]
+        for coin in stale: self.remove(coin)
+        return stale
+
+    def _row(self, coin):
+        i = self.slot[coin]
+        return {"Stock": coin, "LTP": float(self.ltp[i]), "Pct": float(self.pct[i]), "Volume": float(self.volume[i])}
+
+    def gainers(self, n=5):
+        with self._lock: return [self._row(c) for p, c in reversed(self.by_pct[-n:]) if p > 0]
+
+    def losers(self, n=5):
+        with self._lock: return [self._row(c) for p, c in self.by_pct[:n] if p < 0]
+
+    def volume_leaders(self, n=5):
+        with self._lock: return [self._row(c) for v, c in reversed(self.by_volume[-n:]) if v > 0]
+
+    def new_highs(self, n=None):
+        with self._lock: rows = sorted((self._row(c) for c in self.at_high), key=lambda r: r['Pct'], reverse=True)
+        return rows[:n] if n else rows
+
+    def advance_decline(self):
+        with self._lock: return self.adv, self.dec, len(self.coins) - self.adv - self.dec
+
+    def buckets(self):
+        with self._lock: return dict(zip(BUCKET_LABELS, self.bucket_counts))
+
+    def percentile(self, coin):
+        with self._lock:
+            i = self.slot.get(coin)
+            if i is None or not self.by_pct: return None
+            return 100.0 * self.by_pct.bisect_left((float(self.pct[i]), coin)) / max(1, len(self.by_pct) - 1)
+
+    def __len__(self):
+        return len(self.coins)
@@ -0,0 +1,219 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+import numpy as np
+import pandas as pd
+from market_client import BINANCE_API_URL, fetch_json_many, fetch_json_stream
+from metrics import cache_result, error, stage
+from rate_limiter import PRIORITY_BACKGROUND
+
+# --- Shared Kline Store ---
+# One local SQLite table keyed by (symbol, interval, open_time). Every consumer reads its
+# window from here; the network is only hit for the bars newer than what is already stored.
+CANDLE_DB_FILE = os.environ.get("CANDLE_DB_FILE", "crypto_candles.db")
+BINANCE_KLINES_URL = f"{BINANCE_API_URL}/api/v3/klines"
+CANDLE_MAX_AGE = 5.0
+MAX_KLINE_LIMIT = 1000
+HOT_BARS = 1000
+
+INTERVAL_MS = {"1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000, "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000, "12h": 43_200_000, "1d": 86_400_000}
+CANDLE_COLUMNS = ['Open time', 'Open', 'High', 'Low', 'Close', 'Volume', 'Close time']
+OHLCV_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+_local = threading.local()
+_sync_lock = threading.Lock()
+_last_sync = {}
+_hot_lock = threading.Lock()
+_hot = {}
+_empty_pages = set()
+_listeners = []
+
+def _conn():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(CANDLE_DB_FILE, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS candles (symbol TEXT NOT NULL, interval TEXT NOT NULL, open_time INTEGER NOT NULL, "
+            "open REAL, high REAL, low REAL, close REAL, volume REAL, close_time INTEGER, "
+            "PRIMARY KEY (symbol, interval, open_time)) WITHOUT ROWID"
+        )
+        _local.conn = conn
+    return conn
+
+def store_klines(symbol, interval, rows):
+    return store_klines_many({(symbol, interval): rows})
+
+def store_klines_many(batch):
+    # batch: {(symbol, interval): rows}, written in one transaction.
+    batch = {key: rows for key, rows in batch.items() if rows}
+    if not batch: return 0
+    conn = _conn()
+    conn.executemany(
+        "INSERT OR REPLACE INTO candles VALUES (?,?,?,?,?,?,?,?,?)",
+        [(symbol, interval, int(r[0]), float(r[1]), float(r[2]), float(r[3]), float(r[4]), float(r[5]), int(r[6])) for (symbol, interval), rows in batch.items() for r in rows]
+    )
+    conn.commit()
+    for (symbol, interval), rows in batch.items():
+        _merge_hot(symbol, interval, np.array([r[:7] for r in rows], dtype=float))
+        for fn in _listeners:
+            try: fn(symbol, interval, rows)
+            except: error("candle_store.listener")
+    return sum(len(rows) for rows in batch.values())
+
+def add_store_listener(fn):
+    # fn(symbol, interval, rows) runs after every write, REST sync and stream alike, so it must stay cheap.
+    _listeners.append(fn)
+
+# --- Hot tail mirror ---
+# The last HOT_BARS bars of every key that has been read are kept as an (n x 7) float array so
+# batch scans never pay the per-row cost of sqlite3; SQLite stays the persistent source of truth.
+def _merge_hot(symbol, interval, new):
+    key = (symbol, interval)
+    with _hot_lock:
+        old = _hot.get(key)
+        if old is None: return
+        merged = np.concatenate([old[~np.isin(old[:, 0], new[:, 0])], new])
+        _hot[key] = merged[np.argsort(merged[:, 0], kind='stable')][-HOT_BARS:]
+
+def _hot_tail(symbol, interval):
+    key = (symbol, interval)
+    with _hot_lock:
+        arr = _hot.get(key)
+        if arr is None:
+            rows = _conn().execute(
+                "SELECT open_time, open, high, low, close, volume, close_time FROM candles "
+                "WHERE symbol=? AND interval=? ORDER BY open_time DESC LIMIT ?", (symbol, interval, HOT_BARS)
+            ).fetchall()
+            arr = _hot[key] = np.array(rows[::-1], dtype=float).reshape(-1, len(CANDLE_COLUMNS))
+    return arr
+
+def _plan_sync(symbol, interval, limit, max_age):
+    # A fresh sync only covers the depth it was planned for: a deeper request re-plans.
+    key = (symbol, interval)
+    now = time.time()
+    limit = min(limit, MAX_KLINE_LIMIT)
+    with _sync_lock:
+        synced_at, depth = _last_sync.get(key, (0.0, 0))
+        fresh = now - synced_at < max_age
+        if fresh and depth >= limit: return None
+        _last_sync[key] = (now, max(limit, depth if fresh else 0))
+
+    tail = _hot_tail(symbol, interval)[-limit:]
+    step = INTERVAL_MS.get(interval)
+    now_ms = int(now * 1000)
+
+    # Cold key, short history or a gap wider than one page: pull the full window once.
+    if len(tail) < limit or step is None or (now_ms - tail[-1, 0]) // step >= MAX_KLINE_LIMIT:
+        return {"symbol": symbol, "interval": interval, "limit": limit}
+    # Closed tail -> only newer bars; forming tail -> refresh it together with anything after it.
+    last_open, last_close = int(tail[-1, 0]), int(tail[-1, 6])
+    start = last_close + 1 if last_close < now_ms else last_open
+    return {"symbol": symbol, "interval": interval, "limit": MAX_KLINE_LIMIT, "startTime": start}
+
+def _plan_many(symbols, interval, limit, max_age):
+    plans = [(sym, params) for sym in symbols for params in [_plan_sync(sym, interval, limit, max_age)] if params]
+    cache_result("klines", "fresh", len(symbols) - len(plans))
+    cache_result("klines", "fetch", len(plans))
+    return plans
+
+def sync_many(symbols, interval, limit=100, max_age=CANDLE_MAX_AGE, priority=PRIORITY_BACKGROUND):
+    symbols = list(dict.fromkeys(symbols))
+    with stage("sync_klines"):
+        plans = _plan_many(symbols, interval, limit, max_age)
+        results = fetch_json_many([(BINANCE_KLINES_URL, params) for _, params in plans], priority)
+        return sum(store_klines(sym, interval, rows) for (sym, _), rows in zip(plans, results) if isinstance(rows, list))
+
+def sync_many_stream(symbols, interval, limit=100, max_age=CANDLE_MAX_AGE, priority=PRIORITY_BACKGROUND, deadline=None, backfill=None):
+    # Yields each symbol once its bars are stored: fresh keys at once, the rest as their responses
+    # land (a failed fetch still yields, leaving the stored bars). backfill=(start_ms, end_ms) adds the
+    # older pages of that range for every symbol being fetched to the same requests. Fetches still
+    # open at `deadline` are dropped, and their symbols are not yielded.
+    symbols = list(dict.fromkeys(symbols))
+    calls = [(sym, None, params) for sym, params in _plan_many(symbols, interval, limit, max_age)]
+    if backfill: calls += [(sym, page_start, params) for sym, _, _ in list(calls) for page_start, params in _backfill_calls(sym, interval, *backfill)]
+    waiting = Counter(sym for sym, _, _ in calls)
+    for sym in symbols:
+        if not waiting[sym]: yield sym
+    for i, rows in fetch_json_stream([(BINANCE_KLINES_URL, params) for _, _, params in calls], priority, deadline):
+        sym, page_start, _ = calls[i]
+        if page_start is not None: _store_page(sym, interval, page_start, rows)
+        elif isinstance(rows, list): store_klines(sym, interval, rows)
+        waiting[sym] -= 1
+        if not waiting[sym]: yield sym
+
+def sync_klines(symbol, interval, limit=100, max_age=CANDLE_MAX_AGE, priority=PRIORITY_BACKGROUND):
+    return sync_many([symbol], interval, limit, max_age, priority)
+
+def read_tail(symbol, interval, bars=HOT_BARS):
+    # The last `bars` (<= HOT_BARS) stored bars as an (n x 7) array; callers must not modify it.
+    return _hot_tail(symbol, interval)[-bars:]
+
+def read_klines(symbol, interval, limit=100):
+    if limit <= HOT_BARS:
+        df = pd.DataFrame(_hot_tail(symbol, interval)[-limit:], columns=CANDLE_COLUMNS)
+        return df.astype({'Open time': 'int64', 'Close time': 'int64'})
+    rows = _conn().execute(
+        "SELECT open_time, open, high, low, close, volume, close_time FROM candles "
+        "WHERE symbol=? AND interval=? ORDER BY open_time DESC LIMIT ?", (symbol, interval, limit)
+    ).fetchall()
+    return pd.DataFrame(rows[::-1], columns=CANDLE_COLUMNS)
+
+def get_klines(symbol, interval, limit=100, max_age=CANDLE_MAX_AGE, priority=PRIORITY_BACKGROUND):
+    try: sync_klines(symbol, interval, limit, max_age, priority)
+    except: error("candle_store.sync")
+    return read_klines(symbol, interval, limit)
+
+def read_ohlcv_batch(symbols, interval, bars=100, min_bars=1):
+    # Right-aligned (symbol x bar) arrays per field straight from the hot mirror; column -1 is the latest bar.
+    tails = [(sym, _hot_tail(sym, interval)[-bars:]) for sym in dict.fromkeys(symbols)]
+    tails = [(sym, t) for sym, t in tails if len(t) >= min_bars]
+    cube = np.full((len(OHLCV_FIELDS), len(tails), bars), np.nan)
+    for row, (_, t) in enumerate(tails):
+        cube[:, row, bars - len(t):] = t[:, 1:6].T
+    return [sym for sym, _ in tails], dict(zip(OHLCV_FIELDS, cube))
+
+# --- Historical range (backtests) ---
+def _backfill_calls(symbol, interval, start_ms, end_ms=None):
+    # Pages of MAX_KLINE_LIMIT bars aligned to start_ms; only pages that are not fully stored are fetched.
+    step = INTERVAL_MS[interval]
+    end_ms = end_ms or int(time.time() * 1000)
+    start_ms = start_ms // step * step
+    page_ms = step * MAX_KLINE_LIMIT
+    have = dict(_conn().execute(
+        "SELECT (open_time - ?) / ?, COUNT(*) FROM candles WHERE symbol=? AND interval=? AND open_time BETWEEN ? AND ? GROUP BY 1",
+        (start_ms, page_ms, symbol, interval, start_ms, end_ms)
+    ).fetchall())
+    calls = []
+    for page, page_start in enumerate(range(start_ms, end_ms, page_ms)):
+        page_end = min(page_start + page_ms, end_ms) - 1
+        expected = (page_end - page_start) // step + 1
+        if have.get(page, 0) >= expected or (symbol, interval, page_start) in _empty_pages: continue
+        calls.append((page_start, {"symbol": symbol, "interval": interval, "startTime": page_start, "endTime": page_end, "limit": MAX_KLINE_LIMIT}))
+    return calls
+
+def _store_page(symbol, interval, page_start, rows):
+    # Pages before a coin was listed come back empty; remember them instead of re-asking.
+    if rows == []: _empty_pages.add((symbol, interval, page_start))
+    elif isinstance(rows, list): return store_klines(symbol, interval, rows)
+    return 0
+
+def backfill_klines(symbol, interval, start_ms, end_ms=None, priority=PRIORITY_BACKGROUND):
+    calls = _backfill_calls(symbol, interval, start_ms, end_ms)
+    results = fetch_json_many([(BINANCE_KLINES_URL, params) for _, params in calls], priority)
+    return sum(_store_page(symbol, interval, page_start, rows) for (page_start, _), rows in zip(calls, results))
+
+def read_range_array(symbol, interval, start_ms, end_ms=None):
+    end_ms = end_ms or int(time.time() * 1000)
+    rows = _conn().execute(
+        "SELECT open_time, open, high, low, close, volume, close_time FROM candles "
+        "WHERE symbol=? AND interval=? AND open_time BETWEEN ? AND ? ORDER BY open_time", (symbol, interval, start_ms, end_ms)
+    ).fetchall()
+    return np.array(rows, dtype=float).reshape(-1, len(CANDLE_COLUMNS))
+
+def read_range(symbol, interval, start_ms, end_ms=None):
+    arr = read_range_array(symbol, interval, start_ms, end_ms)
+    return {"Open time": arr[:, 0].astype(np.int64), **{f: arr[:, i + 1] for i, f in enumerate(OHLCV_FIELDS)}}
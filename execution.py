@@ -0,0 +1,318 @@
+import asyncio
+import concurrent.futures
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+import uuid
+import httpx
+from market_client import BINANCE_API_URL, COINDCX_API_URL, get_client, get_loop
+from metrics import error, fallback, inc, observe
+from rate_limiter import PRIORITY_INTERACTIVE
+from trade_store import claim_leg, leg_status, load_legs, save_leg
+
+# --- Order Execution Client ---
+# Orders leave the Streamlit script immediately: submit() records the order under a client order
+# id and hands it to the shared background loop, which signs it with an HMAC prepared once from
+# the secret and posts it over the same keep-alive pool as the market data. A resubmitted id is
+# never sent twice, and a post that dies in transit is looked up by that id before it is retried.
+# SL/TP are placed as a bracket once the entry fills: TP rests on the book as a limit order, SL is
+# armed off-exchange and fired as a market order when the live price crosses it (spot balances
+# cannot be locked by two exits), and whichever exit fills first cancels the other. Both legs are
+# journaled in the trade store: a restarted process adopts them again, and while the trade monitor
+# runs it owns the armed stops. Firing a stop is a guarded journal update, so only one process
+# ever sends it. A rejected stop is retried with backoff, then left rejected and alerted on.
+COINDCX_TRADE_URL = os.environ.get("COINDCX_TRADE_URL", COINDCX_API_URL).rstrip("/")
+ORDER_TIMEOUT = 5.0
+TRACK_INTERVAL = 1.0
+KEEPALIVE_EVERY = 45.0
+PRICE_MAX_AGE = 10.0
+OPEN_STATUSES = {"init", "open", "partially_filled", "untriggered"}
+LOCAL_STATUSES = {"pending", "armed", "triggered"}
+ENTRY, TAKE_PROFIT, STOP_LOSS = "ENTRY", "TP", "SL"
+LIVE_LEG_STATUSES = OPEN_STATUSES | {"pending", "armed", "triggered"}
+PERSISTED_FIELDS = ("status", "quantity", "id", "filled", "attempts", "error")
+SL_RETRIES = 3
+SL_RETRY_DELAY = 1.0
+
+class OrderError(Exception):
+    pass
+
+def new_client_order_id():
+    return f"hx-{uuid.uuid4().hex[:24]}"
+
+def form_client_order_id(nonce, *fields):
+    # The same form contents under the same nonce always give the same id, so a double click or a
+    # resubmitted form is dropped by submit() here and by the exchange's duplicate check.
+    return f"hx-{hashlib.sha256(repr((nonce, *fields)).encode()).hexdigest()[:24]}"
+
+def dcx_market(coin):
+    return f"B-{coin.replace('-USD', '_USDT')}"
+
+def bracket_error(side, price, sl, tp):
+    # Exits must sit on the losing and winning side of the entry respectively.
+    if side == "BUY" and ((sl and sl >= price) or (tp and tp <= price)): return "For a BUY, Stop Loss must be below and Take Profit above the entry."
+    if side == "SELL" and ((sl and sl <= price) or (tp and tp >= price)): return "For a SELL, Stop Loss must be above and Take Profit below the entry."
+    return None
+
+class ExecutionClient:
+    def __init__(self, key, secret, base_url=COINDCX_TRADE_URL, price_fn=None, owns_stops=None):
+        self.key = key
+        self.base_url = base_url
+        self.price_fn = price_fn
+        # owns_stops() says whether this process fires armed stops right now (default: always).
+        self.owns_stops = owns_stops or (lambda: True)
+        # Journal writes leave the event loop on one thread, so they land in the order they were made.
+        self._journal = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="bracket-journal")
+        # The keyed HMAC state (inner and outer pads) is built once; each request signs a copy of it.
+        self._mac = hmac.new(secret.encode(), digestmod=hashlib.sha256)
+        self._orders = {}
+        self._lock = threading.Lock()
+        self._tracker = None
+        self._loop = get_loop()
+        asyncio.run_coroutine_threadsafe(self._keepalive(), self._loop)
+
+    def sign(self, body):
+        mac = self._mac.copy()
+        mac.update(body)
+        return mac.hexdigest()
+
+    # --- Script-side API (never blocks on the exchange) ---
+    def submit(self, coin, side, order_type, price, quantity, sl=None, tp=None, client_order_id=None):
+        coid = client_order_id or new_client_order_id()
+        with self._lock:
+            if coid in self._orders: return dict(self._orders[coid])
+            rec = self._orders[coid] = self._record(coid, coin, side, order_type, price, quantity, ENTRY, sl=sl or None, tp=tp or None)
+        asyncio.run_coroutine_threadsafe(self._place(rec), self._loop)
+        return dict(rec)
+
+    def cancel(self, client_order_id):
+        asyncio.run_coroutine_threadsafe(self._cancel_tree(client_order_id), self._loop)
+
+    def order(self, client_order_id):
+        with self._lock: rec = self._orders.get(client_order_id)
+        return dict(rec) if rec else None
+
+    def orders(self):
+        with self._lock: return [dict(r) for r in sorted(self._orders.values(), key=lambda r: -r["submitted_at"])]
+
+    def adopt_legs(self):
+        # Live bracket legs from the journal that this process does not hold yet: its own from before
+        # a restart, or those a dashboard armed. Legs caught mid-send are resumed by the stop owner.
+        adopted = []
+        for leg in load_legs(LIVE_LEG_STATUSES):
+            with self._lock:
+                if leg["client_order_id"] in self._orders: continue
+                order_type = "limit_order" if leg["role"] == TAKE_PROFIT else "market_order"
+                rec = self._record(leg["client_order_id"], leg["coin"], leg["side"], order_type, leg["price"], leg["quantity"], leg["role"], leg["parent"])
+                rec.update({f: leg[f] for f in PERSISTED_FIELDS})
+                self._orders[rec["client_order_id"]] = rec
+            adopted.append(rec)
+        for rec in adopted:
+            if rec["status"] in ("pending", "triggered") and self.owns_stops(): asyncio.run_coroutine_threadsafe(self._resume(rec), self._loop)
+        if adopted: self._loop.call_soon_threadsafe(self._ensure_tracker)
+        return len(adopted)
+
+    def wait(self, client_order_id, statuses, timeout=10.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            rec = self.order(client_order_id)
+            if rec and rec["status"] in statuses: return rec
+            time.sleep(0.01)
+        return self.order(client_order_id)
+
+    # --- Loop side ---
+    def _record(self, coid, coin, side, order_type, price, quantity, role, parent=None, sl=None, tp=None):
+        return {"client_order_id": coid, "coin": coin, "market": dcx_market(coin), "side": side, "order_type": order_type, "price": float(price),
+                "quantity": float(quantity), "role": role, "parent": parent, "sl": sl, "tp": tp, "status": "pending", "id": None, "filled": 0.0,
+                "avg_price": 0.0, "error": "", "submitted_at": time.time(), "latency_ms": None, "cancelling": False, "attempts": 0}
+
+    def _update(self, rec, **fields):
+        with self._lock:
+            changed = any(rec.get(f) != v for f, v in fields.items() if f in PERSISTED_FIELDS)
+            rec.update(fields)
+            leg = dict(rec)
+        if changed and rec["role"] != ENTRY: self._persist(leg)
+
+    def _persist(self, leg):
+        self._journal.submit(save_leg, leg).add_done_callback(lambda f: f.exception() and error("execution.journal"))
+
+    async def _journaled(self, fn, *args):
+        return await self._loop.run_in_executor(self._journal, fn, *args)
+
+    async def _post(self, path, payload):
+        body = json.dumps({**payload, "timestamp": int(time.time() * 1000)}, separators=(',', ':'))
+        headers = {"X-AUTH-APIKEY": self.key, "X-AUTH-SIGNATURE": self.sign(body.encode()), "Content-Type": "application/json"}
+        start = time.perf_counter()
+        res = await get_client().request("POST", f"{self.base_url}{path}", content=body, headers=headers, timeout=ORDER_TIMEOUT, retries=0, priority=PRIORITY_INTERACTIVE)
+        observe("order_seconds", time.perf_counter() - start, endpoint=path.rsplit("/", 1)[-1])
+        try: data = res.json()
+        except ValueError: data = {}
+        if res.status_code != 200: raise OrderError((data.get("message") if isinstance(data, dict) else None) or f"HTTP {res.status_code}")
+        return data
+
+    async def _lookup(self, coid):
+        try: return await self._post("/exchange/v1/orders/status", {"client_order_id": coid})
+        except (OrderError, httpx.HTTPError): return None
+
+    async def _place(self, rec):
+        # A leg cancelled before it went out stays cancelled.
+        if rec["status"] not in ("pending", "triggered"): return
+        payload = {"side": rec["side"].lower(), "order_type": rec["order_type"], "market": rec["market"], "total_quantity": rec["quantity"], "client_order_id": rec["client_order_id"]}
+        if rec["order_type"] != "market_order": payload["price_per_unit"] = rec["price"]
+        start = time.perf_counter()
+        order = None
+        for attempt in range(2):
+            try:
+                data = await self._post("/exchange/v1/orders/create", payload)
+                order = (data.get("orders") or [None])[0] if isinstance(data, dict) else None
+                break
+            except httpx.TransportError as e:
+                # The order may have reached the exchange before the connection died: its client id tells.
+                order = await self._lookup(rec["client_order_id"])
+                if order or attempt: return self._settle(rec, order, error=str(e) or type(e).__name__)
+            except (OrderError, httpx.HTTPError) as e:
+                inc("orders_total", role=rec["role"], result="rejected")
+                if rec["role"] == STOP_LOSS: return await self._retry_stop(rec, str(e))
+                return self._update(rec, status="rejected", error=str(e))
+        inc("orders_total", role=rec["role"], result="accepted")
+        # Cancelled while the create was in flight: it reached the exchange anyway, so take it back off.
+        cancelled = rec["status"] == "cancelled" or rec["cancelling"]
+        self._update(rec, latency_ms=round((time.perf_counter() - start) * 1000, 2))
+        self._settle(rec, order)
+        if cancelled: await self._cancel(rec)
+
+    def _settle(self, rec, order, error=""):
+        if not isinstance(order, dict):
+            if rec["role"] == STOP_LOSS and rec["status"] == "triggered": return asyncio.ensure_future(self._retry_stop(rec, error or "Exchange returned no order."))
+            return self._update(rec, status="rejected", error=error or "Exchange returned no order.")
+        total = float(order.get("total_quantity", rec["quantity"]) or 0)
+        self._update(rec, id=order.get("id"), status=order.get("status", "open"), filled=total - float(order.get("remaining_quantity", total) or 0),
+                     avg_price=float(order.get("avg_price", 0) or 0))
+        self._after_fill(rec)
+        self._ensure_tracker()
+
+    def _after_fill(self, rec):
+        if rec["status"] in OPEN_STATUSES: return
+        # A partly filled entry the user is cancelling gets no bracket.
+        if rec["role"] == ENTRY and rec["filled"] > 0 and not rec["cancelling"] and not self._legs(rec["client_order_id"]): self._arm_bracket(rec)
+        elif rec["role"] in (TAKE_PROFIT, STOP_LOSS) and rec["status"] == "filled":
+            for leg in self._legs(rec["parent"]):
+                if leg is not rec: asyncio.ensure_future(self._cancel(leg))
+
+    def _legs(self, parent):
+        with self._lock: return [r for r in self._orders.values() if r["parent"] == parent]
+
+    def _arm_bracket(self, entry):
+        exit_side = "SELL" if entry["side"] == "BUY" else "BUY"
+        coid = entry["client_order_id"]
+        with self._lock:
+            if entry["tp"]:
+                tp = self._orders[f"{coid}-tp"] = self._record(f"{coid}-tp", entry["coin"], exit_side, "limit_order", entry["tp"], entry["filled"], TAKE_PROFIT, coid)
+            if entry["sl"]:
+                sl = self._orders[f"{coid}-sl"] = self._record(f"{coid}-sl", entry["coin"], exit_side, "market_order", entry["sl"], entry["filled"], STOP_LOSS, coid)
+                sl["status"] = "armed"
+        for leg in self._legs(coid): self._persist(dict(leg))
+        if entry["tp"]: asyncio.ensure_future(self._place(tp))
+
+    async def _cancel(self, rec):
+        if rec["status"] in ("armed", "pending"):
+            # Another process may have fired this leg meanwhile: then it is cancelled on the exchange below.
+            if rec["role"] == ENTRY or await self._journaled(claim_leg, rec["client_order_id"], rec["status"], "cancelled"): return self._update(rec, status="cancelled")
+            status = await self._journaled(leg_status, rec["client_order_id"])
+            self._update(rec, status=status or "cancelled")
+            if rec["status"] == "triggered": await self._refresh(rec)
+        if rec["status"] not in OPEN_STATUSES: return
+        try: await self._post("/exchange/v1/orders/cancel", {"id": rec["id"]} if rec["id"] else {"client_order_id": rec["client_order_id"]})
+        except (OrderError, httpx.HTTPError) as e: return self._update(rec, error=str(e))
+        await self._refresh(rec)
+
+    async def _cancel_tree(self, coid):
+        with self._lock: rec = self._orders.get(coid)
+        if rec is None: return
+        self._update(rec, cancelling=True)
+        await self._cancel(rec)
+        if rec["role"] == ENTRY:
+            for leg in self._legs(coid): await self._cancel(leg)
+
+    async def _refresh(self, rec):
+        order = await self._lookup(rec["client_order_id"])
+        if order: self._settle(rec, order)
+
+    async def _check_stop(self, sl):
+        price = await self._price(sl["coin"])
+        if price is None: return
+        if (price > sl["price"]) if sl["side"] == "SELL" else (price < sl["price"]): return
+        if not await self._journaled(claim_leg, sl["client_order_id"], "armed", "triggered"):
+            # Fired, or cancelled, by another process first.
+            status = await self._journaled(leg_status, sl["client_order_id"])
+            with self._lock: sl["status"] = status or "cancelled"
+            return
+        self._update(sl, status="triggered")
+        # Free the coins held by the resting TP first; only what it has not filled is left to close.
+        tp = self._orders.get(f"{sl['parent']}-tp")
+        if tp:
+            await self._cancel(tp)
+            if tp["status"] == "filled": return self._update(sl, status="cancelled")
+            self._update(sl, quantity=sl["quantity"] - tp["filled"])
+        await self._place(sl)
+
+    async def _retry_stop(self, sl, reason):
+        # A stop that did not go out leaves the position open. An earlier attempt may have reached the
+        # exchange after all (its client id tells); otherwise resend with backoff, then give up loudly.
+        order = await self._lookup(sl["client_order_id"])
+        if order: return self._settle(sl, order)
+        attempts = sl["attempts"] + 1
+        if attempts > SL_RETRIES:
+            inc("orders_total", role=STOP_LOSS, result="failed")
+            error("execution.stop_rejected")
+            return self._update(sl, status="rejected", attempts=attempts, error=f"STOP LOSS NOT PLACED after {SL_RETRIES} retries: {reason}")
+        self._update(sl, status="triggered", attempts=attempts, error=reason)
+        await asyncio.sleep(SL_RETRY_DELAY * attempts)
+        await self._place(sl)
+
+    async def _resume(self, rec):
+        # A leg whose process stopped between deciding to send it and hearing back.
+        order = await self._lookup(rec["client_order_id"])
+        if order: self._settle(rec, order)
+        else: await self._place(rec)
+
+    async def _price(self, coin):
+        try:
+            price = self.price_fn(coin) if self.price_fn else None
+            if price: return price
+        except: error("execution.price_fn")
+        fallback("execution.price")
+        data = await get_client().get_json(f"{BINANCE_API_URL}/api/v3/ticker/price", {"symbol": coin.replace('-USD', 'USDT')}, priority=PRIORITY_INTERACTIVE)
+        try: return float(data["price"])
+        except: return None
+
+    def _ensure_tracker(self):
+        if self._tracker is None or self._tracker.done(): self._tracker = asyncio.ensure_future(self._track())
+
+    async def _track(self):
+        while True:
+            with self._lock:
+                live = [r for r in self._orders.values() if r["status"] in OPEN_STATUSES]
+                armed = [r for r in self._orders.values() if r["status"] == "armed"]
+            if not live and not armed: return
+            if not self.owns_stops():
+                # The trade monitor fires them; mirror what it did from the journal.
+                for r in armed:
+                    status = await self._journaled(leg_status, r["client_order_id"])
+                    if status and status != "armed":
+                        with self._lock: r["status"] = status
+                armed = []
+            results = await asyncio.gather(*(self._refresh(r) for r in live), *(self._check_stop(r) for r in armed), return_exceptions=True)
+            for r in results:
+                if isinstance(r, Exception): error("execution.track")
+            await asyncio.sleep(TRACK_INTERVAL)
+
+    async def _keepalive(self):
+        # A cheap request now and then keeps the TLS connection to the order host open between orders.
+        while True:
+            try: await get_client().request("HEAD", f"{self.base_url}/", retries=0, priority=PRIORITY_INTERACTIVE)
+            except httpx.HTTPError: pass
+            await asyncio.sleep(KEEPALIVE_EVERY)
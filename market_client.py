@@ -0,0 +1,146 @@
+import asyncio
+import concurrent.futures
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+import httpx
+from metrics import inc, observe
+from rate_limiter import WeightRateLimiter, PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, THROTTLE_STATUSES
+
+# --- Async Market Data Client ---
+# One keep-alive pool per host, living on a single background event loop so connections survive
+# Streamlit reruns. Base URLs can be pointed at a local stub server through the environment.
+BINANCE_API_URL = os.environ.get("BINANCE_API_URL", "https://api.binance.com").rstrip("/")
+COINDCX_API_URL = os.environ.get("COINDCX_API_URL", "https://api.coindcx.com").rstrip("/")
+
+ENDPOINT_TIMEOUTS = {"/api/v3/klines": 3.0, "/api/v3/exchangeInfo": 10.0, "/api/v3/ticker": 5.0, "/exchange/ticker": 5.0, "/exchange/v1/orders": 10.0}
+DEFAULT_TIMEOUT = 5.0
+MAX_CONCURRENCY_PER_HOST = 20
+MAX_RETRIES = 2
+RETRY_BASE_DELAY = 0.25
+RETRY_STATUSES = {500, 502, 503, 504}
+MAX_THROTTLE_WAIT = 30.0
+
+def endpoint_timeout(url):
+    path = urlsplit(url).path
+    for prefix, timeout in ENDPOINT_TIMEOUTS.items():
+        if path.startswith(prefix): return timeout
+    return DEFAULT_TIMEOUT
+
+class MarketDataClient:
+    def __init__(self, max_per_host=MAX_CONCURRENCY_PER_HOST, retries=MAX_RETRIES, limiter=None):
+        self.max_per_host = max_per_host
+        self.retries = retries
+        self.limiter = limiter or WeightRateLimiter()
+        self._clients = {}
+        self._sems = {}
+
+    def _pool(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._clients:
+            limits = httpx.Limits(max_connections=self.max_per_host, max_keepalive_connections=self.max_per_host, keepalive_expiry=60.0)
+            self._clients[host] = httpx.AsyncClient(limits=limits, headers={"Accept": "application/json"})
+            self._sems[host] = asyncio.Semaphore(self.max_per_host)
+        return self._clients[host], self._sems[host]
+
+    async def request(self, method, url, params=None, content=None, headers=None, timeout=None, retries=None, priority=PRIORITY_BACKGROUND):
+        client, sem = self._pool(url)
+        timeout = timeout or endpoint_timeout(url)
+        retries = self.retries if retries is None else retries
+        parts = urlsplit(url)
+        host, endpoint = parts.netloc, parts.path
+        for attempt in range(retries + 1):
+            try:
+                await self.limiter.acquire(url, params, priority)
+                async with sem:
+                    start = time.perf_counter()
+                    res = await client.request(method, url, params=params, content=content, headers=headers, timeout=timeout)
+                observe("http_request_seconds", time.perf_counter() - start, host=host, endpoint=endpoint)
+                inc("http_requests_total", host=host, endpoint=endpoint, status=res.status_code)
+                backoff = self.limiter.observe(url, res.status_code, res.headers)
+                # 429s are retried once the limiter lifts the host block; long 418 bans are returned as-is.
+                retryable = res.status_code in RETRY_STATUSES or (res.status_code in THROTTLE_STATUSES and backoff <= MAX_THROTTLE_WAIT)
+                if not retryable or attempt == retries: return res
+            except httpx.TransportError as e:
+                # TimeoutException subclasses (ReadTimeout, ConnectTimeout, ...) keep their name as the kind.
+                inc("http_errors_total", host=host, endpoint=endpoint, kind=type(e).__name__)
+                if attempt == retries: raise
+            inc("http_retries_total", host=host, endpoint=endpoint)
+            # Full jitter keeps a fan-out of retries from landing on the exchange in lockstep.
+            await asyncio.sleep(random.uniform(0, RETRY_BASE_DELAY * (2 ** attempt)))
+
+    async def get_json(self, url, params=None, timeout=None, priority=PRIORITY_BACKGROUND):
+        try:
+            res = await self.request("GET", url, params=params, timeout=timeout, priority=priority)
+            return res.json() if res.status_code == 200 else None
+        except httpx.TransportError: pass  # already counted by request()
+        except (httpx.HTTPError, ValueError) as e: inc("http_errors_total", host=urlsplit(url).netloc, endpoint=urlsplit(url).path, kind=type(e).__name__)
+        return None
+
+    async def get_json_many(self, calls, priority=PRIORITY_BACKGROUND):
+        return await asyncio.gather(*(self.get_json(url, params, priority=priority) for url, params in calls))
+
+    async def post_json(self, url, content, headers=None, timeout=None):
+        # Orders are not idempotent, so they are never retried here.
+        res = await self.request("POST", url, content=content, headers=headers, timeout=timeout, retries=0, priority=PRIORITY_INTERACTIVE)
+        return res.json()
+
+    async def aclose(self):
+        for client in self._clients.values(): await client.aclose()
+        self._clients.clear()
+        self._sems.clear()
+
+# --- Background loop + sync facade for the Streamlit script ---
+_loop = None
+_client = None
+_loop_lock = threading.Lock()
+
+def _ensure_loop():
+    global _loop, _client
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="market-client-loop", daemon=True).start()
+            _client = MarketDataClient()
+    return _loop
+
+def get_loop():
+    return _ensure_loop()
+
+def run(coro, timeout=None):
+    return asyncio.run_coroutine_threadsafe(coro, _ensure_loop()).result(timeout)
+
+def get_client():
+    _ensure_loop()
+    return _client
+
+def fetch_json(url, params=None, timeout=None, priority=PRIORITY_BACKGROUND):
+    return run(get_client().get_json(url, params, timeout, priority))
+
+def fetch_json_many(calls, priority=PRIORITY_BACKGROUND):
+    if not calls: return []
+    return run(get_client().get_json_many(list(calls), priority))
+
+def fetch_json_stream(calls, priority=PRIORITY_BACKGROUND, deadline=None):
+    # Yields (index, json) in completion order. Requests still running at `deadline` (epoch seconds),
+    # or when the caller stops iterating, are cancelled and never yielded.
+    loop = _ensure_loop()
+    futures = {asyncio.run_coroutine_threadsafe(get_client().get_json(url, params, priority=priority), loop): i for i, (url, params) in enumerate(calls)}
+    try:
+        for fut in concurrent.futures.as_completed(futures, None if deadline is None else max(0.0, deadline - time.time())):
+            yield futures[fut], fut.result()
+    except concurrent.futures.TimeoutError: pass
+    finally:
+        cancelled = sum(fut.cancel() for fut in futures)
+        if cancelled: inc("http_cancelled_total", cancelled)
+
+def post_json(url, content, headers=None, timeout=None):
+    return run(get_client().post_json(url, content, headers, timeout))
+
+def throttle_stats():
+    return get_client().limiter.stats()
+
+def blocked_hosts():
+    return get_client().limiter.blocked_hosts()
@@ -0,0 +1,107 @@
+import time
+import numpy as np
+import pandas as pd
+from market_client import BINANCE_API_URL, COINDCX_API_URL, fetch_json
+from metrics import error, fallback, timed
+from yf_provider import get_history_arrays
+
+# --- Exchange Ticker Snapshot ---
+# CoinDCX first (the exchange we trade on), full Binance 24hr ticker when CoinDCX is down or thin.
+@timed("stage_seconds", stage="tickers")
+def fetch_ticker_dict():
+    ticker_dict = {}
+    try:
+        res = fetch_json(f"{COINDCX_API_URL}/exchange/ticker")
+        if isinstance(res, list) and len(res) > 0:
+            for item in res:
+                market = str(item.get('market', ''))
+                if market.endswith('USDT'):
+                    base = market.replace('B-', '').replace('_USDT', '').replace('USDT', '')
+                    if base:
+                        sym = f"{base}-USD"
+                        ticker_dict[sym] = {"last_price": float(item.get('last_price', 0)), "change_pct": float(item.get('change_24_hour', 0)), "high": float(item.get('high', 0) or 0), "volume": float(item.get('volume', 0) or 0)}
+            if len(ticker_dict) > 50: return ticker_dict
+    except: error("tickers.coindcx")
+    
+    fallback("tickers.binance")
+    ticker_dict.update(fetch_binance_tickers())
+    return ticker_dict
+
+def fetch_binance_tickers():
+    # Every Binance USDT pair from the 24hr ticker; volume is quoteVolume, i.e. in USDT.
+    ticker_dict = {}
+    try:
+        res = fetch_json(f"{BINANCE_API_URL}/api/v3/ticker/24hr")
+        if isinstance(res, list):
+            for item in res:
+                symbol = str(item.get('symbol', ''))
+                if symbol.endswith('USDT'):
+                    base = symbol.replace('USDT', '')
+                    if base:
+                        sym = f"{base}-USD"
+                        ticker_dict[sym] = {"last_price": float(item.get('lastPrice', 0)), "change_pct": float(item.get('priceChangePercent', 0)), "high": float(item.get('highPrice', 0)), "volume": float(item.get('quoteVolume', 0))}
+    except: error("tickers.binance")
+    return ticker_dict
+
+def fetch_yf_quotes(coins, period="5d"):
+    # Last two daily closes of every coin the exchanges did not quote, from one batched download.
+    quotes = {}
+    fallback("yf.quotes", len(coins))
+    for coin, arr in get_history_arrays(coins, period, "1d").items():
+        if len(arr) < 2: continue
+        prev, ltp = float(arr[-2, 4]), float(arr[-1, 4])
+        if prev > 0: quotes[coin] = (ltp, ltp - prev, ((ltp - prev) / prev) * 100)
+    return quotes
+
+# --- Market Snapshot ---
+# Built once per refresh: a coin-indexed LTP / Change / Change % table covering every USDT pair.
+# Exchange tickers form the base, fresher streamed prices are laid over them and any coin still
+# unquoted is filled by one batched fallback. Every panel reads from this table instead of
+# fetching per coin.
+SNAPSHOT_COLUMNS = ["LTP", "Change", "Change %"]
+NO_QUOTE = (0.0, 0.0, 0.0)
+
+class MarketSnapshot:
+    def __init__(self, frame=None):
+        self.frame = frame if frame is not None else pd.DataFrame(columns=SNAPSHOT_COLUMNS, dtype=float)
+        self.built_at = time.time()
+        self._quotes = None
+
+    @classmethod
+    def build(cls, ticker_dict, streamed=None):
+        coins = list(ticker_dict)
+        ltp = np.array([ticker_dict[c]["last_price"] for c in coins], dtype=float)
+        pct = np.array([ticker_dict[c]["change_pct"] for c in coins], dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'): chg = np.nan_to_num(ltp - ltp / (1 + pct / 100), nan=0.0, posinf=0.0, neginf=0.0)
+        return cls(pd.DataFrame({"LTP": ltp, "Change": chg, "Change %": pct}, index=pd.Index(coins, name="Asset"))).merged(streamed)
+
+    def merged(self, quotes):
+        # quotes: {coin: (ltp, chg, pct)}; they replace existing rows.
+        if not quotes: return self
+        extra = pd.DataFrame.from_dict(quotes, orient="index", columns=SNAPSHOT_COLUMNS, dtype=float)
+        return MarketSnapshot(pd.concat([self.frame[~self.frame.index.isin(extra.index)], extra]).rename_axis("Asset"))
+
+    def missing(self, coins):
+        wanted = pd.Index(list(dict.fromkeys(coins)))
+        return list(wanted[~(self.frame["LTP"].reindex(wanted).fillna(0.0).to_numpy() > 0)])
+
+    def lookup(self, coins):
+        return self.frame.reindex(list(coins)).fillna(0.0)
+
+    def get(self, coin):
+        if self._quotes is None: self._quotes = dict(zip(self.frame.index, self.frame[SNAPSHOT_COLUMNS].itertuples(index=False, name=None)))
+        return self._quotes.get(coin, NO_QUOTE)
+
+# --- Sector Performance ---
+# Average 24h change per sector from the snapshot; members without a quote are left out.
+def calc_sector_perf(sector_dict, snapshot, ignore_keys=[]):
+    results = []
+    for sector, items in sector_dict.items():
+        if sector in ignore_keys: continue
+        quotes = snapshot.lookup(items)
+        quotes = quotes[quotes['LTP'] > 0]
+        if not quotes.empty:
+            avg_pct = round(float(quotes['Change %'].mean()), 2)
+            stock_details = [{"Stock": stock, "Pct": pct} for stock, pct in quotes['Change %'].sort_values(ascending=False, kind='stable').items()]
+            results.append({"Sector": sector, "Pct": avg_pct, "Width": max(min(abs(avg_pct) * 20, 100), 5), "Stocks": stock_details})
+    return sorted(results, key=lambda x: x['Pct'], reverse=True)
@@ -0,0 +1,203 @@
+import asyncio
+import concurrent.futures
+import json
+import os
+import threading
+import time
+import websockets
+from market_client import get_loop
+from candle_store import store_klines_many
+from breadth import BreadthIndex
+from metrics import error, timed
+
+# --- Streaming Ticker & Kline Feed ---
+# A websocket subscriber that keeps the latest price per coin and the latest candle per
+# (symbol, interval) in memory. Readers (UI, trade checks) never touch the network; closed
+# candles are batched into the candle store on a writer thread. A JSONL replay file stands
+# in for the exchange when testing offline: one raw combined-stream message per line,
+# optionally with a "_ts" (ms) field used for pacing.
+BINANCE_WS_URL = os.environ.get("BINANCE_WS_URL", "wss://stream.binance.com:9443/stream").rstrip("/")
+MARKET_STREAM_REPLAY = os.environ.get("MARKET_STREAM_REPLAY", "")
+ALL_TICKERS_STREAM = "!miniTicker@arr"
+STALE_AFTER = 10.0
+SUBSCRIBE_CHUNK = 200
+MAX_STREAMS = 1024
+STORE_BATCH_DELAY = 0.5
+KLINE_WANT_TTL = float(os.environ.get("KLINE_WANT_TTL", "900"))
+RECONNECT_MAX_DELAY = 30.0
+
+def coin_from_symbol(symbol):
+    return symbol[:-4] + "-USD" if symbol.endswith("USDT") else None
+
+class PriceTable:
+    def __init__(self, stale_after=STALE_AFTER):
+        self.stale_after = stale_after
+        self._lock = threading.Lock()
+        self.prices = {}
+        self.candles = {}
+
+    def update_ticker(self, coin, ltp, chg, pct):
+        with self._lock: self.prices[coin] = (ltp, chg, pct, time.time())
+
+    def update_candle(self, symbol, interval, row, closed):
+        with self._lock: self.candles[(symbol, interval)] = (row, closed, time.time())
+
+    def get_price(self, coin, max_age=None):
+        with self._lock: entry = self.prices.get(coin)
+        if entry is None or time.time() - entry[3] > (max_age or self.stale_after): return None
+        return entry[:3]
+
+    def get_candle(self, symbol, interval):
+        with self._lock: entry = self.candles.get((symbol, interval))
+        return entry[0] if entry else None
+
+    def snapshot(self, max_age=None):
+        now, max_age = time.time(), max_age or self.stale_after
+        with self._lock: return {coin: p[:3] for coin, p in self.prices.items() if now - p[3] <= max_age}
+
+class MarketStream:
+    def __init__(self, table=None, url=BINANCE_WS_URL, replay_file=MARKET_STREAM_REPLAY, record_file=None, replay_speed=1.0):
+        # A finished replay holds its last state, so replayed prices never go stale.
+        self.table = table or PriceTable(float("inf") if replay_file else STALE_AFTER)
+        self.breadth = BreadthIndex()
+        self.url = url
+        self.replay_file = replay_file
+        self.record_file = record_file
+        self.replay_speed = replay_speed
+        self.streams = frozenset({ALL_TICKERS_STREAM})
+        self._wanted = {}
+        self.listeners = []
+        self.status = {"connected": False, "messages": 0, "reconnects": 0, "last_message": 0.0, "source": "replay" if replay_file else "binance"}
+        self._ws = None
+        self._loop = None
+        self._task = None
+        self._send_lock = asyncio.Lock()
+        self._closed = {}
+        self._flush_handle = None
+        self._writer = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="stream-store")
+
+    def start(self):
+        if self._task is None:
+            self._loop = get_loop()
+            self._task = asyncio.run_coroutine_threadsafe(self._run(), self._loop)
+        return self
+
+    def add_listener(self, fn):
+        # Listeners run on the stream's event loop for every tick, so they must not block.
+        self.listeners.append(fn)
+
+    def subscribe_klines(self, symbols, interval, owner="default"):
+        # Each owner (a session's watchlist, its chart) holds one set of kline streams that the
+        # next call replaces; owners that stop asking expire after KLINE_WANT_TTL. The stream
+        # set itself only changes on the loop, which also sends the SUBSCRIBE/UNSUBSCRIBE diff.
+        wanted = frozenset(f"{s.lower()}@kline_{interval}" for s in symbols)
+        (self._loop or get_loop()).call_soon_threadsafe(self._want, owner, wanted, time.time())
+
+    def _want(self, owner, wanted, now):
+        self._wanted[owner] = (wanted, now)
+        for key in [k for k, (_, ts) in self._wanted.items() if now - ts > KLINE_WANT_TTL]: del self._wanted[key]
+        target = {ALL_TICKERS_STREAM}
+        # Binance caps a connection at 1024 streams: the most recently refreshed owners win.
+        for streams, _ in sorted(self._wanted.values(), key=lambda w: -w[1]):
+            if len(target | streams) > MAX_STREAMS:
+                error("stream.capacity")
+                continue
+            target |= streams
+        stale, new = self.streams - target, target - self.streams
+        if not stale and not new: return
+        self.streams = frozenset(target)
+        if self._ws is not None:
+            if stale: asyncio.ensure_future(self._send("UNSUBSCRIBE", sorted(stale)))
+            if new: asyncio.ensure_future(self._send("SUBSCRIBE", sorted(new)))
+
+    async def _send(self, method, streams):
+        # One sender at a time, in call order, so an UNSUBSCRIBE never overtakes a later SUBSCRIBE.
+        async with self._send_lock:
+            ws = self._ws
+            if ws is None: return
+            for i in range(0, len(streams), SUBSCRIBE_CHUNK):
+                await ws.send(json.dumps({"method": method, "params": streams[i:i + SUBSCRIBE_CHUNK], "id": int(time.time() * 1000) + i}))
+
+    @timed("stage_seconds", stage="stream.message")
+    def handle(self, msg):
+        data = msg.get("data", msg) if isinstance(msg, dict) else msg
+        self.status["messages"] += 1
+        self.status["last_message"] = time.time()
+        if isinstance(data, list):
+            for item in data: self._handle_ticker(item)
+        elif isinstance(data, dict) and data.get("e") == "24hrMiniTicker": self._handle_ticker(data)
+        elif isinstance(data, dict) and data.get("e") == "kline": self._handle_kline(data)
+
+    def _handle_ticker(self, item):
+        coin = coin_from_symbol(str(item.get("s", "")))
+        if not coin: return
+        ltp, open_ = float(item.get("c", 0)), float(item.get("o", 0))
+        chg = ltp - open_
+        pct = (chg / open_) * 100 if open_ > 0 else 0.0
+        self.table.update_ticker(coin, ltp, chg, pct)
+        self.breadth.update(coin, ltp, pct, float(item.get("h", 0)), float(item.get("q", 0)))
+        for fn in self.listeners:
+            try: fn(coin, ltp)
+            except: error("stream.listener")
+
+    def _handle_kline(self, data):
+        k = data.get("k", {})
+        row = [int(k["t"]), float(k["o"]), float(k["h"]), float(k["l"]), float(k["c"]), float(k["v"]), int(k["T"])]
+        self.table.update_candle(k["s"], k["i"], row, bool(k.get("x")))
+        if k.get("x"):
+            # Candles close together on the interval boundary: gather them for one SQLite
+            # transaction on the writer thread instead of a commit per candle on the loop.
+            self._closed.setdefault((k["s"], k["i"]), {})[row[0]] = row
+            if self._flush_handle is None: self._flush_handle = asyncio.get_running_loop().call_later(STORE_BATCH_DELAY, self._flush)
+
+    def _flush(self):
+        batch, self._closed, self._flush_handle = self._closed, {}, None
+        if not batch: return
+        done = asyncio.get_running_loop().run_in_executor(self._writer, store_klines_many, {key: list(rows.values()) for key, rows in batch.items()})
+        done.add_done_callback(lambda f: f.cancelled() or f.exception() is None or error("stream.store"))
+
+    async def _run(self):
+        delay = 1.0
+        while True:
+            try:
+                if self.replay_file: await self._replay()
+                else: await self._listen()
+                delay = 1.0
+            except asyncio.CancelledError: raise
+            except Exception: error("stream.connection")
+            self.status["connected"] = False
+            self.status["reconnects"] += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    async def _listen(self):
+        record = open(self.record_file, "a", encoding="utf-8") if self.record_file else None
+        try:
+            async with websockets.connect(self.url, ping_interval=20, max_size=None) as ws:
+                self._ws = ws
+                self.status["connected"] = True
+                await self._send("SUBSCRIBE", sorted(self.streams))
+                async for raw in ws:
+                    msg = json.loads(raw)
+                    if "result" in msg and "id" in msg: continue
+                    if record: record.write(json.dumps({**msg, "_ts": int(time.time() * 1000)}) + "\n")
+                    self.handle(msg)
+        finally:
+            self._ws = None
+            if record: record.close()
+
+    async def _replay(self):
+        self.status["connected"] = True
+        prev_ts = None
+        with open(self.replay_file, encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip(): continue
+                msg = json.loads(line)
+                ts = msg.pop("_ts", None)
+                if ts is not None and prev_ts is not None and self.replay_speed > 0:
+                    await asyncio.sleep(max(0.0, (ts - prev_ts) / 1000.0 / self.replay_speed))
+                prev_ts = ts if ts is not None else prev_ts
+                self.handle(msg)
+                await asyncio.sleep(0)
+        # Hold the last replayed state instead of looping, like an exchange that went quiet.
+        await asyncio.Event().wait()
@@ -0,0 +1,166 @@
+import threading
+import time
+from collections import deque
+import numpy as np
+from candle_store import INTERVAL_MS, add_store_listener
+from resampler import add_resample_listener, read_interval
+
+# --- Incremental MDF Physics ---
+# One MDFState per (symbol, interval) keeps the 14 RSI deltas, the 20-bar volume window and the
+# current bull/bear run as running sums, so a closed candle is an O(1) update instead of a full
+# recompute. States are seeded from the candle store on first use and then fed by every
+# store_klines write (REST sync and closed stream candles), or by the resampler for intervals
+# derived from a base feed. The forming candle is only previewed,
+# never committed. calculate_mdf_physics is the from-scratch reference both paths must match.
+RSI_LEN = 14
+VOL_LEN = 20
+MIN_BARS = 20
+ELP_CAP = 14
+SEED_BARS = 60
+CATCH_UP_BARS = 5
+RESUM_EVERY = 1000
+NEUTRAL_PHYSICS = (50, "NEUTRAL", 2.5, 8.0, 0, 15.0, 100, 10, 50)
+
+_lock = threading.Lock()
+_states = {}
+
+def _physics(rsi, bull_run, bear_run, vol_spike):
+    momentum_strength = abs(rsi - 50) / 50.0
+    energy_pct = max(5, min(100, int(momentum_strength * 100)))
+    phase = "BULL" if rsi >= 50 else "BEAR"
+    e0 = round(1.0 + (momentum_strength * 4.0), 2)
+    half_life = round(max(3.0, 15.0 - (momentum_strength * 10)), 1)
+    elp_bars = bull_run if phase == "BULL" else bear_run
+    decay_eta = round(max(0.0, (half_life * 3.0) - elp_bars), 1)
+    impulses = int(min(max(vol_spike * 150, 50), 999))
+    exhaustions = int(min(max((1.0 - momentum_strength) * 80, 5), 150))
+    divergences = int(min(max(abs(rsi - 50) * 1.5, 10), 200))
+    return energy_pct, phase, e0, half_life, elp_bars, decay_eta, impulses, exhaustions, divergences
+
+def _rsi(roll_up, roll_down):
+    rs = roll_up / roll_down if roll_down != 0 else 1.0
+    return 100.0 - (100.0 / (1.0 + rs)) if roll_down != 0 else 100.0
+
+def calculate_mdf_physics(df):
+    if df.empty or len(df) < MIN_BARS: return NEUTRAL_PHYSICS
+    closes = df['Close'].values
+    volumes = df['Volume'].values
+
+    deltas = np.diff(closes)
+    up = np.where(deltas > 0, deltas, 0)
+    down = np.where(deltas < 0, -deltas, 0)
+    rsi = _rsi(np.mean(up[-RSI_LEN:]), np.mean(down[-RSI_LEN:]))
+
+    bull_run = bear_run = 0
+    for i in range(1, min(ELP_CAP + 1, len(closes))):
+        if closes[-i] >= closes[-i-1]:
+            if bear_run: break
+            bull_run += 1
+        else:
+            if bull_run: break
+            bear_run += 1
+
+    vol_spike = volumes[-1] / (np.mean(volumes[-VOL_LEN:]) + 1e-9)
+    return _physics(rsi, bull_run, bear_run, vol_spike)
+
+class MDFState:
+    def __init__(self, interval=None):
+        self.step = INTERVAL_MS.get(interval)
+        self.ups, self.downs, self.vols = deque(maxlen=RSI_LEN), deque(maxlen=RSI_LEN), deque(maxlen=VOL_LEN)
+        self.up_sum = self.down_sum = self.vol_sum = 0.0
+        self.bull_run = self.bear_run = 0
+        self.last_open = self.last_close = None
+        self.forming = None
+        self.bars = 0
+        self.stale = False
+
+    def push(self, open_time, close, volume):
+        if self.last_close is not None:
+            delta = close - self.last_close
+            up, down = (delta, 0.0) if delta > 0 else (0.0, -delta)
+            if len(self.ups) == RSI_LEN:
+                self.up_sum -= self.ups[0]
+                self.down_sum -= self.downs[0]
+            self.ups.append(up)
+            self.downs.append(down)
+            self.up_sum += up
+            self.down_sum += down
+            if delta >= 0: self.bull_run, self.bear_run = min(self.bull_run + 1, ELP_CAP), 0
+            else: self.bull_run, self.bear_run = 0, min(self.bear_run + 1, ELP_CAP)
+        if len(self.vols) == VOL_LEN: self.vol_sum -= self.vols[0]
+        self.vols.append(volume)
+        self.vol_sum += volume
+        self.last_open, self.last_close = open_time, close
+        self.bars += 1
+        # Re-add the windows now and then so float drift in the running sums cannot build up.
+        if self.bars % RESUM_EVERY == 0:
+            self.up_sum, self.down_sum, self.vol_sum = sum(self.ups), sum(self.downs), sum(self.vols)
+
+    def update(self, rows, now_ms=None, strict=True):
+        # Rows are klines in open-time order; bars already committed are ignored. In strict mode a
+        # hole in the sequence marks the state stale so the registry reseeds it from the store.
+        now_ms = now_ms or int(time.time() * 1000)
+        for r in rows:
+            t = int(r[0])
+            if self.forming is not None and t >= self.forming[0]:
+                if t > self.forming[0]: self.push(self.forming[0], self.forming[4], self.forming[5])
+                self.forming = None
+            if self.last_open is not None and t <= self.last_open: continue
+            if strict and self.step and self.last_open is not None and t - self.last_open > self.step:
+                self.stale = True
+                return
+            row = (t, float(r[1]), float(r[2]), float(r[3]), float(r[4]), float(r[5]), int(r[6]))
+            if row[6] < now_ms: self.push(t, row[4], row[5])
+            else: self.forming = row
+
+    def value(self, forming=None):
+        # Physics for the committed bars plus the forming candle (streamed one preferred), without mutating state.
+        if forming is None or (self.forming is not None and int(forming[0]) < self.forming[0]): forming = self.forming
+        if forming is not None and self.last_open is not None and int(forming[0]) <= self.last_open: forming = None
+        if self.bars + (forming is not None) < MIN_BARS: return None
+
+        up_sum, down_sum, vol_sum, last_vol = self.up_sum, self.down_sum, self.vol_sum, self.vols[-1]
+        bull_run, bear_run = self.bull_run, self.bear_run
+        if forming is not None:
+            delta, volume = float(forming[4]) - self.last_close, float(forming[5])
+            if len(self.ups) == RSI_LEN:
+                up_sum -= self.ups[0]
+                down_sum -= self.downs[0]
+            up_sum += max(delta, 0.0)
+            down_sum += max(-delta, 0.0)
+            if len(self.vols) == VOL_LEN: vol_sum -= self.vols[0]
+            vol_sum += volume
+            last_vol = volume
+            if delta >= 0: bull_run, bear_run = min(bull_run + 1, ELP_CAP), 0
+            else: bull_run, bear_run = 0, min(bear_run + 1, ELP_CAP)
+        rsi = _rsi(max(up_sum, 0.0) / RSI_LEN, max(down_sum, 0.0) / RSI_LEN)
+        return _physics(rsi, bull_run, bear_run, last_vol / (vol_sum / VOL_LEN + 1e-9))
+
+# --- Registry ---
+def _on_store(symbol, interval, rows):
+    # Runs on writer threads: the lookup and the update both happen under the registry lock.
+    with _lock:
+        state = _states.get((symbol, interval))
+        if state is not None: state.update(rows)
+
+def get_mdf_state(symbol, interval):
+    # The cold seed runs outside the registry lock so it never holds up store listeners; bars
+    # written while it ran are caught up from the store once the state is registered.
+    key = (symbol, interval)
+    with _lock: state = _states.get(key)
+    if state is not None and not state.stale: return state
+    seeded = MDFState(interval)
+    seeded.update(read_interval(symbol, interval, SEED_BARS).to_numpy(), strict=False)
+    with _lock:
+        state = _states.get(key)
+        if state is None or state.stale:
+            state = _states[key] = seeded
+            state.update(read_interval(symbol, interval, CATCH_UP_BARS).to_numpy(), strict=False)
+    return state
+
+def mdf_physics(symbol, interval, forming=None):
+    state = get_mdf_state(symbol, interval)
+    with _lock: return state.value(forming)
+
+add_store_listener(_on_store)
+add_resample_listener(_on_store)
@@ -0,0 +1,176 @@
+import bisect
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- Instrumentation ---
+# Process-wide counters and latency histograms for the fetch, scan, trade-monitor and render
+# paths. Recording is one dict update under a lock, cheap enough for every request and tick.
+# prometheus_text() renders the registry in the Prometheus text format; the standalone worker and
+# monitor serve it on /metrics when METRICS_PORT is set, the dashboard shows it on the settings page.
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0") or 0)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HELP = {
+    "http_request_seconds": ("histogram", "Exchange HTTP request latency by host and endpoint."),
+    "http_requests_total": ("counter", "Exchange HTTP responses by host, endpoint and status."),
+    "http_errors_total": ("counter", "Exchange HTTP failures (transport errors, timeouts, bad payloads)."),
+    "http_retries_total": ("counter", "Exchange HTTP requests retried after a transport error, 5xx or throttle."),
+    "http_cancelled_total": ("counter", "Exchange HTTP requests cancelled at a scan deadline or when the caller stopped waiting."),
+    "scan_stragglers_total": ("counter", "Coins whose candles had not arrived by the scan deadline, scanned on stored bars."),
+    "cache_requests_total": ("counter", "Cache lookups by cache and result."),
+    "fallback_total": ("counter", "Fallbacks taken (CoinDCX to Binance, exchange to yfinance, worker to inline scan)."),
+    "errors_total": ("counter", "Errors swallowed so the dashboard keeps rendering, by call site."),
+    "stage_seconds": ("histogram", "Duration of fetch, scan and monitor stages."),
+    "render_seconds": ("histogram", "Streamlit script time per page section."),
+    "order_seconds": ("histogram", "Order API round trip by endpoint (create, status, cancel)."),
+    "orders_total": ("counter", "Orders sent by bracket role and exchange answer."),
+}
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def inc(name, value=1, **labels):
+    key = _key(name, labels)
+    with _lock: _counters[key] = _counters.get(key, 0) + value
+
+def observe(name, seconds, **labels):
+    key = _key(name, labels)
+    with _lock:
+        h = _histograms.get(key)
+        if h is None: h = _histograms[key] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0, 0.0]
+        h[0][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        h[1] += seconds
+        h[2] += 1
+        h[3] = max(h[3], seconds)
+
+@contextmanager
+def timer(name, **labels):
+    start = time.perf_counter()
+    try: yield
+    finally: observe(name, time.perf_counter() - start, **labels)
+
+def timed(name, **labels):
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with timer(name, **labels): return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+def stage(name):
+    return timer("stage_seconds", stage=name)
+
+def error(where):
+    inc("errors_total", where=where)
+
+def cache_result(cache, result, n=1):
+    if n: inc("cache_requests_total", n, cache=cache, result=result)
+
+def fallback(kind, n=1):
+    if n: inc("fallback_total", n, kind=kind)
+
+class Stopwatch:
+    # Laps of one script run: lap(section) records the time since the previous lap.
+    def __init__(self, name="render_seconds"):
+        self.name = name
+        self.start = self.last = time.perf_counter()
+
+    def lap(self, section):
+        now = time.perf_counter()
+        observe(self.name, now - self.last, section=section)
+        self.last = now
+
+    def total(self, section="total"):
+        observe(self.name, time.perf_counter() - self.start, section=section)
+
+# --- Readout ---
+def _quantile(counts, total, q):
+    # Linear interpolation inside the bucket holding the q-th observation, as histogram_quantile does.
+    if not total: return 0.0
+    rank, seen = q * total, 0
+    for i, c in enumerate(counts):
+        if c and seen + c >= rank:
+            if i == len(LATENCY_BUCKETS): return LATENCY_BUCKETS[-1]
+            lo = LATENCY_BUCKETS[i - 1] if i else 0.0
+            return lo + (LATENCY_BUCKETS[i] - lo) * (rank - seen) / c
+        seen += c
+    return LATENCY_BUCKETS[-1]
+
+def counters(name):
+    with _lock: items = [(dict(labels), v) for (n, labels), v in _counters.items() if n == name]
+    return [{**labels, "count": v} for labels, v in sorted(items, key=lambda x: -x[1])]
+
+def histograms(name):
+    with _lock: items = [(dict(labels), list(h[0]), h[1], h[2], h[3]) for (n, labels), h in _histograms.items() if n == name]
+    rows = [{**labels, "count": total, "mean_ms": round(s / total * 1000, 2), "p50_ms": round(_quantile(c, total, 0.5) * 1000, 2),
+             "p95_ms": round(_quantile(c, total, 0.95) * 1000, 2), "max_ms": round(mx * 1000, 2), "total_s": round(s, 2)}
+            for labels, c, s, total, mx in items if total]
+    return sorted(rows, key=lambda r: -r["total_s"])
+
+def hit_ratios():
+    # {cache: (hits, lookups)}; every result other than a miss or a fetch counts as served from cache.
+    out = {}
+    for row in counters("cache_requests_total"):
+        hits, total = out.get(row["cache"], (0, 0))
+        out[row["cache"]] = (hits + (row["result"] not in ("miss", "fetch")) * row["count"], total + row["count"])
+    return out
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs: return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in pairs) + "}"
+
+def prometheus_text():
+    with _lock:
+        counter_items = sorted(_counters.items())
+        hist_items = sorted((k, (list(h[0]), h[1], h[2])) for k, h in _histograms.items())
+    lines, described = [], set()
+    def describe(name, kind):
+        if name in described: return
+        described.add(name)
+        lines.append(f"# HELP {name} {HELP.get(name, ('', name))[1]}")
+        lines.append(f"# TYPE {name} {kind}")
+    for (name, labels), value in counter_items:
+        describe(name, "counter")
+        lines.append(f"{name}{_labels(labels)} {value}")
+    for (name, labels), (counts, total_s, total) in hist_items:
+        describe(name, "histogram")
+        cumulative = 0
+        for bound, c in zip(LATENCY_BUCKETS, counts):
+            cumulative += c
+            lines.append(f"{name}_bucket{_labels(labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{name}_bucket{_labels(labels, [('le', '+Inf')])} {total}")
+        lines.append(f"{name}_sum{_labels(labels)} {total_s}")
+        lines.append(f"{name}_count{_labels(labels)} {total}")
+    return "\n".join(lines) + "\n"
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args): pass
+
+    def do_GET(self):
+        body = prometheus_text().encode()
+        self.send_response(200 if self.path.startswith("/metrics") else 404)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def serve_metrics(port=METRICS_PORT):
+    if not port: return None
+    server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,203 @@
+import argparse
+import itertools
+import math
+import multiprocessing
+import os
+import sys
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import resource_tracker, shared_memory
+from backtest import DEFAULT_FEE_PCT, DEFAULT_POSITION_PCT, load_history, simulate_breakout
+from scan_engine import DEFAULT_PARAMS
+
+# --- Parameter Sweep & Walk-Forward Optimizer ---
+# Candle arrays are loaded once in the parent and published as one shared-memory block per
+# (symbol, interval). Worker processes map them without copying and run the breakout
+# backtest for chunks of the parameter grid. Results are aggregated per (params, interval)
+# across symbols and ranked. Workers are spawned, not forked: the caller may be a threaded
+# Streamlit server. Run from the CLI (`python optimizer.py --help`) or from the Backtest page.
+DEFAULT_GRID = {"donchian": [8, 10, 14, 20], "sl_lookback": [5, 8, 12], "rsi_len": [9, 14, 21], "reward": [2.0, 3.0, 4.0]}
+RANK_METRICS = ["Equity Return %", "Total P&L %", "Profit Factor", "Win Rate %", "Max Drawdown %"]
+FIELDS = ["Open time", "Open", "High", "Low", "Close"]
+TASKS_PER_WORKER = 4
+
+_DATA = {}
+_SHM = []
+
+def expand_grid(grid):
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+def trade_stats(pnl, position_pct=DEFAULT_POSITION_PCT):
+    if len(pnl) == 0: return {"Trades": 0, "Win Rate %": 0.0, "Total P&L %": 0.0, "Equity Return %": 0.0, "Max Drawdown %": 0.0, "Profit Factor": 0.0}
+    equity = np.cumprod(1 + (pnl / 100) * (position_pct / 100))
+    peak = np.maximum.accumulate(np.concatenate([[1.0], equity]))[1:]
+    wins, losses = pnl[pnl > 0].sum(), pnl[pnl <= 0].sum()
+    return {"Trades": len(pnl), "Win Rate %": round(float((pnl > 0).mean() * 100), 2), "Total P&L %": round(float(pnl.sum()), 2),
+            "Equity Return %": round(float(equity[-1] - 1) * 100, 2), "Max Drawdown %": round(float((equity / peak - 1).min() * 100), 2),
+            "Profit Factor": round(float(wins / abs(losses)), 2) if losses < 0 else float("inf")}
+
+# --- Shared memory plumbing ---
+def publish(datasets):
+    specs, blocks = {}, []
+    for key, data in datasets.items():
+        arr = np.vstack([np.asarray(data[f], dtype=float) for f in FIELDS])
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, dtype=float, buffer=shm.buf)[:] = arr
+        specs[key] = (shm.name, arr.shape)
+        blocks.append(shm)
+    return specs, blocks
+
+def _attach(name):
+    # Only the parent owns (and unlinks) a block, so a worker attaching must not register it with
+    # the resource tracker. Before 3.13 there is no track=False: registration is skipped for the
+    # call instead of undone, because spawned workers share the parent's tracker and an
+    # unregister would drop the parent's own entry.
+    if sys.version_info >= (3, 13): return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try: return shared_memory.SharedMemory(name=name)
+    finally: resource_tracker.register = register
+
+def _init_worker(specs):
+    for key, (name, shape) in specs.items():
+        shm = _attach(name)
+        _SHM.append(shm)
+        _DATA[key] = np.ndarray(shape, dtype=float, buffer=shm.buf)
+
+def _dataset_view(key, lo, hi):
+    arr = _DATA[key]
+    return {f: arr[i, lo:hi] for i, f in enumerate(FIELDS)}
+
+def _run_chunk(key, window, combos, warmup, fee_pct):
+    # Each window is simulated with `warmup` extra bars in front so indicators are primed,
+    # but only trades entered inside the window are counted.
+    lo, hi = window[0], window[1]
+    data = _dataset_view(key, max(0, lo - warmup), hi)
+    first_ms = _DATA[key][0, lo] if lo < _DATA[key].shape[1] else np.inf
+    out = []
+    for idx, params in combos:
+        trades = [t for t in simulate_breakout(data, key[0], params, fee_pct) if t["entry_ms"] >= first_ms]
+        out.append((idx, np.array([t["exit_ms"] for t in trades], dtype=float), np.array([t["P&L %"] for t in trades], dtype=float)))
+    return key, window, out
+
+# --- Sweeps ---
+def _evaluate(specs, jobs, combos, warmup, fee_pct, workers):
+    # jobs: [(dataset key, window)] -> {(combo idx, interval, window tag): [(exit_ms, pnl), ...]}
+    chunk = max(1, math.ceil(len(combos) / max(1, workers * TASKS_PER_WORKER // max(1, len(jobs)))))
+    indexed = list(enumerate(combos))
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker, initargs=(specs,)) as pool:
+        futures = [pool.submit(_run_chunk, key, window, indexed[i:i + chunk], warmup, fee_pct) for key, window in jobs for i in range(0, len(indexed), chunk)]
+        for fut in as_completed(futures):
+            key, window, out = fut.result()
+            for idx, exit_ms, pnl in out: results.setdefault((idx, key[1], window[2] if len(window) > 2 else 0), []).append((exit_ms, pnl))
+    return results
+
+def _ranked(results, combos, position_pct, metric, min_trades):
+    rows = []
+    for (idx, interval, tag), parts in results.items():
+        exit_ms = np.concatenate([p[0] for p in parts])
+        pnl = np.concatenate([p[1] for p in parts])[np.argsort(exit_ms, kind="stable")]
+        rows.append({"Interval": interval, "Fold": tag, **combos[idx], **trade_stats(pnl, position_pct)})
+    df = pd.DataFrame(rows)
+    if df.empty: return df
+    # Higher is better for every ranking metric (drawdown is negative, so closer to zero ranks first).
+    return df[df["Trades"] >= min_trades].sort_values(metric, ascending=False, ignore_index=True)
+
+def load_datasets(symbols, intervals, days):
+    datasets = {}
+    for symbol in symbols:
+        for interval in intervals:
+            data = load_history(symbol, interval, days)
+            if len(data["Close"]): datasets[(symbol, interval)] = data
+    return datasets
+
+def _warmup(grid):
+    return max(max(grid.get(k, [DEFAULT_PARAMS[k]])) for k in ("donchian", "sl_lookback", "rsi_len")) + 2
+
+def sweep(symbols, intervals, days=90, grid=None, fee_pct=DEFAULT_FEE_PCT, position_pct=DEFAULT_POSITION_PCT, metric="Equity Return %", min_trades=5, workers=None, datasets=None):
+    grid = grid or DEFAULT_GRID
+    combos = expand_grid(grid)
+    datasets = datasets if datasets is not None else load_datasets(symbols, intervals, days)
+    if not datasets or not combos: return pd.DataFrame()
+    workers = workers or os.cpu_count() or 1
+    specs, blocks = publish(datasets)
+    try:
+        jobs = [(key, (0, len(data["Close"]))) for key, data in datasets.items()]
+        results = _evaluate(specs, jobs, combos, _warmup(grid), fee_pct, workers)
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+    return _ranked(results, combos, position_pct, metric, min_trades).drop(columns=["Fold"], errors="ignore")
+
+def walk_forward(symbols, interval, days=180, grid=None, folds=4, train_frac=0.7, fee_pct=DEFAULT_FEE_PCT, position_pct=DEFAULT_POSITION_PCT, metric="Equity Return %", min_trades=5, workers=None, datasets=None):
+    # Each fold: optimise on its first train_frac of bars, then score the winner on the rest (out of sample).
+    grid = grid or DEFAULT_GRID
+    combos = expand_grid(grid)
+    datasets = datasets if datasets is not None else load_datasets(symbols, [interval], days)
+    if not datasets or not combos: return pd.DataFrame(), {}
+    workers = workers or os.cpu_count() or 1
+    warmup = _warmup(grid)
+    specs, blocks = publish(datasets)
+    try:
+        train_jobs, test_windows = [], {}
+        for key, data in datasets.items():
+            n = len(data["Close"])
+            bounds = np.linspace(0, n, folds + 1).astype(int)
+            for f in range(folds):
+                split = bounds[f] + int((bounds[f + 1] - bounds[f]) * train_frac)
+                train_jobs.append((key, (int(bounds[f]), int(split), f)))
+                test_windows.setdefault(f, []).append((key, (int(split), int(bounds[f + 1]), f)))
+        train = _ranked(_evaluate(specs, train_jobs, combos, warmup, fee_pct, workers), combos, position_pct, metric, min_trades)
+        rows, oos_parts = [], []
+        for f in range(folds):
+            fold_train = train[train["Fold"] == f] if not train.empty else train
+            if fold_train.empty: continue
+            best = {k: fold_train.iloc[0][k] for k in grid}
+            best = {k: type(grid[k][0])(v) for k, v in best.items()}
+            test = _evaluate(specs, test_windows[f], [best], warmup, fee_pct, min(workers, len(test_windows[f])))
+            parts = [p for v in test.values() for p in v]
+            exit_ms = np.concatenate([p[0] for p in parts]) if parts else np.array([])
+            pnl = np.concatenate([p[1] for p in parts])[np.argsort(exit_ms, kind="stable")] if parts else np.array([])
+            oos_parts.append((exit_ms, pnl))
+            rows.append({"Fold": f, **best, **{f"Train {m}": fold_train.iloc[0][m] for m in ("Trades", metric)}, **{f"Test {m}": v for m, v in trade_stats(pnl, position_pct).items()}})
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+    all_exit = np.concatenate([p[0] for p in oos_parts]) if oos_parts else np.array([])
+    all_pnl = np.concatenate([p[1] for p in oos_parts])[np.argsort(all_exit, kind="stable")] if oos_parts else np.array([])
+    return pd.DataFrame(rows), trade_stats(all_pnl, position_pct)
+
+def parse_grid(text_by_param):
+    grid = {}
+    for key, text in text_by_param.items():
+        cast = float if isinstance(DEFAULT_PARAMS[key], float) else int
+        values = [cast(v) for v in str(text).replace(" ", "").split(",") if v]
+        if values: grid[key] = values
+    return grid
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep / walk-forward the MDF + Donchian breakout over stored klines.")
+    parser.add_argument("--symbols", default="BTCUSDT,ETHUSDT,SOLUSDT,BNBUSDT,XRPUSDT")
+    parser.add_argument("--intervals", default="15m,1h")
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--metric", default="Equity Return %", choices=RANK_METRICS)
+    parser.add_argument("--min-trades", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--walk-forward", type=int, default=0, metavar="FOLDS")
+    parser.add_argument("--top", type=int, default=20)
+    for key in DEFAULT_GRID: parser.add_argument(f"--{key.replace('_', '-')}", default=",".join(str(v) for v in DEFAULT_GRID[key]))
+    args = parser.parse_args()
+    grid = parse_grid({key: getattr(args, key) for key in DEFAULT_GRID})
+    symbols, intervals = args.symbols.split(","), args.intervals.split(",")
+    pd.set_option("display.width", 200)
+    if args.walk_forward:
+        for interval in intervals:
+            folds_df, oos = walk_forward(symbols, interval, args.days, grid, args.walk_forward, metric=args.metric, min_trades=args.min_trades, workers=args.workers)
+            print(f"\n=== Walk-forward {interval} ===\n{folds_df.to_string(index=False)}\nOut of sample: {oos}")
+    else:
+        print(sweep(symbols, intervals, args.days, grid, metric=args.metric, min_trades=args.min_trades, workers=args.workers).head(args.top).to_string(index=False))
@@ -0,0 +1,148 @@
+import os
+import threading
+import numpy as np
+from metrics import error
+from results_store import publish, read_result
+from shared_cache import shared_cached
+from trade_store import journal_revision, trade_state
+
+# --- Portfolio Risk Engine ---
+# Every running trade is one row of columnar arrays (side, entry, stop, quantity, liquidation), so
+# a price tick is a few array operations over the whole book instead of a loop over trades. Margin
+# and liquidation follow isolated-margin futures with a maintenance margin rate. Correlated
+# drawdown uses the covariance of per-bar log returns from the candle store, rebuilt only when the
+# coins change or it ages out, so a tick pays for one w'Σw. New signals are sized to the same budget:
+# one server-side budget (env defaults, overridden from the Risk page via the results store) that
+# every session and the auto trader share.
+DEFAULT_BUDGET = {
+    "capital": float(os.environ.get("RISK_CAPITAL", 1000.0)),
+    "risk_pct": float(os.environ.get("RISK_PER_TRADE_PCT", 1.0)),
+    "leverage": float(os.environ.get("RISK_LEVERAGE", 10.0)),
+    "maint_pct": float(os.environ.get("RISK_MAINT_MARGIN_PCT", 0.5)),
+    "max_heat_pct": float(os.environ.get("RISK_MAX_HEAT_PCT", 20.0)),
+    "max_margin_pct": float(os.environ.get("RISK_MAX_MARGIN_PCT", 100.0)),
+}
+RETURNS_INTERVAL = "1h"
+RETURNS_BARS = 500
+COVARIANCE_MAX_AGE = 300
+DRAWDOWN_Z = 2.33
+DRAWDOWN_HORIZON = 24
+
+RISK_BUDGET_KEY = "risk_budget"
+
+_book_lock = threading.Lock()
+_book = [None, None]
+
+def risk_budget():
+    return {**DEFAULT_BUDGET, **(read_result(RISK_BUDGET_KEY) or {})}
+
+def save_risk_budget(budget):
+    publish(RISK_BUDGET_KEY, {k: float(v) for k, v in budget.items() if k in DEFAULT_BUDGET})
+
+def liquidation_price(side, entry, leverage, maint_pct):
+    # Isolated margin: liquidated once margin + P&L falls to the maintenance margin on the position's value.
+    mmr = maint_pct / 100
+    return np.where(np.asarray(side) > 0, entry * (1 - 1 / leverage) / (1 - mmr), entry * (1 + 1 / leverage) / (1 + mmr))
+
+def risk_quantity(entry, sl, budget):
+    # Coins that lose risk_pct of capital if the stop is hit.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.nan_to_num(budget["capital"] * budget["risk_pct"] / 100 / np.abs(np.asarray(entry, dtype=float) - sl), nan=0.0, posinf=0.0)
+
+@shared_cached(ttl=COVARIANCE_MAX_AGE)
+def return_matrix(coins, interval=RETURNS_INTERVAL, bars=RETURNS_BARS):
+    # (bars x coins) log returns, 0 where a coin has no stored bar; coins with no history at all are listed.
+    from resampler import read_interval_batch, sync_interval
+    symbols = [c.replace('-USD', 'USDT') for c in coins]
+    try: sync_interval(symbols, interval, bars=bars + 1)
+    except: error("portfolio.sync")
+    found, cube = read_interval_batch(symbols, interval, bars + 1, min_bars=2)
+    returns = np.zeros((bars, len(coins)))
+    if found:
+        with np.errstate(divide='ignore', invalid='ignore'): r = np.nan_to_num(np.diff(np.log(cube["Close"]), axis=1), nan=0.0, posinf=0.0, neginf=0.0)
+        col = {s: i for i, s in enumerate(symbols)}
+        returns[:, [col[s] for s in found]] = r.T
+    return returns, [c for c, s in zip(coins, symbols) if s not in found]
+
+class PortfolioBook:
+    def __init__(self, trades, budget=None):
+        b = self.budget = {**DEFAULT_BUDGET, **(budget or {})}
+        self.trades = list(trades)
+        self.coins = [t['Stock'] for t in self.trades]
+        self.side = np.array([1.0 if t['Signal'] == 'BUY' else -1.0 for t in self.trades])
+        self.entry = np.array([float(t['Entry']) for t in self.trades])
+        self.sl = np.array([float(t['SL']) for t in self.trades])
+        qty = np.array([float(t.get('Qty') or 0) for t in self.trades])
+        # Trades journaled before sizing existed carry no quantity: they are sized to the budget.
+        self.qty = np.where(qty > 0, qty, risk_quantity(self.entry, self.sl, b))
+        self.margin = self.qty * self.entry / b["leverage"]
+        self.liq = liquidation_price(self.side, self.entry, b["leverage"], b["maint_pct"])
+        # A stop on the far side of the liquidation price never gets the chance to fire.
+        self.stop_after_liq = self.side * (self.sl - self.liq) <= 0
+        col = {c: i for i, c in enumerate(dict.fromkeys(self.coins))}
+        self.assets = list(col)
+        self.asset_col = np.array([col[c] for c in self.coins], dtype=np.intp)
+        self.returns, self.no_history = np.zeros((0, len(self.assets))), []
+        self.cov = np.zeros((len(self.assets), len(self.assets)))
+
+    def load_returns(self, interval=RETURNS_INTERVAL, bars=RETURNS_BARS):
+        if not self.assets: return self
+        self.returns, self.no_history = return_matrix(tuple(self.assets), interval, bars)
+        self.cov = np.atleast_2d(np.cov(self.returns, rowvar=False)) if len(self.returns) > 1 else self.cov
+        return self
+
+    def evaluate(self, prices):
+        # prices line up with self.coins; an unquoted coin (0) is marked at its entry.
+        b = self.budget
+        price = np.where(prices > 0, prices, self.entry)
+        notional = self.qty * price
+        exposure = self.side * notional
+        pnl = self.side * (price - self.entry) * self.qty
+        to_stop = np.maximum(self.side * (price - self.sl), 0.0) * self.qty
+        with np.errstate(divide='ignore', invalid='ignore'): liq_dist = self.side * (price - self.liq) / price * 100
+        # Same-coin positions net out before the covariance is applied.
+        w = np.bincount(self.asset_col, weights=exposure, minlength=len(self.assets))
+        sigma = np.sqrt(np.maximum(w @ self.cov @ w, 0.0) * DRAWDOWN_HORIZON)
+        # The current book replayed over the stored bars: worst fall from a running peak (starting flat).
+        path = np.cumsum(self.returns @ w)
+        margin = float(self.margin.sum())
+        heat = float(to_stop.sum())
+        return {
+            "positions": {"Coin": self.coins, "Side": np.where(self.side > 0, "BUY", "SHORT"), "Qty": self.qty, "Entry": self.entry, "LTP": price,
+                          "Notional": notional, "Margin": self.margin, "P&L": pnl, "To Stop": to_stop, "Liq": self.liq, "Liq Dist %": liq_dist,
+                          "SL Past Liq": self.stop_after_liq},
+            "gross": float(notional.sum()), "net": float(exposure.sum()), "pnl": float(pnl.sum()),
+            "margin": margin, "margin_pct": margin / b["capital"] * 100, "heat": heat, "heat_pct": heat / b["capital"] * 100,
+            "drawdown": float(DRAWDOWN_Z * sigma), "drawdown_pct": float(DRAWDOWN_Z * sigma) / b["capital"] * 100,
+            "replay_drawdown": float(np.max(np.maximum.accumulate(np.maximum(path, 0.0)) - path)) if len(path) else 0.0,
+            "min_liq_dist": float(np.min(liq_dist)) if len(liq_dist) else None,
+        }
+
+def size_signals(signals, budget=None, heat=0.0, margin=0.0):
+    # Each signal risks risk_pct of capital to its stop, in scan order, until the heat (total risk
+    # to stops) or margin still free on the book runs out; the one that crosses the limit is scaled down.
+    b = {**DEFAULT_BUDGET, **(budget or risk_budget())}
+    if not signals: return []
+    entry = np.array([float(s['Entry']) for s in signals])
+    sl = np.array([float(s['SL']) for s in signals])
+    side = np.array([1.0 if s['Signal'] == 'BUY' else -1.0 for s in signals])
+    qty = risk_quantity(entry, sl, b)
+    risk = qty * np.abs(entry - sl)
+    need = qty * entry / b["leverage"]
+    heat_room = np.maximum(b["capital"] * b["max_heat_pct"] / 100 - heat - (np.cumsum(risk) - risk), 0.0)
+    margin_room = np.maximum(b["capital"] * b["max_margin_pct"] / 100 - margin - (np.cumsum(need) - need), 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'): scale = np.nan_to_num(np.minimum(1.0, np.minimum(heat_room / risk, margin_room / need)), nan=0.0)
+    qty = qty * scale
+    liq = liquidation_price(side, entry, b["leverage"], b["maint_pct"])
+    return [{**s, "Qty": float(q), "Notional": float(q * e), "Margin": float(q * e / b["leverage"]), "Risk": float(q * abs(e - x)), "Liq": float(l), "SL Past Liq": bool(d * (x - l) <= 0)}
+            for s, q, e, x, l, d in zip(signals, qty, entry, sl, liq, side)]
+
+def portfolio_book(budget=None):
+    # One book per journal revision and budget, shared by every session. Returns are loaded by whoever needs them.
+    budget = {**DEFAULT_BUDGET, **(budget or risk_budget())}
+    key = (journal_revision(), tuple(sorted(budget.items())))
+    with _book_lock:
+        if _book[0] == key: return _book[1]
+    book = PortfolioBook(trade_state()[0], budget)
+    with _book_lock: _book[:] = [key, book]
+    return book
@@ -0,0 +1,122 @@
+import asyncio
+import heapq
+import itertools
+import time
+from urllib.parse import urlsplit
+
+# --- Weight-Aware Request Scheduler ---
+# A token bucket per host, refilled continuously at the exchange's per-minute weight budget and
+# re-synced from Binance's X-MBX-USED-WEIGHT-1M header. Requests that do not fit are queued and
+# released in priority order, so the deep-analysis chart jumps ahead of background scans.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+WEIGHT_LIMITS = {"api.binance.com": 6000, "api.coindcx.com": 1200}
+DEFAULT_WEIGHT_LIMIT = 1200
+SAFETY_MARGIN = 0.9
+ENDPOINT_WEIGHTS = {"/api/v3/klines": 2, "/api/v3/ticker/24hr": 80, "/api/v3/ticker/price": 4, "/api/v3/exchangeInfo": 20}
+THROTTLE_STATUSES = {429, 418}
+DEFAULT_RETRY_AFTER = {429: 5.0, 418: 120.0}
+
+def request_weight(url, params=None):
+    path = urlsplit(url).path
+    if path == "/api/v3/ticker/24hr" and params and "symbol" in params: return 2
+    return ENDPOINT_WEIGHTS.get(path, 1)
+
+class HostBucket:
+    def __init__(self, limit):
+        self.limit = limit
+        self.capacity = limit * SAFETY_MARGIN
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.waiters = []
+        self.timer = None
+        self.stats = {"requests": 0, "weight": 0, "queued": 0, "wait_s": 0.0, "throttled_429": 0, "banned_418": 0, "server_used_weight": 0}
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+class WeightRateLimiter:
+    def __init__(self, limits=None):
+        self.limits = limits or WEIGHT_LIMITS
+        self.buckets = {}
+        self._seq = itertools.count()
+
+    def _bucket(self, url):
+        host = urlsplit(url).netloc
+        if host not in self.buckets: self.buckets[host] = HostBucket(self.limits.get(host, DEFAULT_WEIGHT_LIMIT))
+        return self.buckets[host]
+
+    async def acquire(self, url, params=None, priority=PRIORITY_BACKGROUND):
+        b = self._bucket(url)
+        weight = request_weight(url, params)
+        b.stats["requests"] += 1
+        b.stats["weight"] += weight
+        now = time.monotonic()
+        b.refill(now)
+        if not b.waiters and now >= b.blocked_until and b.tokens >= weight:
+            b.tokens -= weight
+            return 0.0
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(b.waiters, (priority, next(self._seq), weight, fut))
+        b.stats["queued"] += 1
+        self._schedule(b)
+        await fut
+        waited = time.monotonic() - now
+        b.stats["wait_s"] += waited
+        return waited
+
+    def _drain(self, b):
+        b.timer = None
+        now = time.monotonic()
+        b.refill(now)
+        while b.waiters and now >= b.blocked_until:
+            _, _, weight, fut = b.waiters[0]
+            if fut.cancelled():
+                heapq.heappop(b.waiters)
+                continue
+            if b.tokens < min(weight, b.capacity): break
+            heapq.heappop(b.waiters)
+            b.tokens -= weight
+            fut.set_result(None)
+        self._schedule(b)
+
+    def _schedule(self, b):
+        if b.timer is not None or not b.waiters: return
+        now = time.monotonic()
+        if now < b.blocked_until: delay = b.blocked_until - now
+        else: delay = max(0.0, (b.waiters[0][2] - b.tokens) / b.rate)
+        b.timer = asyncio.get_running_loop().call_later(delay, self._drain, b)
+
+    def observe(self, url, status, headers):
+        # Returns the enforced back-off in seconds (0 when the response was not throttled).
+        b = self._bucket(url)
+        used = headers.get("x-mbx-used-weight-1m") or headers.get("x-mbx-used-weight")
+        now = time.monotonic()
+        if used:
+            b.refill(now)
+            b.stats["server_used_weight"] = int(used)
+            b.tokens = min(b.tokens, max(0.0, b.capacity - int(used)))
+        if status not in THROTTLE_STATUSES: return 0.0
+        try: retry_after = float(headers.get("retry-after", DEFAULT_RETRY_AFTER[status]))
+        except ValueError: retry_after = DEFAULT_RETRY_AFTER[status]
+        b.stats["throttled_429" if status == 429 else "banned_418"] += 1
+        b.blocked_until = max(b.blocked_until, now + retry_after)
+        b.tokens = 0.0
+        return retry_after
+
+    def blocked_hosts(self):
+        now = time.monotonic()
+        return {host: round(b.blocked_until - now, 1) for host, b in self.buckets.items() if b.blocked_until > now}
+
+    def stats(self):
+        now = time.monotonic()
+        return {
+            host: {**b.stats, "wait_s": round(b.stats["wait_s"], 2), "limit_per_min": b.limit, "tokens": round(b.tokens, 1),
+                   "queue_depth": len(b.waiters), "blocked_for_s": round(max(0.0, b.blocked_until - now), 1)}
+            for host, b in list(self.buckets.items())
+        }
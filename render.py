@@ -0,0 +1,142 @@
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from metrics import cache_result
+
+# --- Panel Rendering ---
+# Every HTML panel on the main terminal is built here from row templates that are parsed once at
+# import (bound str.format), so a row is one format call instead of a chain of f-string pieces.
+# panel() keys the finished HTML on a digest of the panel's input: a rerun whose prices, signals or
+# trades have not moved gets the cached string back without touching a template, and every session
+# looking at the same data shares it. Tables that grow (the trade history) are paged by the caller,
+# so neither build time nor the payload sent to the browser grows with them.
+MAX_CACHED_PANELS = 512
+HISTORY_PAGE_SIZE = 25
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def fmt_price(val):
+    try:
+        val = float(val)
+        if math.isnan(val) or val == 0: return "0.00"
+        if abs(val) < 0.01: return f"{val:.6f}"
+        elif abs(val) < 1: return f"{val:.4f}"
+        else: return f"{val:,.2f}"
+    except: return "0.00"
+
+def get_tv_link(ticker):
+    sym = "BINANCE:" + ticker.replace("-USD", "USDT")
+    return f"https://in.tradingview.com/chart/?symbol={sym}"
+
+def get_internal_link(ticker):
+    return f"?coin={ticker}"
+
+def digest(data):
+    return hashlib.blake2b(repr(data).encode(), digest_size=16).digest()
+
+def panel(name, build, *args):
+    key = (name, digest(args))
+    with _cache_lock:
+        html = _cache.get(key)
+        if html is not None: _cache.move_to_end(key)
+    cache_result("render", "miss" if html is None else "hit")
+    if html is None:
+        html = build(*args)
+        with _cache_lock:
+            _cache[key] = html
+            while len(_cache) > MAX_CACHED_PANELS: _cache.popitem(last=False)
+    return html
+
+# --- Templates ---
+_ASSET = ("<a href='?coin={stock}' target='_self' title='Open Deep Analysis'>🔸 {stock}</a> "
+          "<a href='{tv}' target='_blank' style='font-size:10px;' title='Open TradingView'>🌐</a>").format
+_TABLE_OPEN = "<div class='table-container'><table class='v38-table'>"
+_TABLE_CLOSE = "</table></div>"
+_SECTOR = ("<details class='sector-details'><summary class='sector-summary'>"
+           "<div style='width: 45%; color:#003366; white-space: nowrap; overflow: hidden; text-overflow: ellipsis;'>📂 {sector}</div>"
+           "<div style='width: 25%; color:{color}; text-align: center;'>{sign}{pct:.2f}%</div>"
+           "<div style='width: 30%;'><div class='bar-bg'><div class='{bar}' style='width:{width}%;'></div></div></div>"
+           "</summary><div class='sector-content'>{chips}</div></details>").format
+_CHIP = "<a href='?coin={stock}' target='_self' class='stock-chip' style='color:{color};' title='Click to open chart'>{stock} ({sign}{pct:.2f}%)</a>".format
+_TREND_ROW = "<tr><td style='text-align:left; font-weight:bold;'>{asset}</td><td style='color:{color}; font-weight:bold;'>{status}</td></tr>".format
+_INDEX_BOX = ("<div class='idx-box'><a href='?coin={ticker}' target='_self' style='text-decoration:none; font-size:11px; color:#1a73e8; font-weight:bold;' title='Open Deep Analysis'>{name}</a> "
+              "<a href='{tv}' target='_blank' style='font-size:9px;' title='Open TradingView'>🌐</a><br><span style='font-size:15px; color:black; font-weight:bold;'>${val}</span><br>"
+              "<span style='color:{color}; font-size:11px; font-weight:bold;'>{sign}${chg} ({sign}{pct:.2f}%)</span></div>").format
+_ADV_DEC = ("<div class='adv-dec-container'><div class='adv-dec-bar'><div class='bar-green' style='width: {adv_pct}%;'></div><div class='bar-red' style='width: {dec_pct}%;'></div></div>"
+            "<div style='display:flex; justify-content:space-between; font-size:12px; font-weight:bold;'><span style='color:green;'>Advances: {adv}</span><span style='color:red;'>Declines: {dec}</span></div></div>").format
+_SIGNAL_ROW = ("<tr><td style='font-weight:bold;'>{asset}</td><td>${entry}</td><td>${ltp}</td><td style='color:white; background:{color}; font-weight:bold;'>{signal}</td>"
+               "<td>${sl}</td><td style='font-weight:bold; color:#856404;'>${target}</td><td>{time}</td></tr>").format
+_ACTIVE_ROW = ("<tr><td style='font-weight:bold;'>{asset}</td><td style='font-weight:bold;'>{signal}</td><td>${entry}</td><td>${ltp}</td>"
+               "<td style='color:{color}; font-weight:bold;'>{sign}${points} ({sign}{pnl:.2f}%)</td><td style='color:#856404;'>${target}</td><td style='color:#dc3545;'>${sl}</td><td>{date}</td></tr>").format
+_HISTORY_ROW = ("<tr><td style='font-weight:bold;'>{asset}</td><td style='font-weight:bold;'>{signal}</td><td>${entry}</td><td>${exit}</td>"
+                "<td style='color:{color}; font-weight:bold;'>{sign}${points} ({sign}{pnl:.2f}%)</td><td style='font-weight:bold;'>{status}</td><td>{date}</td></tr>").format
+_MOVER_ROW = "<tr><td style='text-align:left; font-weight:bold;'>{asset}</td><td>${ltp}</td><td style='color:{color}; font-weight:bold;'>{sign}{pct:.2f}%</td></tr>".format
+_COUNT_ROW = "<tr><td>{label}</td><td style='font-weight:bold;'>{count}</td></tr>".format
+_LEADER_ROW = "<tr><td style='text-align:left; font-weight:bold;'><a href='?coin={stock}' target='_self' title='Open Deep Analysis'>🔸 {stock}</a></td><td style='color:{color}; font-weight:bold;'>{pct:.2f}%</td></tr>".format
+
+def _asset(stock):
+    return _ASSET(stock=stock, tv=get_tv_link(stock))
+
+def _sign(x):
+    return ("green", "+") if x >= 0 else ("red", "")
+
+# --- Panels ---
+def sectors_html(sectors):
+    out = []
+    for s in sectors:
+        chips = "".join(_CHIP(stock=c['Stock'], color=_sign(c['Pct'])[0], sign=_sign(c['Pct'])[1], pct=c['Pct']) for c in s['Stocks'])
+        color, sign = _sign(s['Pct'])
+        out.append(_SECTOR(sector=s['Sector'], color=color, sign=sign, pct=s['Pct'], bar=f"bar-fg-{color}", width=s['Width'], chips=chips))
+    return "<div>" + "".join(out) + "</div>"
+
+def trends_html(trends):
+    rows = "".join(_TREND_ROW(asset=_asset(t['Stock']), color=t['Color'], status=t['Status']) for t in trends)
+    return f"{_TABLE_OPEN}<tr><th>Asset 🔗</th><th>Status</th></tr>{rows}{_TABLE_CLOSE}"
+
+def indices_html(indices):
+    boxes = "".join(_INDEX_BOX(ticker=ticker, name=name, tv=get_tv_link(ticker), val=fmt_price(val), color=_sign(chg)[0], sign=_sign(chg)[1], chg=fmt_price(chg), pct=pct)
+                    for name, ticker, val, chg, pct in indices)
+    return f"<div class='idx-container'>{boxes}</div>"
+
+def adv_dec_html(adv, dec):
+    adv_pct = (adv / (adv + dec)) * 100 if adv + dec > 0 else 50
+    return _ADV_DEC(adv_pct=adv_pct, dec_pct=100 - adv_pct, adv=adv, dec=dec)
+
+def signals_html(signals):
+    rows = "".join(_SIGNAL_ROW(asset=_asset(s['Stock']), entry=fmt_price(s['Entry']), ltp=fmt_price(s['LTP']), color="green" if s['Signal'] == "BUY" else "red", signal=s['Signal'],
+                               sl=fmt_price(s['SL']), target=fmt_price(s['Target']), time=s['Time']) for s in signals)
+    return f"{_TABLE_OPEN}<tr><th>Asset 🔗</th><th>Entry</th><th>LTP</th><th>Signal</th><th>SL</th><th>Target (1:3)</th><th>Time</th></tr>{rows}{_TABLE_CLOSE}"
+
+def active_html(trades, ltps):
+    rows = []
+    for t, ltp in zip(trades, ltps):
+        ltp = ltp if ltp > 0 else t['Entry']
+        points = ltp - t['Entry'] if t['Signal'] == 'BUY' else t['Entry'] - ltp
+        color, sign = _sign(points)
+        rows.append(_ACTIVE_ROW(asset=_asset(t['Stock']), signal=t['Signal'], entry=fmt_price(t['Entry']), ltp=fmt_price(ltp), color=color, sign=sign, points=fmt_price(abs(points)),
+                                pnl=(points / t['Entry']) * 100 if t['Entry'] > 0 else 0, target=fmt_price(t['Target']), sl=fmt_price(t['SL']), date=t['Date']))
+    return f"{_TABLE_OPEN}<tr><th>Asset 🔗</th><th>Signal</th><th>Entry</th><th>Live LTP</th><th>Live P&L</th><th>Target</th><th>SL</th><th>Time</th></tr>{''.join(rows)}{_TABLE_CLOSE}"
+
+def history_html(history):
+    rows = []
+    for t in history:
+        entry_p, exit_p = float(t['Entry']), float(t['Exit'])
+        points = exit_p - entry_p if t['Signal'] == 'BUY' else entry_p - exit_p
+        color, sign = _sign(points)
+        rows.append(_HISTORY_ROW(asset=_asset(t['Stock']), signal=t['Signal'], entry=fmt_price(entry_p), exit=fmt_price(exit_p), color=color, sign=sign, points=fmt_price(abs(points)),
+                                 pnl=float(t.get('P&L %', 0) or 0), status=t['Status'], date=t['Date']))
+    return f"{_TABLE_OPEN}<tr><th>Asset 🔗</th><th>Signal</th><th>Entry</th><th>Exit</th><th>P&L (Pts)</th><th>Status</th><th>Time</th></tr>{''.join(rows)}{_TABLE_CLOSE}"
+
+def movers_html(movers):
+    rows = "".join(_MOVER_ROW(asset=_asset(m['Stock']), ltp=fmt_price(m['LTP']), color=_sign(m['Pct'])[0], sign=_sign(m['Pct'])[1], pct=m['Pct']) for m in movers)
+    return f"{_TABLE_OPEN}<tr><th>Asset 🔗</th><th>LTP</th><th>%</th></tr>{rows}{_TABLE_CLOSE}"
+
+def buckets_html(buckets):
+    rows = "".join(_COUNT_ROW(label=label, count=count) for label, count in buckets.items())
+    return f"{_TABLE_OPEN}<tr><th>24h Change</th><th>Coins</th></tr>{rows}{_TABLE_CLOSE}"
+
+def leaders_html(title, leaders):
+    rows = "".join(_LEADER_ROW(stock=v['Stock'], color=_sign(v['Pct'])[0], pct=v['Pct']) for v in leaders)
+    return f"{_TABLE_OPEN}<tr><th>{title}</th><th>%</th></tr>{rows}{_TABLE_CLOSE}"
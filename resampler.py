@@ -0,0 +1,168 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+from candle_store import (CANDLE_COLUMNS, INTERVAL_MS, MAX_KLINE_LIMIT, OHLCV_FIELDS, add_store_listener, backfill_klines,
+                          read_klines, read_ohlcv_batch, read_range, read_range_array, read_tail, sync_many, sync_many_stream)
+from metrics import error
+from rate_limiter import PRIORITY_BACKGROUND
+
+# --- Multi-Timeframe Resampling ---
+# Only the base feeds are fetched and stored: 1m for the intraday intervals, 1h for 4h and 1d
+# (a 1m base would need 144k bars for 100 daily candles). Every other interval is aggregated from
+# its base on UTC-aligned buckets, the same way the exchange builds them, so all timeframes agree
+# and switching between them costs no network calls. Aggregates are cached per (symbol, interval)
+# and each store write only recomputes the buckets it touched.
+BASE_INTERVAL = {"3m": "1m", "5m": "1m", "15m": "1m", "30m": "1m", "2h": "1h", "4h": "1h", "6h": "1h", "12h": "1h", "1d": "1h"}
+MAX_RESAMPLE_BARS = 1000
+
+_lock = threading.Lock()
+_derived = {}
+_depth = {}
+_listeners = []
+
+def base_interval(interval):
+    return BASE_INTERVAL.get(interval, interval)
+
+def resample(base, interval):
+    # base: (n x 6+) rows of open_time + OHLCV in time order -> (m x 7) rows in CANDLE_COLUMNS order.
+    step = INTERVAL_MS[interval]
+    if not len(base): return np.empty((0, len(CANDLE_COLUMNS)))
+    bucket = base[:, 0] // step * step
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(base)] - 1
+    out = np.empty((len(starts), len(CANDLE_COLUMNS)))
+    out[:, 0] = bucket[starts]
+    out[:, 1] = base[starts, 1]
+    out[:, 2] = np.maximum.reduceat(base[:, 2], starts)
+    out[:, 3] = np.minimum.reduceat(base[:, 3], starts)
+    out[:, 4] = base[ends, 4]
+    out[:, 5] = np.add.reduceat(base[:, 5], starts)
+    out[:, 6] = out[:, 0] + step - 1
+    return out
+
+def resample_frame(df, interval):
+    # Same aggregation for DataFrames with 'Open time' + OHLCV columns (yfinance fallback history).
+    if df.empty: return pd.DataFrame(columns=CANDLE_COLUMNS)
+    out = pd.DataFrame(resample(df[['Open time'] + OHLCV_FIELDS].to_numpy(dtype=float), interval), columns=CANDLE_COLUMNS)
+    return out.astype({'Open time': 'int64', 'Close time': 'int64'})
+
+def _window_start(interval, bars, now_ms=None):
+    step = INTERVAL_MS[interval]
+    return ((now_ms or int(time.time() * 1000)) // step - bars + 1) * step
+
+def _build(symbol, interval, bars):
+    base = BASE_INTERVAL[interval]
+    start = _window_start(interval, bars)
+    tail = read_tail(symbol, base)
+    src = tail if len(tail) and tail[0, 0] <= start else read_range_array(symbol, base, start)
+    return resample(src[src[:, 0] >= start], interval)
+
+def _derived_tail(symbol, interval, bars):
+    key = (symbol, interval)
+    bars = min(bars, MAX_RESAMPLE_BARS)
+    with _lock:
+        arr = _derived.get(key)
+        if arr is None or bars > _depth[key]:
+            arr = _derived[key] = _build(symbol, interval, bars)
+            _depth[key] = bars
+    return arr[-bars:]
+
+def _on_store(symbol, interval, rows):
+    # Recompute only the buckets from the earliest written bar (or the last cached bucket) onwards.
+    keys = [(symbol, iv) for iv, base in BASE_INTERVAL.items() if base == interval and (symbol, iv) in _derived]
+    if not keys or not rows: return
+    opens = [int(r[0]) for r in rows]
+    first, last = min(opens), max(opens)
+    tail = read_tail(symbol, interval)
+    for key in keys:
+        step = INTERVAL_MS[key[1]]
+        with _lock:
+            arr = _derived.get(key)
+            if arr is None or (len(arr) >= _depth[key] and last < arr[0, 0]): continue
+            start = first // step * step
+            if len(arr): start = min(start, int(arr[-1, 0]))
+            # Older history than the hot tail (a backfill): rebuild lazily on the next read.
+            if not len(tail) or tail[0, 0] > start or (len(arr) and start < arr[0, 0]):
+                _derived.pop(key, None)
+                continue
+            new = resample(tail[tail[:, 0] >= start], key[1])
+            _derived[key] = np.concatenate([arr[arr[:, 0] < start], new])[-_depth[key]:]
+        # A past bucket still missing base bars (catch-up in progress) would look closed to listeners: hold it back.
+        if len(new) and tail[-1, 6] < new[-1, 6] < time.time() * 1000: new = new[:-1]
+        for fn in _listeners:
+            try: fn(symbol, key[1], new)
+            except: error("resampler.listener")
+
+def add_resample_listener(fn):
+    # fn(symbol, interval, rows) gets the recomputed bars of a derived interval after each base write.
+    _listeners.append(fn)
+
+def sync_interval(symbols, interval, bars=100, max_age=None, priority=PRIORITY_BACKGROUND):
+    # Syncs the base feed deep enough for `bars` bars of `interval`; beyond one page the older base pages are backfilled once.
+    symbols = list(dict.fromkeys(symbols))
+    kwargs = {} if max_age is None else {"max_age": max_age}
+    base = BASE_INTERVAL.get(interval)
+    if base is None: return sync_many(symbols, interval, bars, priority=priority, **kwargs)
+    need = (bars + 1) * (INTERVAL_MS[interval] // INTERVAL_MS[base])
+    stored = sync_many(symbols, base, need, priority=priority, **kwargs)
+    if need > MAX_KLINE_LIMIT:
+        start = _window_start(interval, bars)
+        end = int(time.time() * 1000) - MAX_KLINE_LIMIT * INTERVAL_MS[base]
+        for sym in symbols: stored += backfill_klines(sym, base, start, end, priority)
+    return stored
+
+def sync_requests(interval, bars=100):
+    # Klines requests a cold sync of `bars` bars of `interval` costs: one per page of base bars.
+    base = BASE_INTERVAL.get(interval)
+    need = bars if base is None else (bars + 1) * (INTERVAL_MS[interval] // INTERVAL_MS[base])
+    return -(-need // MAX_KLINE_LIMIT)
+
+def sync_interval_stream(symbols, interval, bars=100, max_age=None, priority=PRIORITY_BACKGROUND, deadline=None):
+    # sync_interval one symbol at a time: each is yielded as soon as its base bars are stored.
+    symbols = list(dict.fromkeys(symbols))
+    kwargs = {} if max_age is None else {"max_age": max_age}
+    base = BASE_INTERVAL.get(interval)
+    if base is None:
+        yield from sync_many_stream(symbols, interval, bars, priority=priority, deadline=deadline, **kwargs)
+        return
+    need = (bars + 1) * (INTERVAL_MS[interval] // INTERVAL_MS[base])
+    # Beyond one page the older base pages ride in the same request stream, under the same deadline.
+    backfill = (_window_start(interval, bars), int(time.time() * 1000) - MAX_KLINE_LIMIT * INTERVAL_MS[base]) if need > MAX_KLINE_LIMIT else None
+    yield from sync_many_stream(symbols, base, need, priority=priority, deadline=deadline, backfill=backfill, **kwargs)
+
+def fresh_symbols(symbols, interval, now_ms=None):
+    # Symbols whose base feed has a bar that closed no more than one base interval ago. A failed or
+    # timed-out sync leaves older bars behind, and signals built on them would quote stale prices.
+    base = base_interval(interval)
+    cutoff = (now_ms or int(time.time() * 1000)) - INTERVAL_MS.get(base, 0)
+    return [sym for sym in dict.fromkeys(symbols) for tail in [read_tail(sym, base, 1)] if len(tail) and tail[-1, 6] >= cutoff]
+
+def backfill_interval(symbol, interval, start_ms, end_ms=None, priority=PRIORITY_BACKGROUND):
+    # Historical range of `interval` (backtests): a derived interval backfills its base feed, from the start of the first bucket.
+    if interval not in BASE_INTERVAL: return backfill_klines(symbol, interval, start_ms, end_ms, priority)
+    return backfill_klines(symbol, BASE_INTERVAL[interval], start_ms // INTERVAL_MS[interval] * INTERVAL_MS[interval], end_ms, priority)
+
+def read_interval_range(symbol, interval, start_ms, end_ms=None):
+    # Same columns as read_range; a derived interval is aggregated from the stored base range.
+    if interval not in BASE_INTERVAL: return read_range(symbol, interval, start_ms, end_ms)
+    step = INTERVAL_MS[interval]
+    arr = resample(read_range_array(symbol, BASE_INTERVAL[interval], start_ms // step * step, end_ms), interval)
+    return {"Open time": arr[:, 0].astype(np.int64), **{f: arr[:, i + 1] for i, f in enumerate(OHLCV_FIELDS)}}
+
+def read_interval(symbol, interval, bars=100):
+    if interval not in BASE_INTERVAL: return read_klines(symbol, interval, bars)
+    df = pd.DataFrame(_derived_tail(symbol, interval, bars), columns=CANDLE_COLUMNS)
+    return df.astype({'Open time': 'int64', 'Close time': 'int64'})
+
+def read_interval_batch(symbols, interval, bars=100, min_bars=1):
+    # Same right-aligned (symbol x bar) arrays as read_ohlcv_batch, for base and derived intervals alike.
+    if interval not in BASE_INTERVAL: return read_ohlcv_batch(symbols, interval, bars, min_bars)
+    tails = [(sym, _derived_tail(sym, interval, bars)) for sym in dict.fromkeys(symbols)]
+    tails = [(sym, t) for sym, t in tails if len(t) >= min_bars]
+    cube = np.full((len(OHLCV_FIELDS), len(tails), bars), np.nan)
+    for row, (_, t) in enumerate(tails):
+        cube[:, row, bars - len(t):] = t[:, 1:6].T
+    return [sym for sym, _ in tails], dict(zip(OHLCV_FIELDS, cube))
+
+add_store_listener(_on_store)
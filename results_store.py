@@ -0,0 +1,64 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# --- Shared Results Store ---
+# Precomputed scan output (ticker snapshot, signals per interval, 3-day trends) published by the
+# scan worker and read by every dashboard session. Each result is one JSON row keyed by name, so
+# a page render is a primary-key lookup. Sessions also record which coins and intervals they are
+# showing; the worker scans exactly that set.
+RESULTS_DB_FILE = os.environ.get("RESULTS_DB_FILE", "crypto_results.db")
+WANTED_TTL = 600.0
+
+_local = threading.local()
+
+def _conn():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(RESULTS_DB_FILE, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, computed_at REAL NOT NULL, payload TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS wanted (coin TEXT NOT NULL, interval TEXT NOT NULL, last_seen REAL NOT NULL, PRIMARY KEY (coin, interval)) WITHOUT ROWID;"
+        )
+        _local.conn = conn
+    return conn
+
+def publish(key, value, computed_at=None):
+    conn = _conn()
+    with conn: conn.execute("INSERT OR REPLACE INTO results VALUES (?,?,?)", (key, computed_at or time.time(), json.dumps(value)))
+
+def claim(key, owner, value, stale_after):
+    # Publishes value (which carries "owner") only if this owner already holds key or the holder's
+    # last write is older than stale_after. One conditional upsert, so two claimants never both win.
+    now = time.time()
+    conn = _conn()
+    with conn:
+        cur = conn.execute(
+            "INSERT INTO results VALUES (?,?,?) ON CONFLICT(key) DO UPDATE SET computed_at=excluded.computed_at, payload=excluded.payload "
+            "WHERE json_extract(results.payload, '$.owner') = ? OR results.computed_at < ?",
+            (key, now, json.dumps({**value, "owner": owner}), owner, now - stale_after))
+    return cur.rowcount > 0
+
+def read_result(key, max_age=None):
+    row = _conn().execute("SELECT computed_at, payload FROM results WHERE key=?", (key,)).fetchone()
+    if row is None or (max_age is not None and time.time() - row[0] > max_age): return None
+    return json.loads(row[1])
+
+def result_ages():
+    now = time.time()
+    return {key: round(now - ts, 1) for key, ts in _conn().execute("SELECT key, computed_at FROM results ORDER BY key").fetchall()}
+
+def track(coins, interval):
+    now = time.time()
+    conn = _conn()
+    with conn: conn.executemany("INSERT OR REPLACE INTO wanted VALUES (?,?,?)", [(c, interval, now) for c in dict.fromkeys(coins)])
+
+def wanted(max_age=WANTED_TTL):
+    by_interval = {}
+    for coin, interval in _conn().execute("SELECT coin, interval FROM wanted WHERE last_seen>=? ORDER BY coin", (time.time() - max_age,)).fetchall():
+        by_interval.setdefault(interval, []).append(coin)
+    return by_interval
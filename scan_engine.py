@@ -0,0 +1,86 @@
+import datetime
+import pytz
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from candle_store import OHLCV_FIELDS
+
+# --- Vectorized Multi-Symbol Scan Engine ---
+# All symbols are stacked into (symbols x bars) arrays and the MDF + Donchian breakout rules
+# are evaluated for every row in one pass. Rows are right-aligned, so column -1 is the latest bar.
+DEFAULT_PARAMS = {"donchian": 10, "sl_lookback": 8, "rsi_len": 14, "reward": 3.0}
+
+def stack_ohlcv(frames, bars=100, min_bars=50):
+    coins = [c for c, df in frames.items() if df is not None and len(df) >= min_bars]
+    cube = np.full((len(OHLCV_FIELDS), len(coins), bars), np.nan)
+    for row, coin in enumerate(coins):
+        block = frames[coin][OHLCV_FIELDS].to_numpy(dtype=float)[-bars:]
+        cube[:, row, bars - len(block):] = block.T
+    return coins, dict(zip(OHLCV_FIELDS, cube))
+
+def batch_indicators(high, low, close, volume, donchian=10, sl_lookback=8, rsi_len=14, vol_len=20):
+    # Channels use the bars *before* the current one (rolling(n).max().shift(1) at the last row).
+    upper = high[:, -donchian - 1:-1].max(axis=1)
+    lower = low[:, -donchian - 1:-1].min(axis=1)
+    sl_long = low[:, -sl_lookback - 1:-1].min(axis=1)
+    sl_short = high[:, -sl_lookback - 1:-1].max(axis=1)
+
+    deltas = np.diff(close[:, -rsi_len - 1:], axis=1)
+    roll_up = np.where(deltas > 0, deltas, 0).mean(axis=1)
+    roll_down = np.where(deltas < 0, -deltas, 0).mean(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(roll_down != 0, 100.0 - (100.0 / (1.0 + roll_up / roll_down)), 100.0)
+        vol_spike = volume[:, -1] / (volume[:, -vol_len:].mean(axis=1) + 1e-9)
+
+    return {"Upper": upper, "Lower": lower, "SL_Long": sl_long, "SL_Short": sl_short, "RSI": rsi, "Bull": rsi >= 50, "Vol_Spike": vol_spike}
+
+def batch_signals(coins, arrays, sentiment="BOTH", donchian=10, sl_lookback=8, rsi_len=14, reward=3.0):
+    if not coins: return []
+    high, low, close = arrays['High'], arrays['Low'], arrays['Close']
+    ind = batch_indicators(high, low, close, arrays['Volume'], donchian, sl_lookback, rsi_len)
+    cur_high, cur_low, entry = high[:, -1], low[:, -1], close[:, -1]
+
+    is_buy = (cur_high >= ind["Upper"]) & ind["Bull"]
+    is_short = ~is_buy & (cur_low <= ind["Lower"]) & ~ind["Bull"]
+    if sentiment == "BULLISH": is_short[:] = False
+    if sentiment == "BEARISH": is_buy[:] = False
+
+    sl = np.where(is_buy, ind["SL_Long"], ind["SL_Short"])
+    risk = np.abs(entry - sl)
+    target = np.where(is_buy, entry + risk * reward, entry - risk * reward)
+    valid = (is_buy | is_short) & (sl > 0) & (risk > 0)
+
+    now_str = datetime.datetime.now(pytz.timezone('Asia/Kolkata')).strftime('%H:%M')
+    return [
+        {"Stock": coins[i], "Signal": "BUY" if is_buy[i] else "SHORT", "Entry": float(entry[i]), "LTP": float(entry[i]), "SL": float(sl[i]), "Target": float(target[i]), "Time": now_str}
+        for i in np.flatnonzero(valid)
+    ]
+
+# --- Full-history variant (backtests) ---
+# Same rules evaluated at every bar instead of only the last one; value at bar t only uses bars <= t.
+def _prior_window(x, n, fn):
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] > n: out[..., n:] = fn(sliding_window_view(x, n, axis=-1)[..., :-1, :], axis=-1)
+    return out
+
+def rolling_signals(high, low, close, donchian=10, sl_lookback=8, rsi_len=14, reward=3.0):
+    upper, lower = _prior_window(high, donchian, np.max), _prior_window(low, donchian, np.min)
+    sl_long, sl_short = _prior_window(low, sl_lookback, np.min), _prior_window(high, sl_lookback, np.max)
+
+    deltas = np.diff(close, axis=-1)
+    bull = np.zeros(close.shape, dtype=bool)
+    if deltas.shape[-1] >= rsi_len:
+        roll_up = sliding_window_view(np.where(deltas > 0, deltas, 0), rsi_len, axis=-1).mean(axis=-1)
+        roll_down = sliding_window_view(np.where(deltas < 0, -deltas, 0), rsi_len, axis=-1).mean(axis=-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(roll_down != 0, 100.0 - (100.0 / (1.0 + roll_up / roll_down)), 100.0)
+        bull[..., rsi_len:] = rsi >= 50
+
+    with np.errstate(invalid='ignore'):
+        is_buy = (high >= upper) & bull
+        is_short = ~is_buy & (low <= lower) & ~bull
+    sl = np.where(is_buy, sl_long, sl_short)
+    risk = np.abs(close - sl)
+    target = np.where(is_buy, close + risk * reward, close - risk * reward)
+    with np.errstate(invalid='ignore'):
+        valid = (is_buy | is_short) & (sl > 0) & (risk > 0)
+    return {"Buy": is_buy & valid, "Short": is_short & valid, "SL": sl, "Target": target}
@@ -0,0 +1,255 @@
+import os
+import threading
+import time
+from market_snapshot import fetch_ticker_dict
+from metrics import error, fallback, inc, observe, serve_metrics, stage, timed
+from resampler import fresh_symbols, read_interval, read_interval_batch, sync_interval, sync_interval_stream
+from results_store import claim, publish, read_result, wanted
+from scan_engine import batch_signals
+from universe import MIN_MOVE_PCT, MIN_QUOTE_VOLUME, UNIVERSE, pass_capacity, prefilter, tradable_markets, universe_tickers
+from yf_provider import get_history_many
+
+# --- Background Scan Worker ---
+# Refreshes the ticker snapshot, the breakout signals of every interval a session is watching and
+# the 3-day trends on a fixed cadence, and publishes them to the results store. Run it standalone
+# with `python scan_worker.py`, or let the dashboard start one in a thread. Only one worker leads
+# at a time: while another worker's heartbeat is fresh the rest stay idle. An interval tracked
+# with the UNIVERSE marker also gets a full-universe scan, one shard per tick. Watchlist scans
+# stream: each coin is scanned as soon as its candles land, and partial results are published as
+# they come, so the first signal waits on the fastest coin. Coins still fetching at SCAN_DEADLINE
+# have their requests cancelled and, like coins whose fetch failed, are not scanned: their stored
+# bars may be hours old. They stay listed as pending until a later scan gets their candles.
+TICKERS_EVERY = 15.0
+SIGNALS_EVERY = 30.0
+TRENDS_EVERY = 120.0
+WORKER_TICK = 1.0
+WORKER_ALIVE_AFTER = 10.0
+HEARTBEAT_KEY = "worker:heartbeat"
+TOP_MOVERS = 5
+UNIVERSE_EVERY = 60.0
+UNIVERSE_BUDGET = 45.0
+SHARD_SIZE = 100
+SCAN_DEADLINE = float(os.environ.get("SCAN_DEADLINE", 5.0))
+SCAN_FLUSH = 0.25
+
+def scan_signals_stream(coins, interval, deadline=SCAN_DEADLINE, max_age=None):
+    # Yields (coins, signals) batches as coins are ready; the first batch goes out at once, later
+    # ones at most every SCAN_FLUSH seconds. Every scanned coin appears in exactly one batch; coins
+    # without a freshly closed bar (fetch failed or timed out) appear in none.
+    symbols = list(dict.fromkeys(coin.replace('-USD', 'USDT') for coin in coins))
+    start = time.time()
+    stream = sync_interval_stream(symbols, interval, bars=100, max_age=max_age, deadline=start + deadline)
+    ready, seen, flushed = [], set(), 0.0
+    def flush():
+        scanned = fresh_symbols(ready, interval)
+        if len(scanned) < len(ready): inc("scan_stale_total", len(ready) - len(scanned), interval=interval)
+        kept, arrays = read_interval_batch(scanned, interval, bars=100, min_bars=50) if scanned else ([], {})
+        batch = ([sym[:-4] + '-USD' for sym in scanned], batch_signals([sym[:-4] + '-USD' for sym in kept], arrays, "BOTH") if kept else [])
+        if not flushed: observe("stage_seconds", time.time() - start, stage="scan.first_batch")
+        ready.clear()
+        return batch
+    try:
+        while True:
+            try: sym = next(stream, None)
+            except:
+                error("scan.sync")
+                sym = None
+            if sym is None: break
+            seen.add(sym)
+            ready.append(sym)
+            if time.time() - flushed >= SCAN_FLUSH:
+                yield flush()
+                flushed = time.time()
+    finally: stream.close()
+    stragglers = [sym for sym in symbols if sym not in seen]
+    if stragglers: inc("scan_stragglers_total", len(stragglers), interval=interval)
+    if ready: yield flush()
+
+@timed("stage_seconds", stage="scan_signals")
+def scan_signals(coins, interval, deadline=SCAN_DEADLINE):
+    order = {coin: i for i, coin in enumerate(coins)}
+    return sorted((s for _, signals in scan_signals_stream(coins, interval, deadline) for s in signals), key=lambda s: order.get(s['Stock'], len(order)))
+
+def stream_signals(coins, interval, replace=False, deadline=SCAN_DEADLINE):
+    # Scans `coins` and republishes signals:{interval} after every batch, yielding each result. A coin
+    # not rescanned yet keeps its previous rows and is listed as pending; one the scan could not get
+    # fresh candles for stays pending and loses its rows. With replace the result covers exactly
+    # `coins`; otherwise they are merged into whatever was already published.
+    key = f"signals:{interval}"
+    previous = read_result(key) or {"coins": [], "signals": []}
+    covered = list(coins) if replace else list(dict.fromkeys(previous["coins"] + list(coins)))
+    rows = {}
+    for s in previous["signals"]: rows.setdefault(s['Stock'], []).append(s)
+    pending = dict.fromkeys(coins)
+    for done, signals in scan_signals_stream(coins, interval, deadline):
+        for coin in done:
+            rows.pop(coin, None)
+            pending.pop(coin, None)
+        for s in signals: rows.setdefault(s['Stock'], []).append(s)
+        result = {"coins": covered, "pending": list(pending), "signals": [s for c in covered for s in rows.get(c, [])]}
+        publish(key, result)
+        yield result
+    if any(coin in rows for coin in pending):
+        for coin in pending: rows.pop(coin, None)
+        result = {"coins": covered, "pending": list(pending), "signals": [s for c in covered for s in rows.get(c, [])]}
+        publish(key, result)
+        yield result
+
+def filter_signals(signals, coins, sentiment="BOTH"):
+    # BULLISH / BEARISH scans are exactly the BUY / SHORT rows of the BOTH scan.
+    coins, sides = set(coins), {"BOTH": ("BUY", "SHORT"), "BULLISH": ("BUY",), "BEARISH": ("SHORT",)}[sentiment]
+    return [s for s in signals if s['Stock'] in coins and s['Signal'] in sides]
+
+@timed("stage_seconds", stage="crypto_trends")
+def crypto_trends(coins):
+    try: sync_interval([t.replace('-USD', 'USDT') for t in coins], "1d", bars=3)
+    except: error("trends.sync")
+    frames = {t: read_interval(t.replace('-USD', 'USDT'), "1d", bars=3) for t in coins}
+    missing = [t for t, df in frames.items() if len(df) < 3]
+    fallback("yf.trends", len(missing))
+    if missing: frames.update(get_history_many(missing, "5d", "1d"))
+    def fetch_trend(ticker):
+        try:
+            df = frames[ticker]
+            if len(df) >= 3:
+                c1, o1 = float(df['Close'].iloc[-1]), float(df['Open'].iloc[-1])
+                c2, o2 = float(df['Close'].iloc[-2]), float(df['Open'].iloc[-2])
+                c3, o3 = float(df['Close'].iloc[-3]), float(df['Open'].iloc[-3])
+                if c1 > o1 and c2 > o2 and c3 > o3: return {"Stock": ticker, "Status": "৩ দিন উত্থান", "Color": "green"}
+                elif c1 < o1 and c2 < o2 and c3 < o3: return {"Stock": ticker, "Status": "৩ দিন পতন", "Color": "red"}
+        except: error("trends.parse")
+        return None
+    results = [fetch_trend(t) for t in coins]
+    return [r for r in results if r]
+
+def top_movers(ticker_dict, n=TOP_MOVERS):
+    ranked = sorted(ticker_dict, key=lambda c: ticker_dict[c]['change_pct'], reverse=True)
+    return [c for c in ranked[:n] if ticker_dict[c]['change_pct'] > 0] + [c for c in ranked[-n:] if ticker_dict[c]['change_pct'] < 0]
+
+def worker_status():
+    return read_result(HEARTBEAT_KEY, WORKER_ALIVE_AFTER)
+
+class UniverseScan:
+    # One interval's universe pass, advanced a shard at a time so tickers and watchlist scans keep
+    # their cadence in between. Results are published after every shard. A pass that runs past its
+    # time budget stops there; the coins it did not reach go first in the next pass, then the rest,
+    # least recently scanned first, up to what the weight budget allows.
+    def __init__(self, interval):
+        self.interval = interval
+        self.min_quote_volume, self.min_move_pct = MIN_QUOTE_VOLUME, MIN_MOVE_PCT
+        self.running = False
+        self.queue = []
+        self.order = []
+        self.signals = {}
+        self.scanned_at = {}
+        self.deadline = 0.0
+        self.stats = {"markets": 0, "survivors": 0, "capped": 0, "scanned": 0, "deferred": 0, "passes": 0, "started": 0.0, "seconds": 0.0}
+
+    def plan(self, tickers, now):
+        markets = tradable_markets()
+        survivors = prefilter(tickers, markets, self.min_quote_volume, self.min_move_pct)
+        keep = set(survivors)
+        carry = [c for c in self.queue if c in keep]
+        carried = set(carry)
+        rest = sorted((c for c in survivors if c not in carried), key=lambda c: self.scanned_at.get(c, 0.0))
+        self.queue = (carry + rest)[:pass_capacity(UNIVERSE_EVERY, self.interval)]
+        capped = len(carry) + len(rest) - len(self.queue)
+        self.order = survivors
+        self.signals = {c: sig for c, sig in self.signals.items() if c in keep}
+        self.scanned_at = {c: ts for c, ts in self.scanned_at.items() if c in keep}
+        self.deadline = now + UNIVERSE_BUDGET
+        self.running = True
+        self.stats.update(markets=len(markets or tickers), survivors=len(survivors), capped=capped, scanned=0, deferred=0, started=now, seconds=0.0)
+        self.stats["passes"] += 1
+
+    def step(self, now):
+        if self.queue and now < self.deadline:
+            shard, self.queue = self.queue[:SHARD_SIZE], self.queue[SHARD_SIZE:]
+            scanned, signals = [], []
+            for done, batch in scan_signals_stream(shard, self.interval):
+                scanned += done
+                signals += batch
+            # Coins whose candles did not come in keep their signals and scan time and go back to
+            # the front; a shard that got nothing at all ends the pass instead of retrying at once.
+            done = set(scanned)
+            self.queue = [c for c in shard if c not in done] + self.queue
+            for coin in scanned: self.signals.pop(coin, None)
+            self.scanned_at.update(dict.fromkeys(scanned, now))
+            for sig in signals: self.signals.setdefault(sig['Stock'], []).append(sig)
+            self.stats["scanned"] += len(scanned)
+            if not scanned: self.deadline = now
+        if not self.queue or time.time() >= self.deadline:
+            self.running = False
+            self.stats["deferred"] = len(self.queue)
+        self.stats["seconds"] = round(time.time() - self.stats["started"], 2)
+        return self.result()
+
+    def result(self):
+        return {"coins": [c for c in self.order if c in self.scanned_at], "signals": [s for c in self.order for s in self.signals.get(c, [])],
+                "running": self.running, "queued": len(self.queue), **self.stats}
+
+class ScanWorker:
+    def __init__(self):
+        self.owner = f"{os.getpid()}-{id(self)}"
+        self.last_run = {}
+        self.tickers = {}
+        self.universe = {}
+        self.stats = {"cycles": 0, "errors": 0, "started": time.time()}
+        self._thread = None
+
+    def beat(self):
+        # Leading and beating are one conditional write: it lands only while this worker leads or the
+        # leader's heartbeat has gone stale, so two workers can never both take over.
+        return claim(HEARTBEAT_KEY, self.owner, {"pid": os.getpid(), "ts": time.time(), **self.stats}, WORKER_ALIVE_AFTER)
+
+    def due(self, key, every):
+        if time.time() - self.last_run.get(key, 0.0) < every: return False
+        self.last_run[key] = time.time()
+        return True
+
+    def run_once(self):
+        if not self.beat(): return False
+        if self.due("tickers", TICKERS_EVERY):
+            with stage("worker.tickers"): tickers = fetch_ticker_dict()
+            if tickers:
+                self.tickers = tickers
+                publish("tickers", tickers)
+            self.beat()
+        by_interval = wanted()
+        universe = [interval for interval, coins in by_interval.items() if UNIVERSE in coins]
+        by_interval = {interval: [c for c in coins if c != UNIVERSE] for interval, coins in by_interval.items()}
+        for interval, coins in by_interval.items():
+            if not coins or not self.due(f"signals:{interval}", SIGNALS_EVERY): continue
+            with stage(f"worker.signals:{interval}"):
+                for _ in stream_signals(coins, interval, replace=True): pass
+            self.beat()
+        for interval in universe:
+            scan = self.universe.setdefault(interval, UniverseScan(interval))
+            if not scan.running and self.due(f"universe:{interval}", UNIVERSE_EVERY): scan.plan(universe_tickers(self.tickers), time.time())
+            if not scan.running: continue
+            with stage(f"worker.universe:{interval}"): publish(f"universe:{interval}", scan.step(time.time()))
+            self.beat()
+        if self.due("trends", TRENDS_EVERY):
+            coins = list(dict.fromkeys([c for coins in by_interval.values() for c in coins] + top_movers(self.tickers)))
+            with stage("worker.trends"): publish("trends", {"coins": coins, "trends": crypto_trends(coins)})
+        self.stats["cycles"] += 1
+        return True
+
+    def run_forever(self):
+        while True:
+            try: self.run_once()
+            except:
+                self.stats["errors"] += 1
+                error("scan_worker")
+            time.sleep(WORKER_TICK)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run_forever, name="scan-worker", daemon=True)
+            self._thread.start()
+        return self
+
+if __name__ == "__main__":
+    print(f"Scan worker started (pid {os.getpid()})", flush=True)
+    serve_metrics()
+    ScanWorker().run_forever()
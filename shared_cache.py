@@ -0,0 +1,164 @@
+import contextlib
+import functools
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import cache_result, error, stage
+
+try: import redis
+except ImportError: redis = None
+
+# --- Shared Result Cache ---
+# Process-wide cache for expensive fetches and scans, shared by every dashboard session. Set
+# SHARED_CACHE_URL (redis://host:port/db, any Redis-compatible server) to share it across app
+# replicas too; without it, or when the server is unreachable, the cache lives in this process.
+# Each key is computed by one caller at a time while the others wait for its result, so a burst of
+# sessions costs one exchange fan-out. Sessions collect the keys they read, and a refresh drops
+# only those keys, and only if they are older than REFRESH_MIN_AGE. Keys come from caller input,
+# so the in-process cache drops expired entries as it writes and holds at most MAX_LOCAL_ENTRIES.
+SHARED_CACHE_URL = os.environ.get("SHARED_CACHE_URL", "")
+REFRESH_MIN_AGE = 5.0
+LOCK_TTL = 30.0
+MAX_LOCAL_ENTRIES = 2000
+LOCAL_SWEEP_EVERY = 30.0
+
+class LocalBackend:
+    def __init__(self, max_entries=MAX_LOCAL_ENTRIES, sweep_every=LOCAL_SWEEP_EVERY):
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self.max_entries, self.sweep_every = max_entries, sweep_every
+        self._swept = time.time()
+
+    def _store(self, key, entry, now):
+        # Called with the lock held. Keys are kept in write order, so the oldest write is evicted first.
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        if now - self._swept >= self.sweep_every:
+            for k in [k for k, e in self._data.items() if e[1] < now]: del self._data[k]
+            self._swept = now
+        while len(self._data) > self.max_entries: self._data.popitem(last=False)
+
+    def get(self, key):
+        with self._lock: entry = self._data.get(key)
+        if entry is None or entry[1] < time.time(): return None
+        return entry[0], entry[2]
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._lock: self._store(key, (now, now + ttl, value), now)
+
+    def add(self, key, ttl):
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] >= now: return False
+            self._store(key, (now, now + ttl, True), now)
+        return True
+
+    def delete(self, keys):
+        with self._lock:
+            for key in keys: self._data.pop(key, None)
+
+class RedisBackend:
+    def __init__(self, url):
+        self.client = redis.Redis.from_url(url, socket_timeout=2)
+        self.client.ping()
+
+    def get(self, key):
+        raw = self.client.get(key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(key, pickle.dumps((time.time(), value)), px=max(1, int(ttl * 1000)))
+
+    def add(self, key, ttl):
+        return bool(self.client.set(key, b"1", nx=True, px=max(1, int(ttl * 1000))))
+
+    def delete(self, keys):
+        if keys: self.client.delete(*keys)
+
+def _make_backend():
+    if SHARED_CACHE_URL and redis is not None:
+        try: return RedisBackend(SHARED_CACHE_URL)
+        except: error("shared_cache.redis")
+    return LocalBackend()
+
+_backend = _make_backend()
+_flight_lock = threading.Lock()
+_flights = {}
+_collector = threading.local()
+
+def backend_name():
+    return type(_backend).__name__
+
+def collect_keys(keys):
+    # Keys read on this thread (one Streamlit script run) are added to `keys` for a later refresh.
+    _collector.keys = keys
+
+@contextlib.contextmanager
+def _key_lock(key):
+    # One lock per key while anyone computes or waits on it; the last one out drops it.
+    with _flight_lock:
+        lock, users = _flights.get(key, (None, 0))
+        lock = lock or threading.Lock()
+        _flights[key] = (lock, users + 1)
+    try:
+        with lock: yield
+    finally:
+        with _flight_lock:
+            lock, users = _flights[key]
+            if users == 1: del _flights[key]
+            else: _flights[key] = (lock, users - 1)
+
+def get_or_compute(key, fn, ttl):
+    keys = getattr(_collector, "keys", None)
+    if keys is not None: keys.add(key)
+    name = key.split(":", 1)[0]
+    hit = _backend.get(key)
+    if hit is not None:
+        cache_result(name, "hit")
+        return hit[1]
+    with _key_lock(key):
+        hit = _backend.get(key)
+        if hit is not None:
+            cache_result(name, "shared")
+            return hit[1]
+        # Another replica holds the compute lock: wait for its result instead of fetching again.
+        if not _backend.add(f"{key}:lock", LOCK_TTL):
+            deadline = time.time() + LOCK_TTL
+            while time.time() < deadline:
+                time.sleep(0.1)
+                hit = _backend.get(key)
+                if hit is not None:
+                    cache_result(name, "replica")
+                    return hit[1]
+        cache_result(name, "miss")
+        try:
+            with stage(name): value = fn()
+        finally: _backend.delete([f"{key}:lock"])
+        _backend.set(key, value, ttl)
+        return value
+
+def invalidate(keys, min_age=0.0):
+    now = time.time()
+    stale = [key for key in keys if (hit := _backend.get(key)) is not None and now - hit[0] >= min_age]
+    _backend.delete(stale)
+    return stale
+
+def cache_key(name, args, kwargs):
+    norm = lambda v: tuple(norm(x) for x in v) if isinstance(v, (list, tuple)) else v
+    raw = repr((tuple(norm(a) for a in args), sorted((k, norm(v)) for k, v in kwargs.items())))
+    return f"{name}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+def shared_cached(ttl):
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            return get_or_compute(cache_key(fn.__name__, args, kwargs), lambda: fn(*args, **kwargs), ttl)
+        inner.key = lambda *args, **kwargs: cache_key(fn.__name__, args, kwargs)
+        return inner
+    return wrap
@@ -0,0 +1,36 @@
+import os
+import sys
+import tempfile
+import threading
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TESTS_DIR)
+sys.path[:0] = [REPO_DIR, os.path.join(REPO_DIR, "benchmarks")]
+# The stores read their paths at import, so they point at a scratch directory before anything loads them.
+SCRATCH = tempfile.mkdtemp(prefix="crypto-tests-")
+for var, name in (("TRADE_DB_FILE", "trades.db"), ("CANDLE_DB_FILE", "candles.db"), ("RESULTS_DB_FILE", "results.db"), ("YF_CACHE_FILE", "yf.db")):
+    os.environ.setdefault(var, os.path.join(SCRATCH, name))
+
+from mock_exchange import DEFAULT_KEY, DEFAULT_SECRET, MockExchange, serve
+
+MARKET = "B-BTC_USDT"
+
+@pytest.fixture
+def exchange():
+    ex = MockExchange(prices={MARKET: 100.0})
+    server = serve(ex, 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    ex.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield ex
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def prices():
+    return {"BTC-USD": 100.0}
+
+@pytest.fixture
+def client(exchange, prices):
+    from execution import ExecutionClient
+    return ExecutionClient(DEFAULT_KEY, DEFAULT_SECRET, base_url=exchange.url, price_fn=prices.get)
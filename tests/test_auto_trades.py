@@ -0,0 +1,33 @@
+import pytest
+from portfolio_risk import DEFAULT_BUDGET, save_risk_budget
+from trade_store import clear_trades, load_active_trades
+
+terminal = pytest.importorskip("views.terminal")
+
+class _Snapshot:
+    # No quotes: open trades are marked at entry and the no-monitor exit check skips them.
+    def get(self, coin): return (0.0,)
+
+def _signal(coin, entry=100.0, sl=90.0):
+    return {"Stock": coin, "Signal": "BUY", "Entry": entry, "SL": sl, "Target": 130.0, "LTP": entry + 1}
+
+@pytest.fixture
+def one_trade_budget():
+    # Every signal risks 1% of capital and the heat limit leaves room for exactly one.
+    clear_trades()
+    save_risk_budget({**DEFAULT_BUDGET, "capital": 1000.0, "risk_pct": 1.0, "max_heat_pct": 1.0, "max_margin_pct": 100.0})
+    yield
+    save_risk_budget(DEFAULT_BUDGET)
+    clear_trades()
+
+def test_rejected_open_uses_no_budget(monkeypatch, one_trade_budget):
+    open_trade = terminal.open_trade
+    monkeypatch.setattr(terminal, "open_trade", lambda trade: trade["Stock"] != "AAA-USD" and open_trade(trade))
+    skipped = terminal.process_auto_trades([_signal("AAA-USD"), _signal("BBB-USD")], _Snapshot())
+    assert skipped == []
+    assert [(t["Stock"], t["Qty"]) for t in load_active_trades()] == [("BBB-USD", pytest.approx(1.0))]
+
+def test_opened_trade_uses_up_the_budget(one_trade_budget):
+    skipped = terminal.process_auto_trades([_signal("AAA-USD"), _signal("BBB-USD")], _Snapshot())
+    assert [t["Stock"] for t in load_active_trades()] == ["AAA-USD"]
+    assert [s["Stock"] for s in skipped] == ["BBB-USD"]
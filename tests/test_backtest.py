@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+import backtest
+from backtest import DEFAULT_PARAMS, simulate_breakout
+
+N = 40
+FEE = 0.1
+
+def _data(o, h, l, c):
+    return {"Open time": np.arange(N, dtype=np.int64) * 60_000, "Open": np.array(o, float), "High": np.array(h, float), "Low": np.array(l, float),
+            "Close": np.array(c, float), "Volume": np.ones(N)}
+
+def _flat():
+    return [[100.0] * N, [101.0] * N, [99.0] * N, [100.0] * N]
+
+def _signals(monkeypatch, entries):
+    # entries: {bar: (is_buy, sl, target)}; everything else is flat.
+    def fake(h, l, c, *args):
+        sig = {"Buy": np.zeros(N, bool), "Short": np.zeros(N, bool), "SL": np.full(N, np.nan), "Target": np.full(N, np.nan)}
+        for i, (is_buy, sl, target) in entries.items():
+            sig["Buy" if is_buy else "Short"][i] = True
+            sig["SL"][i], sig["Target"][i] = sl, target
+        return sig
+    monkeypatch.setattr(backtest, "rolling_signals", fake)
+
+def _run(o, h, l, c):
+    return simulate_breakout(_data(o, h, l, c), "TESTUSDT", DEFAULT_PARAMS, FEE)
+
+def test_bar_touching_both_levels_hits_the_stop_first(monkeypatch):
+    _signals(monkeypatch, {20: (True, 95.0, 110.0)})
+    o, h, l, c = _flat()
+    h[23], l[23] = 112.0, 94.0
+    [trade] = _run(o, h, l, c)
+    assert trade["Status"] == "🛑 SL HIT" and trade["Exit"] == 95.0 and trade["Bars"] == 3
+    assert trade["P&L %"] == pytest.approx(-5.0 - 2 * FEE)
+
+def test_gap_through_the_stop_fills_at_the_open(monkeypatch):
+    _signals(monkeypatch, {20: (True, 95.0, 110.0), 30: (False, 105.0, 85.0)})
+    o, h, l, c = _flat()
+    o[22], h[22], l[22], c[22] = 90.0, 91.0, 89.0, 90.0
+    o[32], h[32], l[32], c[32] = 108.0, 109.0, 107.0, 108.0
+    long_, short = _run(o, h, l, c)
+    assert long_["Status"] == "🛑 SL HIT" and long_["Exit"] == 90.0
+    assert short["Status"] == "🛑 SL HIT" and short["Exit"] == 108.0
+
+def test_target_and_open_trade_marked_to_market(monkeypatch):
+    _signals(monkeypatch, {10: (True, 95.0, 101.0), 20: (False, 105.0, 80.0)})
+    done, open_ = _run(*_flat())
+    assert done["Status"] == "🎯 TARGET HIT" and done["Exit"] == 101.0 and done["Bars"] == 1
+    assert open_["Status"] == "⏳ OPEN (MTM)" and open_["Exit"] == 100.0 and open_["exit_ms"] == (N - 1) * 60_000
+
+def test_coin_is_blocked_until_the_bar_after_the_exit(monkeypatch):
+    # The signal on the exit bar itself is skipped; the one on the next bar is taken.
+    _signals(monkeypatch, {10: (True, 95.0, 110.0), 12: (True, 95.0, 110.0), 15: (True, 95.0, 110.0), 16: (True, 90.0, 120.0)})
+    o, h, l, c = _flat()
+    h[15] = 111.0
+    trades = _run(o, h, l, c)
+    assert [t["entry_ms"] // 60_000 for t in trades] == [10, 16]
+    assert trades[0]["exit_ms"] // 60_000 == 15
+
+def test_exit_search_crosses_window_boundaries(monkeypatch):
+    monkeypatch.setattr(backtest, "EXIT_SEARCH_WINDOW", 4)
+    _signals(monkeypatch, {5: (False, 105.0, 90.0)})
+    o, h, l, c = _flat()
+    l[33] = 89.0
+    [trade] = _run(o, h, l, c)
+    assert trade["Status"] == "🎯 TARGET HIT" and trade["exit_ms"] // 60_000 == 33 and trade["Signal"] == "SHORT"
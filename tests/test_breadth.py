@@ -0,0 +1,45 @@
+import random
+from breadth import BUCKET_LABELS, PCT_BUCKETS, BreadthIndex
+
+def _reference(rows):
+    by_pct = sorted(rows.items(), key=lambda kv: (kv[1][1], kv[0]))
+    by_volume = sorted(rows.items(), key=lambda kv: (kv[1][2], kv[0]))
+    buckets = [0] * len(BUCKET_LABELS)
+    for _, pct, _ in rows.values(): buckets[sum(pct >= b for b in PCT_BUCKETS)] += 1
+    return {
+        "gainers": [c for c, (_, p, _) in reversed(by_pct[-5:]) if p > 0],
+        "losers": [c for c, (_, p, _) in by_pct[:5] if p < 0],
+        "volume": [c for c, (_, _, v) in reversed(by_volume[-5:]) if v > 0],
+        "adv_dec": (sum(p > 0 for _, p, _ in rows.values()), sum(p < 0 for _, p, _ in rows.values())),
+        "buckets": dict(zip(BUCKET_LABELS, buckets)),
+    }
+
+def test_incremental_rankings_match_a_full_sort():
+    rng = random.Random(1)
+    index, rows = BreadthIndex(capacity=4), {}
+    for step in range(3000):
+        coin = f"C{rng.randrange(300)}-USD"
+        if rows and rng.random() < 0.05:
+            gone = rng.choice(sorted(rows))
+            index.remove(gone)
+            rows.pop(gone)
+            continue
+        # Coarse values so ties (and unchanged ticks) are common.
+        pct, volume = rng.randrange(-30, 31) / 2, float(rng.randrange(0, 50))
+        index.update(coin, 1.0 + pct, pct, 0.0, volume)
+        rows[coin] = (1.0 + pct, pct, volume)
+    ref = _reference(rows)
+    assert len(index) == len(rows)
+    assert [r["Stock"] for r in index.gainers()] == ref["gainers"]
+    assert [r["Stock"] for r in index.losers()] == ref["losers"]
+    assert [r["Stock"] for r in index.volume_leaders()] == ref["volume"]
+    assert index.advance_decline()[:2] == ref["adv_dec"]
+    assert index.buckets() == ref["buckets"]
+
+def test_percentile_and_new_highs():
+    index = BreadthIndex()
+    for i, coin in enumerate(["A-USD", "B-USD", "C-USD"]): index.update(coin, 10.0, float(i), high=10.0, volume=1.0)
+    assert [index.percentile(c) for c in ("A-USD", "B-USD", "C-USD")] == [0.0, 50.0, 100.0]
+    assert {r["Stock"] for r in index.new_highs()} == {"A-USD", "B-USD", "C-USD"}
+    index.update("B-USD", 9.0, 1.0, high=10.0, volume=1.0)
+    assert "B-USD" not in {r["Stock"] for r in index.new_highs()}
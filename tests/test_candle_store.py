@@ -0,0 +1,53 @@
+import time
+import candle_store
+from candle_store import INTERVAL_MS, MAX_KLINE_LIMIT, _plan_sync, read_klines, store_klines, sync_klines
+
+STEP = INTERVAL_MS["1m"]
+
+def _bars(last_open, n):
+    # n 1m bars, the last one opening at last_open.
+    start = last_open - (n - 1) * STEP
+    return [[t, 1.0, 2.0, 0.5, 1.5, 10.0, t + STEP - 1] for t in range(start, last_open + 1, STEP)]
+
+def _now_bar():
+    return int(time.time() * 1000) // STEP * STEP
+
+def test_cold_key_fetches_the_full_window():
+    assert _plan_sync("COLDUSDT", "1m", 100, max_age=5.0) == {"symbol": "COLDUSDT", "interval": "1m", "limit": 100}
+
+def test_fresh_sync_is_throttled_unless_deeper():
+    store_klines("DEEPUSDT", "1m", _bars(_now_bar(), 300))
+    assert _plan_sync("DEEPUSDT", "1m", 100, max_age=60.0) is not None
+    assert _plan_sync("DEEPUSDT", "1m", 100, max_age=60.0) is None
+    assert _plan_sync("DEEPUSDT", "1m", 50, max_age=60.0) is None
+    # A deeper window re-plans inside the freshness window, then is throttled at that depth.
+    assert _plan_sync("DEEPUSDT", "1m", 200, max_age=60.0) is not None
+    assert _plan_sync("DEEPUSDT", "1m", 200, max_age=60.0) is None
+
+def test_closed_tail_fetches_only_newer_bars():
+    last = _now_bar() - 3 * STEP
+    store_klines("TAILUSDT", "1m", _bars(last, 150))
+    plan = _plan_sync("TAILUSDT", "1m", 100, max_age=0.0)
+    assert plan["startTime"] == last + STEP and plan["limit"] == MAX_KLINE_LIMIT
+
+def test_forming_tail_is_refetched():
+    now = _now_bar()
+    store_klines("FORMUSDT", "1m", _bars(now, 150))
+    assert _plan_sync("FORMUSDT", "1m", 100, max_age=0.0)["startTime"] == now
+
+def test_gap_wider_than_a_page_refetches_the_window():
+    store_klines("GAPUSDT", "1m", _bars(_now_bar() - (MAX_KLINE_LIMIT + 5) * STEP, 150))
+    assert "startTime" not in _plan_sync("GAPUSDT", "1m", 100, max_age=0.0)
+
+def test_incremental_sync_appends_to_the_stored_tail(monkeypatch):
+    now = _now_bar()
+    store_klines("INCUSDT", "1m", _bars(now - 5 * STEP, 120))
+    asked = []
+    def fetch(calls, priority):
+        asked.extend(params for _, params in calls)
+        return [[r for r in _bars(now, 6) if r[0] >= params["startTime"]] for _, params in calls]
+    monkeypatch.setattr(candle_store, "fetch_json_many", fetch)
+    assert sync_klines("INCUSDT", "1m", 100, max_age=0.0) == 5
+    assert asked == [{"symbol": "INCUSDT", "interval": "1m", "limit": MAX_KLINE_LIMIT, "startTime": now - 4 * STEP}]
+    df = read_klines("INCUSDT", "1m", 100)
+    assert len(df) == 100 and df["Open time"].iloc[-1] == now and df["Open time"].diff().iloc[1:].eq(STEP).all()
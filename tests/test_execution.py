@@ -0,0 +1,72 @@
+import uuid
+import httpx
+from execution import OPEN_STATUSES, STOP_LOSS, TAKE_PROFIT, form_client_order_id
+from trade_store import leg_status
+from conftest import MARKET
+
+def _coid():
+    return f"t-{uuid.uuid4().hex[:12]}"
+
+def _exchange_orders(exchange, coid):
+    with exchange.lock: return [dict(o) for o in exchange.orders.values() if o["client_order_id"] == coid]
+
+def test_fill_arms_bracket(client, exchange):
+    coid = _coid()
+    client.submit("BTC-USD", "BUY", "market_order", 100.0, 2.0, sl=95.0, tp=110.0, client_order_id=coid)
+    entry = client.wait(coid, {"filled", "rejected"})
+    assert entry["status"] == "filled" and entry["filled"] == 2.0
+    tp = client.wait(f"{coid}-tp", OPEN_STATUSES)
+    assert tp["role"] == TAKE_PROFIT and tp["side"] == "SELL" and tp["quantity"] == 2.0 and tp["price"] == 110.0
+    assert _exchange_orders(exchange, f"{coid}-tp")[0]["status"] == "open"
+    sl = client.order(f"{coid}-sl")
+    assert sl["role"] == STOP_LOSS and sl["status"] == "armed" and sl["price"] == 95.0
+    # The stop is off-exchange until it fires, and journaled so a restart does not lose it.
+    assert _exchange_orders(exchange, f"{coid}-sl") == []
+    client._journal.submit(lambda: None).result()
+    assert leg_status(f"{coid}-sl") == "armed"
+
+def test_stop_trigger_cancels_take_profit(client, exchange, prices):
+    coid = _coid()
+    client.submit("BTC-USD", "BUY", "market_order", 100.0, 1.0, sl=95.0, tp=110.0, client_order_id=coid)
+    client.wait(f"{coid}-tp", OPEN_STATUSES)
+    prices["BTC-USD"] = 94.0
+    exchange.set_price(MARKET, 94.0)
+    sl = client.wait(f"{coid}-sl", {"filled", "rejected"})
+    assert sl["status"] == "filled"
+    assert client.order(f"{coid}-tp")["status"] == "cancelled"
+    assert _exchange_orders(exchange, f"{coid}-tp")[0]["status"] == "cancelled"
+    assert [o["status"] for o in _exchange_orders(exchange, f"{coid}-sl")] == ["filled"]
+
+def test_transport_error_is_resolved_by_client_id(client, exchange):
+    # The create reaches the exchange but the connection dies before the answer: no second order goes out.
+    coid, post, dropped = _coid(), client._post, []
+    async def flaky_post(path, payload):
+        res = await post(path, payload)
+        if path.endswith("/create") and not dropped:
+            dropped.append(path)
+            raise httpx.ReadError("connection reset")
+        return res
+    client._post = flaky_post
+    client.submit("BTC-USD", "BUY", "limit_order", 99.0, 1.0, client_order_id=coid)
+    rec = client.wait(coid, OPEN_STATUSES | {"rejected"})
+    assert dropped and rec["status"] == "open" and rec["id"] == _exchange_orders(exchange, coid)[0]["id"]
+    assert len(_exchange_orders(exchange, coid)) == 1
+
+def test_duplicate_client_order_id_is_rejected(client, exchange):
+    coid = _coid()
+    body = {"side": "buy", "order_type": "limit_order", "market": MARKET, "total_quantity": 1.0, "price_per_unit": 99.0, "client_order_id": coid}
+    assert exchange.create(body)[0] == 200
+    status, answer = exchange.create(body)
+    assert status == 400 and "Duplicate" in answer["message"]
+    # The client never sends a resubmitted id again: the second submit returns the first order.
+    other = _coid()
+    first = client.submit("BTC-USD", "BUY", "limit_order", 99.0, 1.0, client_order_id=other)
+    second = client.submit("BTC-USD", "BUY", "limit_order", 99.0, 1.0, client_order_id=other)
+    client.wait(other, OPEN_STATUSES | {"rejected"})
+    assert first["client_order_id"] == second["client_order_id"] and len(_exchange_orders(exchange, other)) == 1
+
+def test_form_order_id_is_stable_per_nonce():
+    fields = ("BTC-USD", "BUY", "limit_order", 99.0, 1.0, 95.0, 110.0)
+    assert form_client_order_id("n1", *fields) == form_client_order_id("n1", *fields)
+    assert form_client_order_id("n1", *fields) != form_client_order_id("n2", *fields)
+    assert form_client_order_id("n1", *fields) != form_client_order_id("n1", *fields[:-1], 111.0)
@@ -0,0 +1,53 @@
+import json
+import time
+from candle_store import read_klines
+from market_stream import ALL_TICKERS_STREAM, KLINE_WANT_TTL, MarketStream
+
+def _wait(cond, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if cond(): return True
+        time.sleep(0.02)
+    return False
+
+def _kline(symbol, open_time, close, closed):
+    return {"stream": f"{symbol.lower()}@kline_1m", "data": {"e": "kline", "s": symbol, "k": {
+        "t": open_time, "T": open_time + 59_999, "s": symbol, "i": "1m", "o": "1.0", "h": "2.0", "l": "0.5", "c": str(close), "v": "10", "x": closed}}}
+
+def test_replay_feeds_prices_candles_and_the_store(tmp_path):
+    t0 = 1_700_000_040_000
+    lines = [
+        {"stream": ALL_TICKERS_STREAM, "data": [{"e": "24hrMiniTicker", "s": "RPLUSDT", "c": "110", "o": "100", "h": "111", "q": "5000"},
+                                                {"e": "24hrMiniTicker", "s": "RPLBTC", "c": "1", "o": "1"}], "_ts": 1},
+        {**_kline("RPLUSDT", t0, 1.5, True), "_ts": 2},
+        {**_kline("RPLUSDT", t0 + 60_000, 1.7, False), "_ts": 3},
+        {"stream": ALL_TICKERS_STREAM, "data": [{"e": "24hrMiniTicker", "s": "RPLUSDT", "c": "90", "o": "100", "h": "111", "q": "6000"}], "_ts": 4},
+    ]
+    replay = tmp_path / "replay.jsonl"
+    replay.write_text("\n".join(json.dumps(line) for line in lines) + "\n")
+    stream, ticks = MarketStream(replay_file=str(replay), replay_speed=0), []
+    stream.add_listener(lambda coin, ltp: ticks.append((coin, ltp)))
+    stream.start()
+    try:
+        assert _wait(lambda: stream.status["messages"] == len(lines))
+        assert ticks == [("RPL-USD", 110.0), ("RPL-USD", 90.0)]
+        assert stream.table.get_price("RPL-USD") == (90.0, -10.0, -10.0)
+        assert stream.table.get_candle("RPLUSDT", "1m")[0] == t0 + 60_000
+        assert stream.breadth.advance_decline()[:2] == (0, 1)
+        # Only the closed candle is written, on the writer thread after the batch delay.
+        assert _wait(lambda: len(read_klines("RPLUSDT", "1m", 10)) == 1)
+        assert read_klines("RPLUSDT", "1m", 10)["Open time"].tolist() == [t0]
+    finally:
+        stream._task.cancel()
+
+def test_kline_wants_are_per_owner_and_expire():
+    stream = MarketStream()
+    stream._want("watchlist", frozenset({"btcusdt@kline_1m", "ethusdt@kline_1m"}), 0.0)
+    stream._want("chart", frozenset({"solusdt@kline_5m"}), 1.0)
+    assert stream.streams == {ALL_TICKERS_STREAM, "btcusdt@kline_1m", "ethusdt@kline_1m", "solusdt@kline_5m"}
+    # The next call from an owner replaces its set; the others keep theirs.
+    stream._want("watchlist", frozenset({"btcusdt@kline_1m"}), 2.0)
+    assert stream.streams == {ALL_TICKERS_STREAM, "btcusdt@kline_1m", "solusdt@kline_5m"}
+    # An owner that stops asking drops out once KLINE_WANT_TTL has passed.
+    stream._want("watchlist", frozenset({"btcusdt@kline_1m"}), KLINE_WANT_TTL + 1.5)
+    assert stream.streams == {ALL_TICKERS_STREAM, "btcusdt@kline_1m"}
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from candle_store import INTERVAL_MS
+from mdf_state import MIN_BARS, MDFState, calculate_mdf_physics
+
+STEP = INTERVAL_MS["1m"]
+
+def _rows(n, seed):
+    rng = np.random.default_rng(seed)
+    # Rounded closes so equal consecutive closes (delta == 0) show up too.
+    closes = np.round(100 + np.cumsum(rng.normal(0, 1, n)), 0)
+    volumes = rng.uniform(1, 50, n)
+    return [[i * STEP, c, c + 1, c - 1, c, v, (i + 1) * STEP - 1] for i, (c, v) in enumerate(zip(closes, volumes))]
+
+def _frame(rows):
+    return pd.DataFrame({"Close": [r[4] for r in rows], "Volume": [r[5] for r in rows]})
+
+@pytest.mark.parametrize("n", [MIN_BARS, 21, 35, 200, 1500])
+def test_incremental_matches_reference(n):
+    rows = _rows(n, n)
+    state = MDFState("1m")
+    for r in rows: state.push(r[0], r[4], r[5])
+    assert state.value() == pytest.approx(calculate_mdf_physics(_frame(rows)))
+
+def test_update_in_chunks_matches_reference():
+    rows = _rows(300, 7)
+    state = MDFState("1m")
+    for i in range(0, len(rows), 37): state.update(rows[i:i + 37], now_ms=rows[-1][6] + 1)
+    # Re-sent bars are ignored.
+    state.update(rows[-10:], now_ms=rows[-1][6] + 1)
+    assert state.value() == pytest.approx(calculate_mdf_physics(_frame(rows)))
+
+def test_forming_candle_is_previewed_not_committed():
+    rows = _rows(100, 3)
+    state = MDFState("1m")
+    state.update(rows[:-1], now_ms=rows[-1][0])
+    assert state.value(rows[-1]) == pytest.approx(calculate_mdf_physics(_frame(rows)))
+    assert state.value() == pytest.approx(calculate_mdf_physics(_frame(rows[:-1])))
+
+def test_gap_marks_state_stale():
+    rows = _rows(50, 5)
+    state = MDFState("1m")
+    state.update(rows[:30], now_ms=rows[-1][6] + 1)
+    state.update(rows[31:], now_ms=rows[-1][6] + 1)
+    assert state.stale
+
+def test_registry_seeds_from_store_and_follows_writes():
+    from candle_store import store_klines
+    from mdf_state import SEED_BARS, mdf_physics
+    rows = _rows(SEED_BARS + 10, 11)
+    store_klines("MDFUSDT", "1m", rows[:-5])
+    assert mdf_physics("MDFUSDT", "1m") == pytest.approx(calculate_mdf_physics(_frame(rows[-SEED_BARS - 5:-5])))
+    store_klines("MDFUSDT", "1m", rows[-5:])
+    assert mdf_physics("MDFUSDT", "1m") == pytest.approx(calculate_mdf_physics(_frame(rows[-SEED_BARS:])))
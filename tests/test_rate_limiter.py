@@ -0,0 +1,80 @@
+import asyncio
+import time
+import httpx
+from market_client import MarketDataClient
+from rate_limiter import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, WeightRateLimiter
+
+HOST = "api.binance.com"
+KLINES = f"https://{HOST}/api/v3/klines"
+
+def _limiter(limit=100):
+    # Capacity 90 weight, refilled at 1.5 weight per second.
+    return WeightRateLimiter({HOST: limit})
+
+def test_used_weight_header_resyncs_the_bucket():
+    async def run():
+        limiter = _limiter()
+        assert await limiter.acquire(KLINES) == 0.0
+        assert limiter.observe(KLINES, 200, {"x-mbx-used-weight-1m": "89"}) == 0.0
+        stats = limiter.stats()[HOST]
+        assert stats["server_used_weight"] == 89 and stats["tokens"] <= 1.1
+        start = time.monotonic()
+        await limiter.acquire(KLINES)  # weight 2: has to wait for the refill
+        return time.monotonic() - start
+    assert asyncio.run(run()) >= 0.5
+
+def test_429_blocks_the_host_until_retry_after():
+    async def run():
+        limiter = _limiter(6000)
+        assert limiter.observe(KLINES, 429, {"retry-after": "0.3"}) == 0.3
+        assert HOST in limiter.blocked_hosts()
+        start = time.monotonic()
+        await limiter.acquire(KLINES)
+        return time.monotonic() - start, limiter.stats()[HOST]
+    waited, stats = asyncio.run(run())
+    assert waited >= 0.29 and stats["throttled_429"] == 1
+
+def test_418_without_retry_after_uses_the_default_ban():
+    limiter = _limiter()
+    assert limiter.observe(KLINES, 418, {}) == 120.0
+    assert limiter.observe(KLINES, 418, {"retry-after": "soon"}) == 120.0
+    assert limiter.blocked_hosts()[HOST] > 100 and limiter.stats()[HOST]["banned_418"] == 2
+
+def test_queued_requests_are_released_by_priority():
+    async def run():
+        limiter, order = _limiter(6000), []
+        limiter.observe(KLINES, 429, {"retry-after": "0.1"})
+        async def ask(name, priority):
+            await limiter.acquire(KLINES, priority=priority)
+            order.append(name)
+        await asyncio.gather(ask("bg1", PRIORITY_BACKGROUND), ask("bg2", PRIORITY_BACKGROUND), ask("chart", PRIORITY_INTERACTIVE))
+        return order
+    assert asyncio.run(run()) == ["chart", "bg1", "bg2"]
+
+def _client(responses, limiter):
+    seen = []
+    def handler(request):
+        seen.append(time.monotonic())
+        return responses.pop(0)
+    client = MarketDataClient(limiter=limiter)
+    client._clients[HOST] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client._sems[HOST] = asyncio.Semaphore(1)
+    return client, seen
+
+def test_client_retries_a_429_after_the_block():
+    async def run():
+        client, seen = _client([httpx.Response(429, headers={"retry-after": "0.3"}), httpx.Response(200, json=[1])], _limiter(6000))
+        data = await client.get_json(KLINES, {"symbol": "BTCUSDT"})
+        await client.aclose()
+        return data, seen
+    data, seen = asyncio.run(run())
+    assert data == [1] and len(seen) == 2 and seen[1] - seen[0] >= 0.29
+
+def test_client_returns_a_long_418_ban_without_retrying():
+    async def run():
+        client, seen = _client([httpx.Response(418, headers={"retry-after": "600"})], _limiter(6000))
+        data = await client.get_json(KLINES, {"symbol": "BTCUSDT"})
+        await client.aclose()
+        return data, seen
+    data, seen = asyncio.run(run())
+    assert data is None and len(seen) == 1
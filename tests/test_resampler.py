@@ -0,0 +1,55 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from candle_store import CANDLE_COLUMNS, INTERVAL_MS, store_klines
+from resampler import read_interval, read_interval_range
+
+def _bars(interval, first_open, n, seed):
+    rng = np.random.default_rng(seed)
+    step = INTERVAL_MS[interval]
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = np.r_[100.0, close[:-1]]
+    high, low = np.maximum(open_, close) + rng.uniform(0, 1, n), np.minimum(open_, close) - rng.uniform(0, 1, n)
+    return [[first_open + i * step, o, h, l, c, v, first_open + (i + 1) * step - 1] for i, (o, h, l, c, v) in enumerate(zip(open_, high, low, close, rng.uniform(1, 10, n)))]
+
+def _pandas(rows, interval):
+    df = pd.DataFrame(rows, columns=CANDLE_COLUMNS)
+    df.index = pd.to_datetime(df["Open time"], unit="ms")
+    out = df.resample(f"{INTERVAL_MS[interval] // 60_000}min").agg({"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}).dropna()
+    return out.assign(**{"Open time": (out.index - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)})
+
+def _assert_same(got, want):
+    got = pd.DataFrame(got)
+    assert got["Open time"].tolist() == want["Open time"].tolist()
+    for f in ("Open", "High", "Low", "Close", "Volume"): np.testing.assert_allclose(got[f].to_numpy(), want[f].to_numpy())
+
+def _window(want, interval, bars):
+    # Derived reads cover the last `bars` buckets up to the current one, stored or not.
+    step = INTERVAL_MS[interval]
+    return want[want["Open time"] >= (int(time.time() * 1000) // step - bars + 1) * step]
+
+def test_derived_tail_matches_pandas_and_follows_writes():
+    step = INTERVAL_MS["1m"]
+    now = int(time.time() * 1000) // step * step
+    rows = _bars("1m", now - 599 * step, 600, 1)
+    store_klines("RSMUSDT", "1m", rows[:-40])
+    _assert_same(read_interval("RSMUSDT", "15m", 30), _window(_pandas(rows[:-40], "15m"), "15m", 30))
+    # Later base writes (a catch-up, then the forming bar revised) only recompute the touched buckets.
+    store_klines("RSMUSDT", "1m", rows[-40:-1])
+    rows[-1][4] += 5.0
+    store_klines("RSMUSDT", "1m", rows[-1:])
+    _assert_same(read_interval("RSMUSDT", "15m", 30), _window(_pandas(rows, "15m"), "15m", 30))
+    # A deeper read than the cached one rebuilds from the store.
+    _assert_same(read_interval("RSMUSDT", "15m", 40), _window(_pandas(rows, "15m"), "15m", 40))
+
+@pytest.mark.parametrize("interval,base", [("4h", "1h"), ("1d", "1h"), ("30m", "1m")])
+def test_range_read_matches_pandas(interval, base):
+    first = 1_700_000_000_000 // INTERVAL_MS[base] * INTERVAL_MS[base]
+    rows = _bars(base, first, 24 * 12 if base == "1h" else 600, 2)
+    symbol = f"RNG{interval.upper()}USDT"
+    store_klines(symbol, base, rows)
+    start, end = first + 5 * INTERVAL_MS[base], rows[-1][0]
+    # The first bucket is widened to its start, so it is whole rather than cut at start.
+    want = _pandas([r for r in rows if r[0] >= start // INTERVAL_MS[interval] * INTERVAL_MS[interval]], interval)
+    _assert_same(read_interval_range(symbol, interval, start, end), want)
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+from mdf_state import calculate_mdf_physics
+from scan_engine import batch_signals, rolling_signals, stack_ohlcv
+
+def _frames(n_coins=200, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for i in range(n_coins):
+        n = int(rng.integers(40, 130))
+        close = 100 * np.exp(np.cumsum(rng.normal(rng.normal(0, 0.003), 0.01, n)))
+        open_ = np.r_[close[0], close[:-1]]
+        high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, n))
+        low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, n))
+        frames[f"C{i}-USD"] = pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": rng.uniform(1, 100, n)})
+    return frames
+
+def _reference(coin, df, sentiment):
+    # The per-coin DataFrame scan the vectorized engine replaced.
+    df = df.tail(100).reset_index(drop=True)
+    if len(df) < 50: return None
+    upper = df['High'].rolling(10).max().shift(1).iloc[-1]
+    lower = df['Low'].rolling(10).min().shift(1).iloc[-1]
+    _, phase, *_ = calculate_mdf_physics(df)
+    entry, signal, sl = df['Close'].iloc[-1], None, 0.0
+    if df['High'].iloc[-1] >= upper and phase == "BULL": signal, sl = "BUY", df['Low'].rolling(8).min().shift(1).iloc[-1]
+    elif df['Low'].iloc[-1] <= lower and phase == "BEAR": signal, sl = "SHORT", df['High'].rolling(8).max().shift(1).iloc[-1]
+    if (sentiment == "BULLISH" and signal == "SHORT") or (sentiment == "BEARISH" and signal == "BUY"): return None
+    if not signal or sl <= 0 or abs(entry - sl) <= 0: return None
+    risk = abs(entry - sl)
+    return {"Stock": coin, "Signal": signal, "Entry": entry, "SL": sl, "Target": entry + risk * 3 if signal == "BUY" else entry - risk * 3}
+
+@pytest.mark.parametrize("sentiment", ["BOTH", "BULLISH", "BEARISH"])
+def test_batch_signals_match_per_coin_scan(sentiment):
+    frames = _frames()
+    coins, arrays = stack_ohlcv(frames)
+    got = {s["Stock"]: s for s in batch_signals(coins, arrays, sentiment)}
+    want = {c: r for c, df in frames.items() for r in [_reference(c, df, sentiment)] if r}
+    assert set(got) == set(want)
+    if sentiment == "BOTH": assert {s["Signal"] for s in want.values()} == {"BUY", "SHORT"}
+    for coin, ref in want.items():
+        assert got[coin]["Signal"] == ref["Signal"]
+        assert [got[coin][k] for k in ("Entry", "SL", "Target")] == pytest.approx([ref[k] for k in ("Entry", "SL", "Target")])
+
+def test_rolling_signals_agree_with_batch_signals_on_every_bar():
+    frames = {c: df for c, df in _frames(20, seed=1).items() if len(df) >= 60}
+    for coin, df in frames.items():
+        h, l, c = (df[f].to_numpy() for f in ("High", "Low", "Close"))
+        rolled = rolling_signals(h, l, c)
+        for t in range(50, len(df)):
+            _, arrays = stack_ohlcv({coin: df.iloc[:t + 1]}, bars=t + 1, min_bars=1)
+            sig = batch_signals([coin], arrays)
+            assert bool(rolled["Buy"][t]) == bool(sig and sig[0]["Signal"] == "BUY")
+            assert bool(rolled["Short"][t]) == bool(sig and sig[0]["Signal"] == "SHORT")
+            if sig: assert rolled["SL"][t] == pytest.approx(sig[0]["SL"])
@@ -0,0 +1,77 @@
+import time
+import candle_store
+import scan_worker
+from candle_store import INTERVAL_MS, store_klines
+
+INTERVAL = "5m"
+STEP = INTERVAL_MS["1m"]
+
+def _bars(end_ms, n=600):
+    # n closed 1m bars, the last one closing just before end_ms.
+    start = (end_ms // STEP - n) * STEP
+    return [[t, 100.0, 101.0, 99.0, 100.0, 10.0, t + STEP - 1] for t in range(start, start + n * STEP, STEP)]
+
+def _scan(monkeypatch, coins, fetch):
+    scanned = []
+    def fake_signals(names, arrays, sentiment):
+        scanned.extend(names)
+        return [{"Stock": c, "Signal": "BUY", "Entry": 100.0, "LTP": 100.0} for c in names]
+    monkeypatch.setattr(candle_store, "fetch_json_stream", fetch)
+    monkeypatch.setattr(scan_worker, "batch_signals", fake_signals)
+    batches = list(scan_worker.scan_signals_stream(coins, INTERVAL, deadline=1.0, max_age=0))
+    return [c for done, _ in batches for c in done], [s for _, signals in batches for s in signals], scanned
+
+def test_failed_fetch_scans_nothing(monkeypatch):
+    # Bars from three hours ago are stored; the refresh comes back as an error.
+    store_klines("FAILUSDT", "1m", _bars(int(time.time() * 1000) - 3 * 3_600_000))
+    def fetch(calls, priority, deadline):
+        for i, _ in enumerate(calls): yield i, None
+    done, signals, scanned = _scan(monkeypatch, ["FAIL-USD"], fetch)
+    assert done == [] and signals == [] and scanned == []
+
+def test_timed_out_fetch_scans_nothing(monkeypatch):
+    store_klines("SLOWUSDT", "1m", _bars(int(time.time() * 1000) - 3 * 3_600_000))
+    def fetch(calls, priority, deadline):
+        return iter(())
+    done, signals, scanned = _scan(monkeypatch, ["SLOW-USD"], fetch)
+    assert done == [] and signals == [] and scanned == []
+
+def test_fresh_fetch_is_scanned(monkeypatch):
+    rows = _bars(int(time.time() * 1000))
+    def fetch(calls, priority, deadline):
+        for i, _ in enumerate(calls): yield i, rows
+    done, signals, scanned = _scan(monkeypatch, ["GOOD-USD"], fetch)
+    assert done == ["GOOD-USD"] and scanned == ["GOOD-USD"] and len(signals) == 1
+
+def test_unscanned_coin_loses_published_rows(monkeypatch):
+    stale = {"Stock": "OLD-USD", "Signal": "BUY", "Entry": 1.0, "LTP": 1.0}
+    scan_worker.publish(f"signals:{INTERVAL}", {"coins": ["OLD-USD"], "pending": [], "signals": [stale]})
+    def fetch(calls, priority, deadline):
+        for i, _ in enumerate(calls): yield i, None
+    monkeypatch.setattr(candle_store, "fetch_json_stream", fetch)
+    result = list(scan_worker.stream_signals(["OLD-USD"], INTERVAL, replace=True, deadline=1.0))[-1]
+    assert result["pending"] == ["OLD-USD"] and result["signals"] == []
+
+def _universe(monkeypatch, coins, got):
+    def stream(shard, interval):
+        scanned = [c for c in shard if c in got]
+        yield scanned, [{"Stock": c, "Signal": "BUY", "Entry": 2.0, "LTP": 2.0} for c in scanned]
+    monkeypatch.setattr(scan_worker, "scan_signals_stream", stream)
+    scan = scan_worker.UniverseScan(INTERVAL)
+    scan.order, scan.queue, scan.running, scan.deadline = list(coins), list(coins), True, time.time() + 60
+    scan.signals = {c: [{"Stock": c, "Signal": "SHORT", "Entry": 1.0, "LTP": 1.0}] for c in coins}
+    scan.scanned_at = dict.fromkeys(coins, 1.0)
+    return scan
+
+def test_universe_shard_only_counts_coins_it_scanned(monkeypatch):
+    scan = _universe(monkeypatch, ["A-USD", "B-USD", "C-USD"], {"A-USD", "C-USD"})
+    now = time.time()
+    result = scan.step(now)
+    assert result["scanned"] == 2 and scan.queue == ["B-USD"] and scan.running
+    assert scan.scanned_at == {"A-USD": now, "B-USD": 1.0, "C-USD": now}
+    assert [s["Signal"] for s in scan.signals["B-USD"]] == ["SHORT"] and [s["Signal"] for s in scan.signals["A-USD"]] == ["BUY"]
+
+def test_universe_shard_with_nothing_scanned_ends_the_pass(monkeypatch):
+    scan = _universe(monkeypatch, ["A-USD", "B-USD"], set())
+    result = scan.step(time.time())
+    assert result["scanned"] == 0 and not scan.running and scan.queue == ["A-USD", "B-USD"] and result["deferred"] == 2
@@ -0,0 +1,38 @@
+import threading
+import time
+import shared_cache
+from shared_cache import LocalBackend, get_or_compute
+
+def test_expired_entries_are_swept_on_write():
+    backend = LocalBackend(sweep_every=0.0)
+    backend.set("old", 1, ttl=-1)
+    backend.add("old:lock", ttl=-1)
+    backend.set("new", 2, ttl=60)
+    assert list(backend._data) == ["new"]
+    assert backend.get("new")[1] == 2
+
+def test_oldest_entries_are_evicted_past_the_bound():
+    backend = LocalBackend(max_entries=3)
+    for i in range(5): backend.set(f"k{i}", i, ttl=60)
+    assert list(backend._data) == ["k2", "k3", "k4"]
+    assert backend.get("k0") is None
+    # Rewriting a key makes it the newest again.
+    backend.set("k2", 2, ttl=60)
+    backend.set("k5", 5, ttl=60)
+    assert list(backend._data) == ["k4", "k2", "k5"]
+
+def test_concurrent_callers_compute_once_and_release_the_flight(monkeypatch):
+    monkeypatch.setattr(shared_cache, "_backend", LocalBackend())
+    calls, gate = [], threading.Event()
+    def compute():
+        calls.append(1)
+        gate.wait(5)
+        return "value"
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(get_or_compute("test:flight", compute, 60))) for _ in range(4)]
+    for t in threads: t.start()
+    time.sleep(0.2)
+    gate.set()
+    for t in threads: t.join(5)
+    assert results == ["value"] * 4 and len(calls) == 1
+    assert "test:flight" not in shared_cache._flights
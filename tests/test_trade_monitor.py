@@ -0,0 +1,38 @@
+import sqlite3
+import trade_monitor
+from trade_store import clear_trades, load_active_trades, open_trade
+
+class _Stream:
+    listeners = []
+
+def _monitor():
+    clear_trades()
+    assert open_trade({"Date": "2026-01-01 00:00:00", "Stock": "ETH-USD", "Signal": "BUY", "Entry": 100.0, "SL": 95.0, "Target": 110.0, "Status": "RUNNING", "Qty": 1.0})
+    monitor = trade_monitor.TradeMonitor(stream=_Stream())
+    monitor.reload(force=True)
+    return monitor
+
+def _drain(monitor):
+    # Done-callbacks run on the writer thread before it picks up the next task.
+    monitor._writer.submit(lambda: None).result()
+
+def test_exit_is_written_once():
+    monitor = _monitor()
+    monitor.on_tick("ETH-USD", 94.0)
+    monitor.on_tick("ETH-USD", 93.0)
+    _drain(monitor)
+    assert load_active_trades() == [] and monitor.stats["exits"] == 1
+    assert monitor.by_coin["ETH-USD"] == []
+
+def test_failed_close_keeps_trade_watched(monkeypatch):
+    monitor = _monitor()
+    def locked(*args): raise sqlite3.OperationalError("database is locked")
+    monkeypatch.setattr(trade_monitor, "close_trade", locked)
+    monitor.on_tick("ETH-USD", 94.0)
+    _drain(monitor)
+    assert [t["Stock"] for t in monitor.by_coin["ETH-USD"]] == ["ETH-USD"]
+    # Once the journal is writable again the next tick closes it.
+    monkeypatch.undo()
+    monitor.on_tick("ETH-USD", 94.0)
+    _drain(monitor)
+    assert load_active_trades() == [] and monitor.stats["exits"] == 1
@@ -0,0 +1,55 @@
+import threading
+import pandas as pd
+import pytest
+import trade_store
+from trade_store import close_trade, journal_revision, load_active_trades, load_trade_history, open_trade
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    # A fresh journal file and connection cache, with the legacy CSVs in tmp_path.
+    monkeypatch.setattr(trade_store, "TRADE_DB_FILE", str(tmp_path / "trades.db"))
+    monkeypatch.setattr(trade_store, "ACTIVE_TRADES_FILE", str(tmp_path / "active.csv"))
+    monkeypatch.setattr(trade_store, "HISTORY_TRADES_FILE", str(tmp_path / "history.csv"))
+    monkeypatch.setattr(trade_store, "_local", threading.local())
+    return tmp_path
+
+def _reconnect(monkeypatch):
+    # What another process (or thread) opening the same journal does.
+    monkeypatch.setattr(trade_store, "_local", threading.local())
+
+def _trade(stock="BTC-USD"):
+    return {"Date": "2026-01-01 10:00", "Stock": stock, "Signal": "BUY", "Entry": 100.0, "SL": 95.0, "Target": 110.0, "Status": "RUNNING"}
+
+def test_legacy_csvs_are_imported_once(journal, monkeypatch):
+    pd.DataFrame([_trade("BTC-USD"), _trade("ETH-USD")]).to_csv(journal / "active.csv", index=False)
+    pd.DataFrame([{"Date": "2025-12-31 09:00", "Stock": "SOL-USD", "Signal": "SHORT", "Entry": 50.0, "Exit": 45.0, "Status": "🎯 TARGET HIT", "P&L %": 10.0}]).to_csv(journal / "history.csv", index=False)
+    assert [t["Stock"] for t in load_active_trades()] == ["BTC-USD", "ETH-USD"]
+    assert [(t["Stock"], t["P&L %"]) for t in load_trade_history()] == [("SOL-USD", 10.0)]
+    assert not (journal / "active.csv").exists() and (journal / "active.csv.migrated").exists()
+    revision = journal_revision()
+    # A copy of the old file showing up again (another replica's checkout) is not imported twice.
+    (journal / "active.csv.migrated").rename(journal / "active.csv")
+    _reconnect(monkeypatch)
+    assert [t["Stock"] for t in load_active_trades()] == ["BTC-USD", "ETH-USD"]
+    assert journal_revision() == revision
+
+def test_unreadable_csv_is_left_in_place(journal):
+    (journal / "active.csv").write_bytes(b"\xff\xfe\x00garbage")
+    assert load_active_trades() == []
+    assert (journal / "active.csv").exists() and not (journal / "active.csv.migrated").exists()
+
+def test_one_running_trade_per_coin(journal):
+    assert open_trade(_trade())
+    assert not open_trade(_trade())
+    trade = load_active_trades()[0]
+    assert close_trade(trade, 110.0, "🎯 TARGET HIT")["P&L %"] == 10.0
+    assert open_trade(_trade())
+
+def test_close_is_guarded_and_idempotent(journal):
+    open_trade(_trade())
+    trade = load_active_trades()[0]
+    revision = journal_revision()
+    assert close_trade(trade, 95.0, "🛑 SL HIT") is not None
+    assert close_trade(trade, 110.0, "🎯 TARGET HIT") is None
+    assert [(t["Status"], t["Exit"]) for t in load_trade_history()] == [("🛑 SL HIT", 95.0)]
+    assert journal_revision() == revision + 1
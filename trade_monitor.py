@@ -0,0 +1,134 @@
+import concurrent.futures
+import json
+import os
+import threading
+import time
+from execution import STOP_LOSS, ExecutionClient
+from market_stream import MarketStream
+from market_snapshot import fetch_ticker_dict
+from metrics import error, fallback, inc, serve_metrics, timed
+from trade_store import TRADE_DB_FILE, load_active_trades, check_exit, close_trade, journal_version
+
+# --- Standalone Trade Monitor ---
+# Run with `python trade_monitor.py`. Owns SL/target exits for every active trade: each streamed
+# price tick is checked against the trades on that coin and fills are written to the trade store
+# from a writer thread, so a slow or locked journal never holds up the stream.
+# Coins Binance does not stream are checked from the REST ticker instead. While the heartbeat
+# file is fresh the dashboard only opens trades and reads state. With DCX_KEY / DCX_SECRET in the
+# environment it also owns the armed stop losses of exchange orders: legs journaled by any
+# dashboard are adopted on the next journal change and fired from the same price stream.
+MONITOR_HEARTBEAT_FILE = "crypto_monitor_heartbeat.json"
+HEARTBEAT_INTERVAL = 1.0
+MONITOR_ALIVE_AFTER = 5.0
+REST_FALLBACK_INTERVAL = 5.0
+
+def monitor_execution_client(stream):
+    key, secret = os.environ.get("DCX_KEY"), os.environ.get("DCX_SECRET")
+    if not key or not secret: return None
+    return ExecutionClient(key, secret, price_fn=lambda coin: (stream.table.get_price(coin) or (None,))[0])
+
+def read_heartbeat():
+    try:
+        with open(MONITOR_HEARTBEAT_FILE, encoding="utf-8") as fh: return json.load(fh)
+    except: return None
+
+def monitor_alive(max_age=MONITOR_ALIVE_AFTER):
+    beat = read_heartbeat()
+    return beat is not None and time.time() - beat.get("ts", 0) < max_age
+
+def monitor_owns_stops(max_age=MONITOR_ALIVE_AFTER):
+    # A monitor without exchange keys leaves armed stops to the dashboard.
+    beat = read_heartbeat()
+    return beat is not None and time.time() - beat.get("ts", 0) < max_age and beat.get("armed_stops") is not None
+
+class TradeMonitor:
+    def __init__(self, stream=None, execution=None):
+        self.stream = stream or MarketStream()
+        self.execution = execution or monitor_execution_client(self.stream)
+        self.by_coin = {}
+        self.stats = {"ticks": 0, "exits": 0, "started": time.time()}
+        self._lock = threading.Lock()
+        self._version = None
+        self.alerted = set()
+        self._writer = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="monitor-exits")
+
+    def reload(self, force=False):
+        version = journal_version()
+        if not force and version == self._version: return
+        by_coin = {}
+        for trade in load_active_trades(): by_coin.setdefault(trade['Stock'], []).append(trade)
+        with self._lock:
+            self.by_coin = by_coin
+            self._version = version
+        if self.execution:
+            adopted = self.execution.adopt_legs()
+            if adopted: print(f"{time.strftime('%H:%M:%S')} adopted {adopted} bracket legs", flush=True)
+            for leg in self.execution.orders():
+                if leg["role"] == STOP_LOSS and leg["status"] == "rejected" and leg["client_order_id"] not in self.alerted:
+                    self.alerted.add(leg["client_order_id"])
+                    print(f"{time.strftime('%H:%M:%S')} 🚨 STOP LOSS REJECTED {leg['coin']} {leg['side']} {leg['quantity']} @ {leg['price']}: {leg['error']}", flush=True)
+
+    @timed("stage_seconds", stage="monitor.tick")
+    def on_tick(self, coin, ltp):
+        self.stats["ticks"] += 1
+        if coin not in self.by_coin or ltp <= 0: return
+        exits = []
+        with self._lock:
+            for trade in list(self.by_coin.get(coin, [])):
+                close_reason, exit_price = check_exit(trade, ltp)
+                if not close_reason: continue
+                self.by_coin[coin].remove(trade)
+                exits.append((trade, self._writer.submit(self.close, trade, exit_price, close_reason, ltp)))
+        # Outside the lock: a callback on an already finished write runs right here and takes it.
+        for trade, done in exits: done.add_done_callback(lambda f, trade=trade: self._close_done(trade, f))
+
+    def _close_done(self, trade, done):
+        if done.exception() is None: return
+        error("trade_monitor.close")
+        # The write failed (locked or broken journal): watch the trade again so the next tick retries the exit.
+        with self._lock:
+            trades = self.by_coin.setdefault(trade['Stock'], [])
+            if all(t['id'] != trade['id'] for t in trades): trades.append(trade)
+
+    def close(self, trade, exit_price, close_reason, ltp):
+        # Runs on the writer thread. close_trade only updates a still-running row, so an exit queued
+        # twice (a reload re-read the trade before the first write landed) is recorded once.
+        if close_trade(trade, exit_price, close_reason):
+            self.stats["exits"] += 1
+            inc("monitor_exits_total", reason=close_reason)
+            print(f"{time.strftime('%H:%M:%S')} {close_reason} {trade['Stock']} {trade['Signal']} @ {exit_price} (ltp {ltp})", flush=True)
+
+    def poll_unstreamed(self):
+        missing = [coin for coin in list(self.by_coin) if self.stream.table.get_price(coin) is None]
+        if not missing: return
+        fallback("monitor.rest_poll", len(missing))
+        tickers = fetch_ticker_dict()
+        for coin in missing:
+            if coin in tickers: self.on_tick(coin, float(tickers[coin]['last_price']))
+
+    def write_heartbeat(self):
+        stops = sum(o["status"] == "armed" for o in self.execution.orders()) if self.execution else None
+        beat = {"pid": os.getpid(), "ts": time.time(), "active": sum(len(v) for v in self.by_coin.values()), "armed_stops": stops, **self.stats, "stream": dict(self.stream.status)}
+        tmp_name = f"{MONITOR_HEARTBEAT_FILE}.tmp"
+        with open(tmp_name, "w", encoding="utf-8") as fh: json.dump(beat, fh)
+        os.replace(tmp_name, MONITOR_HEARTBEAT_FILE)
+
+    def run_forever(self):
+        self.reload(force=True)
+        self.stream.add_listener(self.on_tick)
+        self.stream.start()
+        last_poll = 0.0
+        while True:
+            self.reload()
+            if time.time() - last_poll >= REST_FALLBACK_INTERVAL:
+                try: self.poll_unstreamed()
+                except: error("trade_monitor.poll")
+                last_poll = time.time()
+            self.write_heartbeat()
+            time.sleep(HEARTBEAT_INTERVAL)
+
+if __name__ == "__main__":
+    print(f"Trade monitor started (pid {os.getpid()}), watching {TRADE_DB_FILE}", flush=True)
+    if not os.environ.get("DCX_KEY"): print("DCX_KEY / DCX_SECRET not set: armed stop losses stay with the dashboard that placed them.", flush=True)
+    serve_metrics()
+    TradeMonitor().run_forever()
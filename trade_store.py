@@ -0,0 +1,221 @@
+import os
+import sqlite3
+import threading
+import datetime
+import time
+import pytz
+from metrics import error
+
+# --- Trade Journal ---
+# One SQLite (WAL) row per trade, shared by every dashboard session and the trade monitor process.
+# Opening a trade is a single INSERT and closing it a single guarded UPDATE of that row; nothing
+# is ever rewritten wholesale. A partial unique index allows only one RUNNING trade per coin,
+# so two sessions firing the same signal cannot both open it. The exit legs of exchange orders
+# (take profit, stop loss) are journaled too, so an armed stop survives a restart of whichever
+# process holds it and the trade monitor can take it over.
+TRADE_DB_FILE = os.environ.get("TRADE_DB_FILE", "crypto_trades.db")
+ACTIVE_TRADES_FILE = "crypto_active_trades.csv"
+HISTORY_TRADES_FILE = "crypto_trade_history.csv"
+RUNNING = "RUNNING"
+
+_local = threading.local()
+_state_lock = threading.Lock()
+_state = [None, [], 0, {}]
+
+def _conn():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(TRADE_DB_FILE, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS trades (id INTEGER PRIMARY KEY AUTOINCREMENT, opened_at TEXT NOT NULL, stock TEXT NOT NULL, "
+            "signal TEXT NOT NULL, entry REAL NOT NULL, sl REAL NOT NULL, target REAL NOT NULL, status TEXT NOT NULL, "
+            "closed_at TEXT, exit REAL, pnl_pct REAL, qty REAL);"
+            "CREATE INDEX IF NOT EXISTS idx_trades_status ON trades (status, closed_at);"
+            "CREATE INDEX IF NOT EXISTS idx_trades_stock ON trades (stock, status);"
+            f"CREATE UNIQUE INDEX IF NOT EXISTS idx_trades_one_running ON trades (stock) WHERE status = '{RUNNING}';"
+            "CREATE TABLE IF NOT EXISTS bracket_legs (client_order_id TEXT PRIMARY KEY, parent TEXT NOT NULL, coin TEXT NOT NULL, side TEXT NOT NULL, "
+            "role TEXT NOT NULL, price REAL NOT NULL, quantity REAL NOT NULL, status TEXT NOT NULL, order_id TEXT, filled REAL NOT NULL DEFAULT 0, "
+            "attempts INTEGER NOT NULL DEFAULT 0, error TEXT NOT NULL DEFAULT '', updated_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_legs_status ON bracket_legs (status);"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);"
+            "INSERT OR IGNORE INTO meta VALUES ('revision', 0);"
+        )
+        # Journals created before position sizing get the (nullable) quantity column; another process may add it first.
+        try:
+            if "qty" not in {r[1] for r in conn.execute("PRAGMA table_info(trades)")}: conn.execute("ALTER TABLE trades ADD COLUMN qty REAL")
+        except sqlite3.OperationalError: pass
+        _local.conn = conn
+        _migrate_csv(conn)
+    return conn
+
+def _migrate_csv(conn):
+    # One-off import of the old full-rewrite CSV files. Every connection of every process may get
+    # here, so the import runs under BEGIN IMMEDIATE and records a meta flag: only the first one
+    # imports. A file that fails to parse is left in place (and reported) rather than renamed away.
+    for file_name, is_active in ((ACTIVE_TRADES_FILE, True), (HISTORY_TRADES_FILE, False)):
+        if not os.path.exists(file_name): continue
+        import pandas as pd
+        try: rows = pd.read_csv(file_name).to_dict('records')
+        except FileNotFoundError: continue
+        except:
+            error("trade_store.migrate")
+            continue
+        flag = f"migrated:{file_name}"
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM meta WHERE key = ?", (flag,)).fetchone() is None:
+                for t in rows:
+                    if is_active:
+                        conn.execute("INSERT OR IGNORE INTO trades (opened_at, stock, signal, entry, sl, target, status) VALUES (?,?,?,?,?,?,?)",
+                                     (t['Date'], t['Stock'], t['Signal'], float(t['Entry']), float(t['SL']), float(t['Target']), RUNNING))
+                    else:
+                        conn.execute("INSERT INTO trades (opened_at, stock, signal, entry, sl, target, status, closed_at, exit, pnl_pct) VALUES (?,?,?,?,?,?,?,?,?,?)",
+                                     (t['Date'], t['Stock'], t['Signal'], float(t['Entry']), 0.0, 0.0, t['Status'], t['Date'], float(t['Exit']), float(t.get('P&L %', 0))))
+                conn.execute("INSERT INTO meta VALUES (?, 1)", (flag,))
+                if rows: _bump(conn)
+            conn.commit()
+        except:
+            conn.rollback()
+            error("trade_store.migrate")
+            continue
+        try: os.replace(file_name, f"{file_name}.migrated")
+        except FileNotFoundError: pass
+
+def _bump(conn):
+    conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'revision'")
+
+def ist_now_str():
+    return datetime.datetime.now(pytz.timezone('Asia/Kolkata')).strftime("%Y-%m-%d %H:%M")
+
+def _active_record(r):
+    return {"id": r['id'], "Date": r['opened_at'], "Stock": r['stock'], "Signal": r['signal'], "Entry": r['entry'], "SL": r['sl'], "Target": r['target'], "Status": r['status'], "Qty": r['qty']}
+
+def _history_record(r):
+    return {"id": r['id'], "Date": r['closed_at'], "Stock": r['stock'], "Signal": r['signal'], "Entry": r['entry'], "Exit": r['exit'], "Status": r['status'], "P&L %": r['pnl_pct']}
+
+def load_active_trades(stock=None):
+    if stock: rows = _conn().execute("SELECT * FROM trades WHERE stock=? AND status=? ORDER BY id", (stock, RUNNING)).fetchall()
+    else: rows = _conn().execute("SELECT * FROM trades WHERE status=? ORDER BY id", (RUNNING,)).fetchall()
+    return [_active_record(r) for r in rows]
+
+def load_trade_history(limit=None, stock=None):
+    sql, args = "SELECT * FROM trades WHERE status<>?", [RUNNING]
+    if stock:
+        sql += " AND stock=?"
+        args.append(stock)
+    sql += " ORDER BY closed_at DESC, id DESC"
+    if limit:
+        sql += " LIMIT ?"
+        args.append(limit)
+    return [_history_record(r) for r in _conn().execute(sql, args).fetchall()][::-1]
+
+def load_trade_history_page(page=0, size=25):
+    # Newest first, one page at a time, so the dashboard never holds the whole journal.
+    rows = _conn().execute("SELECT * FROM trades WHERE status<>? ORDER BY closed_at DESC, id DESC LIMIT ? OFFSET ?", (RUNNING, size, page * size)).fetchall()
+    return [_history_record(r) for r in rows]
+
+def count_trade_history():
+    return _conn().execute("SELECT COUNT(*) FROM trades WHERE status<>?", (RUNNING,)).fetchone()[0]
+
+def journal_revision():
+    # Bumped inside every write transaction, so it is the same number for every connection,
+    # process and app replica that shares this journal.
+    return _conn().execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0]
+
+def trade_state():
+    # (active, closed trade count) shared by every session in this process; reloaded only after a write.
+    revision = journal_revision()
+    with _state_lock:
+        if _state[0] != revision: _state[:] = [revision, load_active_trades(), count_trade_history(), {}]
+        return _state[1], _state[2]
+
+def trade_history_page(page, size):
+    # History pages ride on the same revision as trade_state(), so a write drops them all at once.
+    trade_state()
+    with _state_lock:
+        pages = _state[3]
+        if (page, size) not in pages: pages[(page, size)] = load_trade_history_page(page, size)
+        return pages[(page, size)]
+
+def journal_version():
+    # Changes whenever another connection (session or process) commits to the journal.
+    return _conn().execute("PRAGMA data_version").fetchone()[0]
+
+def open_trade(trade):
+    conn = _conn()
+    with conn:
+        cur = conn.execute("INSERT OR IGNORE INTO trades (opened_at, stock, signal, entry, sl, target, status, qty) VALUES (?,?,?,?,?,?,?,?)",
+                           (trade['Date'], trade['Stock'], trade['Signal'], float(trade['Entry']), float(trade['SL']), float(trade['Target']), RUNNING, trade.get('Qty')))
+        if cur.rowcount == 1: _bump(conn)
+    return cur.rowcount == 1
+
+def check_exit(trade, ltp):
+    if trade['Signal'] == 'BUY':
+        if ltp <= float(trade['SL']): return "🛑 SL HIT", float(trade['SL'])
+        elif ltp >= float(trade['Target']): return "🎯 TARGET HIT", float(trade['Target'])
+    elif trade['Signal'] == 'SHORT':
+        if ltp >= float(trade['SL']): return "🛑 SL HIT", float(trade['SL'])
+        elif ltp <= float(trade['Target']): return "🎯 TARGET HIT", float(trade['Target'])
+    return None, 0.0
+
+def close_trade(trade, exit_price, close_reason):
+    entry = float(trade['Entry'])
+    pnl_pct = round(((exit_price - entry) / entry) * 100 if trade['Signal'] == 'BUY' else ((entry - exit_price) / entry) * 100, 2)
+    closed_at = ist_now_str()
+    conn = _conn()
+    with conn:
+        # The status guard makes the close idempotent: whichever writer gets there first wins.
+        cur = conn.execute("UPDATE trades SET status=?, closed_at=?, exit=?, pnl_pct=? WHERE id=? AND status=?",
+                           (close_reason, closed_at, float(exit_price), pnl_pct, trade['id'], RUNNING))
+        if cur.rowcount == 1: _bump(conn)
+    if cur.rowcount != 1: return None
+    return {"id": trade['id'], "Date": closed_at, "Stock": trade['Stock'], "Signal": trade['Signal'], "Entry": entry, "Exit": float(exit_price), "Status": close_reason, "P&L %": pnl_pct}
+
+def clear_trades():
+    conn = _conn()
+    with conn:
+        conn.execute("DELETE FROM trades")
+        _bump(conn)
+
+def _leg_record(r):
+    return {"client_order_id": r['client_order_id'], "parent": r['parent'], "coin": r['coin'], "side": r['side'], "role": r['role'], "price": r['price'],
+            "quantity": r['quantity'], "status": r['status'], "id": r['order_id'], "filled": r['filled'], "attempts": r['attempts'], "error": r['error'],
+            "updated_at": r['updated_at']}
+
+def save_leg(leg):
+    # Upsert of a bracket exit leg. A leg some process already saw filled or cancelled is never reopened.
+    conn = _conn()
+    with conn:
+        conn.execute("INSERT INTO bracket_legs (client_order_id, parent, coin, side, role, price, quantity, status, order_id, filled, attempts, error, updated_at) "
+                     "VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?) ON CONFLICT(client_order_id) DO UPDATE SET quantity=excluded.quantity, status=excluded.status, "
+                     "order_id=excluded.order_id, filled=excluded.filled, attempts=excluded.attempts, error=excluded.error, updated_at=excluded.updated_at "
+                     "WHERE bracket_legs.status NOT IN ('filled', 'cancelled')",
+                     (leg['client_order_id'], leg['parent'], leg['coin'], leg['side'], leg['role'], float(leg['price']), float(leg['quantity']), leg['status'],
+                      leg['id'], float(leg['filled']), int(leg['attempts']), leg['error'], time.time()))
+
+def claim_leg(client_order_id, from_status, to_status):
+    # Guarded status change: of several processes acting on the same leg, exactly one gets True.
+    conn = _conn()
+    with conn:
+        cur = conn.execute("UPDATE bracket_legs SET status=?, updated_at=? WHERE client_order_id=? AND status=?", (to_status, time.time(), client_order_id, from_status))
+    return cur.rowcount == 1
+
+def load_legs(statuses=None, role=None, since=None):
+    sql, args = "SELECT * FROM bracket_legs WHERE 1=1", []
+    if statuses:
+        sql += f" AND status IN ({','.join('?' * len(statuses))})"
+        args += list(statuses)
+    if role:
+        sql += " AND role=?"
+        args.append(role)
+    if since:
+        sql += " AND updated_at>=?"
+        args.append(since)
+    return [_leg_record(r) for r in _conn().execute(sql + " ORDER BY updated_at", args).fetchall()]
+
+def leg_status(client_order_id):
+    row = _conn().execute("SELECT status FROM bracket_legs WHERE client_order_id=?", (client_order_id,)).fetchone()
+    return row[0] if row else None
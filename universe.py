@@ -0,0 +1,82 @@
+import os
+from urllib.parse import urlsplit
+import numpy as np
+from market_client import BINANCE_API_URL, COINDCX_API_URL, fetch_json
+from market_snapshot import fetch_binance_tickers
+from metrics import error, fallback
+from rate_limiter import DEFAULT_WEIGHT_LIMIT, ENDPOINT_WEIGHTS, SAFETY_MARGIN, WEIGHT_LIMITS
+from resampler import sync_requests
+from shared_cache import shared_cached
+
+# --- Scan Universe ---
+# Every USDT market trading on Binance or CoinDCX, from each exchange's market list (refreshed
+# hourly), cut down with one vectorized pass over the Binance 24hr ticker (quote volume in USDT):
+# enough volume to trade and enough movement to break out, ranked by both with pairs tradable on
+# CoinDCX first. Candles come from Binance, so only pairs listed there are scannable. A pass is
+# capped so its kline syncs, counted as cold (every base page the interval needs), use a fixed
+# share of the Binance request-weight budget.
+DISCOVERY_TTL = 3600
+TICKERS_TTL = 30
+MIN_QUOTE_VOLUME = float(os.environ.get("UNIVERSE_MIN_QUOTE_VOLUME", 250_000))
+MIN_MOVE_PCT = float(os.environ.get("UNIVERSE_MIN_MOVE_PCT", 1.0))
+WEIGHT_SHARE = float(os.environ.get("UNIVERSE_WEIGHT_SHARE", 0.5))
+UNIVERSE = "*"
+
+@shared_cached(ttl=DISCOVERY_TTL)
+def discover_markets():
+    # {coin: {"binance": bool, "coindcx": bool}}; raises (and so caches nothing) if neither exchange answered.
+    markets = {}
+    info = fetch_json(f"{BINANCE_API_URL}/api/v3/exchangeInfo", {"permissions": "SPOT"})
+    try:
+        for s in info["symbols"]:
+            if s.get("quoteAsset") == "USDT" and s.get("status") == "TRADING":
+                markets.setdefault(f"{s['baseAsset']}-USD", {"binance": False, "coindcx": False})["binance"] = True
+    except: error("universe.binance")
+    details = fetch_json(f"{COINDCX_API_URL}/exchange/v1/markets_details")
+    try:
+        for m in details:
+            if m.get("base_currency_short_name") == "USDT" and m.get("status") == "active":
+                markets.setdefault(f"{m['target_currency_short_name']}-USD", {"binance": False, "coindcx": False})["coindcx"] = True
+    except: error("universe.coindcx")
+    if not markets: raise RuntimeError("no exchange market list")
+    return markets
+
+def tradable_markets():
+    try: return discover_markets()
+    except:
+        fallback("universe.discovery")
+        return None
+
+@shared_cached(ttl=TICKERS_TTL)
+def binance_tickers():
+    tickers = fetch_binance_tickers()
+    if not tickers: raise RuntimeError("no Binance ticker")
+    return tickers
+
+def universe_tickers(fallback_tickers=None):
+    # The dashboard's ticker snapshot is CoinDCX-first, which would hide every Binance-only pair.
+    try: return binance_tickers()
+    except:
+        fallback("universe.tickers")
+        return fallback_tickers or {}
+
+def pass_capacity(every, interval, bars=100, share=WEIGHT_SHARE):
+    # Symbols one pass may sync cold at `interval` using `share` of the Binance weight budget over `every` seconds.
+    per_minute = WEIGHT_LIMITS.get(urlsplit(BINANCE_API_URL).netloc, DEFAULT_WEIGHT_LIMIT) * SAFETY_MARGIN
+    return max(1, int(per_minute * share * every / 60 / (ENDPOINT_WEIGHTS["/api/v3/klines"] * sync_requests(interval, bars))))
+
+def prefilter(tickers, markets=None, min_quote_volume=MIN_QUOTE_VOLUME, min_move_pct=MIN_MOVE_PCT):
+    # Survivors, CoinDCX-tradable first, then most liquid and most active. Candidates are the discovered
+    # Binance markets that have a ticker row; without a market list every ticker is a candidate.
+    coins = list(tickers) if markets is None else [c for c, m in markets.items() if m["binance"] and c in tickers]
+    if not coins: return []
+    ltp = np.array([tickers[c]["last_price"] for c in coins], dtype=float)
+    pct = np.array([tickers[c]["change_pct"] for c in coins], dtype=float)
+    high = np.array([tickers[c].get("high", 0.0) for c in coins], dtype=float)
+    volume = np.array([tickers[c].get("volume", 0.0) for c in coins], dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'): from_high = np.nan_to_num((high / ltp - 1) * 100, nan=0.0, posinf=0.0, neginf=0.0)
+    move = np.maximum(np.abs(pct), from_high)
+    idx = np.flatnonzero((ltp > 0) & (volume >= min_quote_volume) & (move >= min_move_pct))
+    dcx = np.array([markets is None or markets[c]["coindcx"] for c in coins])
+    idx = idx[np.lexsort((-(np.log1p(volume[idx]) * move[idx]), ~dcx[idx]))]
+    return [coins[i] for i in idx]
@@ -0,0 +1,10 @@
+# --- Dashboard Pages ---
+# app.py is only the entry point (page config, CSS, sidebar); each menu entry is a module here with
+# a render(ctx) function. A page module, and the heavy imports behind it (pandas, the scan and
+# backtest engines, the live stream), is imported the first time any session opens that page.
+PAGES = {
+    "📈 MAIN TERMINAL": "views.terminal",
+    "🧮 Futures Risk Calculator": "views.risk",
+    "📊 Backtest Engine": "views.backtest",
+    "⚙️ Scanner Settings": "views.settings",
+}
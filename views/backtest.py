@@ -0,0 +1,66 @@
+import streamlit as st
+from backtest import STRATEGIES, DEFAULT_FEE_PCT, DEFAULT_POSITION_PCT, run_backtest, per_symbol_stats
+from optimizer import DEFAULT_GRID, RANK_METRICS, expand_grid, parse_grid, sweep, walk_forward
+from scan_engine import DEFAULT_PARAMS
+
+# --- Backtest Engine ---
+def render(ctx):
+    ALL_CRYPTO = ctx["all_crypto"]
+    st.markdown("<div class='section-title'>📊 Backtest Engine</div>", unsafe_allow_html=True)
+    bt_col1, bt_col2, bt_col3, bt_col4 = st.columns([3, 2, 1, 1])
+    with bt_col1: bt_stocks = st.multiselect("Select Assets to Backtest:", sorted(ALL_CRYPTO), default=sorted(ALL_CRYPTO)[:1])
+    with bt_col2: bt_strategy = st.selectbox("Strategy:", list(STRATEGIES.keys()))
+    with bt_col3: bt_interval = st.selectbox("Candle Interval:", ["1m", "5m", "15m", "30m", "1h", "4h", "1d"], index=2)
+    with bt_col4: bt_days = st.selectbox("Lookback (Days):", [7, 30, 90, 180, 365, 730], index=1)
+
+    bt_params = dict(DEFAULT_PARAMS)
+    with st.expander("⚙️ Strategy Parameters & Costs"):
+        pc1, pc2, pc3, pc4, pc5, pc6 = st.columns(6)
+        bt_params["donchian"] = pc1.number_input("Donchian Bars", min_value=2, value=DEFAULT_PARAMS["donchian"])
+        bt_params["sl_lookback"] = pc2.number_input("SL Lookback", min_value=2, value=DEFAULT_PARAMS["sl_lookback"])
+        bt_params["rsi_len"] = pc3.number_input("RSI Length", min_value=2, value=DEFAULT_PARAMS["rsi_len"])
+        bt_params["reward"] = pc4.number_input("Reward (R)", min_value=0.5, value=DEFAULT_PARAMS["reward"], step=0.5)
+        bt_fee = pc5.number_input("Fee % per side", min_value=0.0, value=DEFAULT_FEE_PCT, step=0.01, format="%.3f")
+        bt_position = pc6.number_input("Position % of Equity", min_value=1.0, max_value=100.0, value=DEFAULT_POSITION_PCT)
+
+    if st.button("🚀 Run Backtest", use_container_width=True) and bt_stocks:
+        with st.spinner(f"Loading {bt_days}d of {bt_interval} candles for {len(bt_stocks)} assets..."):
+            bt_symbols = [c.replace('-USD', 'USDT') for c in bt_stocks]
+            bt_df, bt_stats, bt_curve, bt_missing = run_backtest(bt_symbols, bt_interval, bt_days, bt_strategy, bt_params, bt_fee, bt_position)
+        if bt_missing: st.warning(f"No Binance or yfinance history for: {', '.join(s.replace('USDT', '-USD') for s in bt_missing)}")
+        if not bt_df.empty:
+            bt_df['Stock'] = bt_df['Stock'].str.replace('USDT', '-USD')
+            m_cols = st.columns(5)
+            m_cols[0].metric("Total Trades", bt_stats["Total Trades"])
+            m_cols[1].metric("Win Rate", f"{bt_stats['Win Rate %']:.2f}%")
+            m_cols[2].metric("Total Strategy P&L %", f"{bt_stats['Total P&L %']:.2f}%", delta=f"{bt_stats['Total P&L %']:.2f}%")
+            m_cols[3].metric("Equity Return", f"{bt_stats['Equity Return %']:.2f}%")
+            m_cols[4].metric("Max Drawdown", f"{bt_stats['Max Drawdown %']:.2f}%")
+            st.caption(f"Avg Win {bt_stats['Avg Win %']}% · Avg Loss {bt_stats['Avg Loss %']}% · Profit Factor {bt_stats['Profit Factor']} · Avg Bars Held {bt_stats['Avg Bars Held']} · Fees {bt_fee}% per side")
+            ch1, ch2 = st.columns(2)
+            with ch1: st.line_chart(bt_curve["Equity"])
+            with ch2: st.area_chart(bt_curve["Drawdown %"])
+            st.dataframe(per_symbol_stats(bt_df), use_container_width=True)
+            st.dataframe(bt_df, use_container_width=True)
+        else: st.info(f"No valid setups found for the selected assets in the last {bt_days} days.")
+
+    st.markdown("<div class='section-title'>🧪 Parameter Optimizer (All CPU Cores)</div>", unsafe_allow_html=True)
+    with st.expander("Sweep or walk-forward the breakout parameters over the assets selected above"):
+        oc1, oc2, oc3, oc4 = st.columns(4)
+        opt_mode = oc1.radio("Mode:", ["Grid Sweep", "Walk-Forward"], horizontal=True)
+        opt_intervals = oc2.multiselect("Intervals:", ["1m", "5m", "15m", "30m", "1h", "4h", "1d"], default=[bt_interval])
+        opt_metric = oc3.selectbox("Rank By:", RANK_METRICS)
+        opt_folds = oc4.number_input("Walk-Forward Folds", min_value=2, max_value=12, value=4)
+        gc = st.columns(len(DEFAULT_GRID))
+        opt_grid_text = {k: gc[i].text_input(f"{k} values", ",".join(str(v) for v in DEFAULT_GRID[k])) for i, k in enumerate(DEFAULT_GRID)}
+        if st.button("🧪 Run Optimizer", use_container_width=True) and bt_stocks and opt_intervals:
+            opt_grid = parse_grid(opt_grid_text)
+            opt_symbols = [c.replace('-USD', 'USDT') for c in bt_stocks]
+            with st.spinner(f"Running {len(expand_grid(opt_grid))} parameter sets across {len(opt_symbols)} assets..."):
+                if opt_mode == "Grid Sweep":
+                    st.dataframe(sweep(opt_symbols, opt_intervals, bt_days, opt_grid, bt_fee, bt_position, opt_metric), use_container_width=True)
+                else:
+                    for opt_iv in opt_intervals:
+                        folds_df, oos = walk_forward(opt_symbols, opt_iv, bt_days, opt_grid, int(opt_folds), fee_pct=bt_fee, position_pct=bt_position, metric=opt_metric)
+                        st.markdown(f"**{opt_iv} out-of-sample:** {oos}")
+                        st.dataframe(folds_df, use_container_width=True)
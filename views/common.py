@@ -0,0 +1,18 @@
+# --- Universe ---
+# Watchlists and index assets shared by the entry point and every page. No heavy imports here:
+# app.py loads this on every rerun.
+CRYPTO_SECTORS = {
+    "COINDCX WATCHLIST": ["BTC-USD", "ETH-USD", "BNB-USD", "SOL-USD", "XRP-USD", "DOGE-USD", "ADA-USD", "AVAX-USD", "LINK-USD", "DOT-USD", "TRX-USD", "MATIC-USD", "ESP-USD", "SENT-USD", "PIPPIN-USD", "HMSTR-USD"]
+}
+
+INDEX_NAMES = ["BITCOIN", "ETHEREUM", "SOLANA", "BINANCE COIN", "RIPPLE", "DOGECOIN"]
+INDEX_ASSETS = ["BTC-USD", "ETH-USD", "SOL-USD", "BNB-USD", "XRP-USD", "DOGE-USD"]
+
+# Not a sector: selecting it scans every prefiltered USDT pair instead of a watchlist.
+UNIVERSE_SECTOR = "🌐 ALL USDT PAIRS (UNIVERSE SCAN)"
+
+BREADTH_MAX_AGE = 3600
+BASE_CRYPTO = sorted({coin for clist in CRYPTO_SECTORS.values() for coin in clist})
+
+def all_crypto(custom):
+    return list(set(BASE_CRYPTO + list(custom)))
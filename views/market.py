@@ -0,0 +1,48 @@
+import streamlit as st
+from execution import ExecutionClient
+from market_snapshot import MarketSnapshot, fetch_ticker_dict, fetch_yf_quotes
+from market_stream import MarketStream
+from metrics import cache_result
+from results_store import read_result
+from scan_worker import ScanWorker, TICKERS_EVERY
+from shared_cache import REFRESH_MIN_AGE, shared_cached
+from trade_monitor import monitor_owns_stops
+from views.common import BREADTH_MAX_AGE
+
+# --- Shared Market Resources ---
+# Process-wide singletons (live stream, scan worker, execution client) and the market snapshot,
+# shared by the terminal and settings pages.
+@shared_cached(ttl=15)
+def fetch_coindcx_api():
+    return fetch_ticker_dict()
+
+@st.cache_resource(show_spinner=False)
+def get_market_stream():
+    return MarketStream().start()
+
+@st.cache_resource(show_spinner=False)
+def get_scan_worker():
+    return ScanWorker().start()
+
+def build_market_snapshot(coins, fresh=False):
+    tickers = read_result("tickers", max_age=REFRESH_MIN_AGE if fresh else 2 * TICKERS_EVERY)
+    cache_result("results.tickers", "hit" if tickers else "miss")
+    tickers = tickers or fetch_coindcx_api()
+    stream = get_market_stream()
+    streamed = stream.table.snapshot()
+    # Streamed coins are ranked tick by tick; REST rows only fill in the ones the stream lacks.
+    stream.breadth.update_many({coin: t for coin, t in tickers.items() if coin not in streamed})
+    stream.breadth.prune(BREADTH_MAX_AGE)
+    snap = MarketSnapshot.build(tickers, streamed)
+    missing = snap.missing(coins)
+    return snap.merged(fetch_yf_quotes(missing)) if missing else snap
+
+@st.cache_resource(show_spinner=False)
+def get_execution_client():
+    # Secrets are read and the signing key prepared once per server process, not per order.
+    try: key, secret = st.secrets["DCX_KEY"], st.secrets["DCX_SECRET"]
+    except: return None
+    client = ExecutionClient(key, secret, price_fn=lambda coin: (get_market_stream().table.get_price(coin) or (None,))[0], owns_stops=lambda: not monitor_owns_stops())
+    # 🚨 BRACKET LEGS ARMED BEFORE A RESTART ARE PICKED UP AGAIN FROM THE TRADE JOURNAL 🚨
+    client.adopt_legs()
+    return client
@@ -0,0 +1,101 @@
+import time
+import numpy as np
+import streamlit as st
+from metrics import observe
+from portfolio_risk import DRAWDOWN_HORIZON, RETURNS_INTERVAL, liquidation_price, portfolio_book, risk_budget, save_risk_budget, size_signals
+from render import fmt_price
+from results_store import read_result
+from views.common import UNIVERSE_SECTOR
+
+# --- Futures Risk Calculator ---
+# A single hypothetical position on top, then the whole book of running trades evaluated against
+# the live snapshot, and the scanner's current signals sized to the same budget. The budget set
+# here is stored server-side: every session and the terminal's auto trades use the same one.
+BUDGET_FIELDS = [("capital", "Capital (USDT)", 10.0), ("risk_pct", "Risk % per Trade", 0.25), ("leverage", "Leverage (x)", 1.0),
+                 ("maint_pct", "Maintenance Margin %", 0.1), ("max_heat_pct", "Max Heat % (risk to stops)", 1.0), ("max_margin_pct", "Max Margin Use %", 5.0)]
+
+def portfolio_panel(budget, watchlist, sentiment, universe=False):
+    # 🚨 MARKET AND SCANNER MODULES LOAD HERE, SO THE CALCULATOR ABOVE NEVER WAITS ON THEM 🚨
+    from scan_worker import filter_signals
+    from views.market import build_market_snapshot
+    book = portfolio_book(budget).load_returns()
+    snapshot = build_market_snapshot(book.coins)
+    prices = np.array([snapshot.get(c)[0] for c in book.coins], dtype=float)
+    start = time.perf_counter()
+    state = book.evaluate(prices)
+    elapsed = time.perf_counter() - start
+    observe("stage_seconds", elapsed, stage="risk.evaluate")
+
+    st.markdown(f"<div class='section-title'>🛡️ PORTFOLIO RISK ({len(book.coins)} ACTIVE TRADES)</div>", unsafe_allow_html=True)
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Gross Exposure", f"${state['gross']:,.2f}", f"Net ${state['net']:,.2f}", delta_color="off")
+    m2.metric("Margin Used", f"${state['margin']:,.2f}", f"{state['margin_pct']:.1f}% of capital", delta_color="off")
+    m3.metric("Unrealised P&L", f"${state['pnl']:,.2f}")
+    m4.metric("Heat (loss to stops)", f"${state['heat']:,.2f}", f"{state['heat_pct']:.1f}% of capital", delta_color="off")
+    m5, m6, m7, m8 = st.columns(4)
+    m5.metric(f"Correlated DD (99%, {DRAWDOWN_HORIZON}×{RETURNS_INTERVAL})", f"${state['drawdown']:,.2f}", f"{state['drawdown_pct']:.1f}% of capital", delta_color="off")
+    m6.metric(f"Replay Max DD ({len(book.returns)} bars)", f"${state['replay_drawdown']:,.2f}")
+    m7.metric("Nearest Liquidation", "—" if state['min_liq_dist'] is None else f"{state['min_liq_dist']:.2f}% away")
+    m8.metric("Engine Time", f"{elapsed * 1e6:.0f} µs")
+    if book.coins:
+        st.dataframe(state["positions"], use_container_width=True, hide_index=True)
+        past_liq = [c for c, p in zip(book.coins, book.stop_after_liq) if p]
+        if past_liq: st.error("⚠️ Stop Loss sits beyond the liquidation price at this leverage: " + ", ".join(past_liq))
+        if book.no_history: st.caption("No candle history for the drawdown model: " + ", ".join(book.no_history))
+    else: st.info("No trades are currently active.")
+
+    # 🚨 SAME TIMEFRAME AS THE TERMINAL'S SIGNAL SCANNER 🚨
+    interval = st.session_state.get("signal_tf", "15m")
+    published = read_result(f"universe:{interval}" if universe else f"signals:{interval}")
+    st.markdown(f"<div class='section-title'>🎯 AUTO-SIZED SIGNALS ({interval})</div>", unsafe_allow_html=True)
+    signals = filter_signals(published["signals"], published["coins"] if universe else watchlist, sentiment) if published else []
+    if signals:
+        cols = ["Stock", "Signal", "Entry", "SL", "Target", "Qty", "Notional", "Margin", "Risk", "Liq", "SL Past Liq"]
+        sized = size_signals(signals, budget, state["heat"], state["margin"])
+        st.dataframe({c: [s[c] for s in sized] for c in cols}, use_container_width=True, hide_index=True)
+        st.caption("Signals are sized in scan order; a Qty of 0 means the heat or margin budget is already used up.")
+    else: st.info("⏳ No published scanner signals for this watchlist yet. Open the terminal to start the scanner.")
+
+def _save_budget_field(field):
+    save_risk_budget({**risk_budget(), field: float(st.session_state[f"rb_{field}"])})
+
+def render(ctx):
+    budget = risk_budget()
+    st.markdown("<div class='section-title'>🧮 Crypto Futures Risk Calculator</div>", unsafe_allow_html=True)
+    st.markdown("<div class='calc-box'>", unsafe_allow_html=True)
+    calc_col1, calc_col2, calc_col3, calc_col4 = st.columns(4)
+    with calc_col1:
+        trade_type = st.selectbox("Trade Direction", ["LONG (Buy)", "SHORT (Sell)"])
+        capital = st.number_input("Total Capital (USDT)", min_value=1.0, value=100.0, step=10.0)
+    with calc_col2:
+        entry_price = st.number_input("Entry Price (USDT)", min_value=0.000001, value=65000.0, step=10.0, format="%.6f")
+        leverage = st.slider("Leverage (x)", min_value=1, max_value=100, value=10)
+    with calc_col3:
+        stop_loss = st.number_input("Stop Loss (USDT)", min_value=0.000001, value=64000.0, step=10.0, format="%.6f")
+        risk_pct = st.number_input("Risk % per Trade", min_value=0.1, max_value=100.0, value=2.0, step=0.5)
+    with calc_col4:
+        st.write("")
+        st.write("")
+        if st.button("🚀 Calculate Risk", use_container_width=True):
+            price_diff = abs(entry_price - stop_loss)
+            if price_diff > 0:
+                risk_amt = capital * (risk_pct / 100)
+                pos_size_coin = risk_amt / price_diff
+                pos_size_usdt = pos_size_coin * entry_price
+                margin_required = pos_size_usdt / leverage
+                # 🚨 LIQUIDATION INCLUDES THE MAINTENANCE MARGIN FROM THE PORTFOLIO BUDGET BELOW 🚨
+                liq_price = float(liquidation_price(1 if trade_type == "LONG (Buy)" else -1, entry_price, leverage, budget["maint_pct"]))
+                st.success(f"**Margin Needed:** ${margin_required:.2f}")
+                st.info(f"**Position Size:** {fmt_price(pos_size_coin)} Coins (${pos_size_usdt:.2f})")
+                st.error(f"**Liquidation Price ⚠️:** ${fmt_price(liq_price)}")
+            else: st.warning("Entry and Stop Loss cannot be the same!")
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    with st.expander("💼 PORTFOLIO RISK BUDGET (also sizes the terminal's auto trades)"):
+        budget_cols = st.columns(len(BUDGET_FIELDS))
+        # 🚨 THE INPUTS SHOW THE SHARED BUDGET; ONLY AN EDIT WRITES IT BACK, SO A STALE TAB NEVER OVERWRITES ANOTHER'S 🚨
+        for col, (field, label, step) in zip(budget_cols, BUDGET_FIELDS):
+            st.session_state[f"rb_{field}"] = float(budget[field])
+            with col: st.number_input(label, min_value=step, step=step, key=f"rb_{field}", on_change=_save_budget_field, args=(field,))
+
+    st.fragment(portfolio_panel, run_every=ctx["refresh_secs"])(budget, ctx["watchlist"], ctx["sentiment"], ctx["sector"] == UNIVERSE_SECTOR)
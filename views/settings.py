@@ -0,0 +1,56 @@
+import datetime
+import pandas as pd
+import streamlit as st
+from market_client import throttle_stats
+from metrics import counters, hit_ratios, histograms, prometheus_text
+from results_store import result_ages
+from scan_worker import worker_status
+from shared_cache import backend_name
+from trade_monitor import monitor_alive, read_heartbeat
+from views.market import get_market_stream
+
+# --- Scanner Settings ---
+def render(ctx):
+    st.markdown("<div class='section-title'>⚙️ System Status</div>", unsafe_allow_html=True)
+    st.success("✅ Exclusive Crypto Terminal App \n\n ✅ Signal Timeframe Selector Activated \n\n ✅ Smart Quantity Entry Activated")
+    st.markdown("<div class='section-title'>🚦 Exchange Rate Limits</div>", unsafe_allow_html=True)
+    limit_stats = throttle_stats()
+    if limit_stats: st.dataframe(pd.DataFrame.from_dict(limit_stats, orient='index'), use_container_width=True)
+    else: st.info("No exchange requests made yet in this server process.")
+    st.markdown("<div class='section-title'>🛡️ Trade Monitor</div>", unsafe_allow_html=True)
+    beat = read_heartbeat()
+    if monitor_alive(): st.success(f"✅ trade_monitor.py running (pid {beat['pid']}): {beat['active']} active trades, {beat['ticks']} ticks checked, {beat['exits']} exits")
+    else: st.warning("⚠️ trade_monitor.py is not running. SL/Target exits are only checked when this dashboard reruns. Start it with `python trade_monitor.py`.")
+    st.markdown("<div class='section-title'>🧵 Scan Worker</div>", unsafe_allow_html=True)
+    worker_beat = worker_status()
+    if worker_beat: st.success(f"✅ Scan worker leading (pid {worker_beat['pid']}): {worker_beat['cycles']} cycles, {worker_beat['errors']} errors")
+    else: st.warning("⚠️ No scan worker heartbeat. The MAIN TERMINAL starts one in-process; run `python scan_worker.py` to keep results warm without an open tab.")
+    ages = result_ages()
+    if ages: st.dataframe(pd.DataFrame({"Age (s)": ages}), use_container_width=True)
+    st.caption(f"Shared cache backend: {backend_name()} · this session holds {len(st.session_state.cache_keys)} cached keys")
+    st.markdown("<div class='section-title'>📡 Live Stream</div>", unsafe_allow_html=True)
+    stream = get_market_stream()
+    st.dataframe(pd.DataFrame([{**stream.status, "last_message": datetime.datetime.fromtimestamp(stream.status["last_message"]).strftime('%H:%M:%S') if stream.status["last_message"] else "-", "live_prices": len(stream.table.snapshot()), "streams": len(stream.streams)}]), use_container_width=True)
+    st.markdown("<div class='section-title'>📈 Instrumentation (this server process)</div>", unsafe_allow_html=True)
+    ratios = hit_ratios()
+    im_c1, im_c2 = st.columns(2)
+    with im_c1:
+        st.markdown("**Endpoint latency**")
+        latency = histograms("http_request_seconds")
+        if latency: st.dataframe(pd.DataFrame(latency), use_container_width=True, hide_index=True)
+        else: st.info("No exchange requests made yet.")
+        st.markdown("**Cache hit ratio**")
+        if ratios: st.dataframe(pd.DataFrame([{"cache": c, "hits": h, "lookups": n, "hit %": round(100.0 * h / n, 1) if n else 0.0} for c, (h, n) in sorted(ratios.items())]), use_container_width=True, hide_index=True)
+        for title, name in (("HTTP errors", "http_errors_total"), ("Fallbacks", "fallback_total"), ("Swallowed errors", "errors_total")):
+            rows = counters(name)
+            if rows:
+                st.markdown(f"**{title}**")
+                st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    with im_c2:
+        for title, name in (("Stage timings", "stage_seconds"), ("Render timings", "render_seconds")):
+            rows = histograms(name)
+            if rows:
+                st.markdown(f"**{title}**")
+                st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    st.download_button("⬇️ Prometheus metrics", prometheus_text(), file_name="metrics.prom", mime="text/plain")
+    st.caption("Run `METRICS_PORT=9100 python scan_worker.py` (or trade_monitor.py) to expose the standalone processes on /metrics.")
@@ -0,0 +1,416 @@
+import time
+import uuid
+import numpy as np
+import pandas as pd
+import streamlit as st
+import streamlit.components.v1 as components
+from execution import STOP_LOSS, bracket_error, form_client_order_id, new_client_order_id
+from market_client import blocked_hosts
+from market_snapshot import calc_sector_perf
+from mdf_state import NEUTRAL_PHYSICS, calculate_mdf_physics, mdf_physics
+from metrics import Stopwatch, cache_result, error, fallback
+from portfolio_risk import portfolio_book, risk_budget, size_signals
+from rate_limiter import PRIORITY_INTERACTIVE
+from render import (HISTORY_PAGE_SIZE, active_html, adv_dec_html, buckets_html, fmt_price, history_html, indices_html, leaders_html, movers_html, panel,
+                    sectors_html, signals_html, trends_html)
+from resampler import BASE_INTERVAL, base_interval, resample_frame, sync_interval
+from results_store import read_result, track
+from scan_worker import SIGNALS_EVERY, TRENDS_EVERY, UNIVERSE_BUDGET, UNIVERSE_EVERY, crypto_trends, filter_signals, stream_signals
+from shared_cache import REFRESH_MIN_AGE, shared_cached
+from trade_monitor import monitor_alive
+from trade_store import load_active_trades, load_legs, open_trade, check_exit, close_trade, ist_now_str, trade_history_page, trade_state
+from universe import UNIVERSE
+from views.common import INDEX_ASSETS, INDEX_NAMES, UNIVERSE_SECTOR
+from views.market import build_market_snapshot, get_execution_client, get_market_stream, get_scan_worker
+from yf_provider import get_history
+
+# --- Main Terminal ---
+# Deep-analysis chart, quick trade and the live panels. Scans run in the background worker; this
+# page reads their published results and scans inline only on a cold start, streaming the table.
+def get_dynamic_momentum(ticker, interval_binance):
+    symbol = ticker.replace('-USD', 'USDT')
+    try: sync_interval([symbol], interval_binance, bars=60, priority=PRIORITY_INTERACTIVE)
+    except: error("momentum.sync")
+    try:
+        # The stream only carries base-interval candles; derived intervals preview their own forming bucket.
+        forming = None if interval_binance in BASE_INTERVAL else get_market_stream().table.get_candle(symbol, interval_binance)
+        physics = mdf_physics(symbol, interval_binance, forming)
+        if physics: return physics
+    except: error("momentum.mdf")
+    
+    fallback("yf.momentum")
+    try:
+        # yfinance has no 3m/4h bars: fetch the base interval and aggregate it the same way.
+        yf_map = {"1m": "1m", "3m": "1m", "5m": "5m", "15m": "15m", "30m": "30m", "1h": "1h", "4h": "1h", "1d": "1d"}
+        yf_int = yf_map.get(interval_binance, "1h")
+        period = "5d" if yf_int in ["1m", "5m", "15m", "30m"] else "1mo"
+        df = get_history(ticker, period, yf_int)
+        if yf_int != interval_binance: df = resample_frame(df, interval_binance)
+        if not df.empty and len(df) >= 20:
+            return calculate_mdf_physics(df)
+    except: error("momentum.yf")
+    
+    return NEUTRAL_PHYSICS
+
+def stream_live_signals(crypto_list, sentiment="BOTH", interval="15m", placeholder=None):
+    # 🚨 COLD START: THE TABLE FILLS AS EACH COIN FINISHES, AND EVERY PARTIAL RESULT IS PUBLISHED FOR OTHER SESSIONS 🚨
+    signals, pending, watched = [], list(crypto_list), set(crypto_list)
+    for result in stream_signals(crypto_list, interval):
+        signals, pending = filter_signals(result["signals"], crypto_list, sentiment), [c for c in result["pending"] if c in watched]
+        if placeholder is None: continue
+        with placeholder.container():
+            st.progress(1 - len(pending) / len(crypto_list) if crypto_list else 1.0, text=f"Scanned {len(crypto_list) - len(pending)}/{len(crypto_list)} coins · {len(signals)} signals so far")
+            if signals: st.markdown(signals_html(signals), unsafe_allow_html=True)
+    return signals, pending
+
+def get_live_signals(crypto_list, sentiment="BOTH", interval="15m", fresh=False, placeholder=None):
+    # Worker results when they are fresh and cover this watchlist (possibly mid-pass, with coins still
+    # pending); scan inline on a cold start. Returns (signals, pending coins).
+    track(crypto_list, interval)
+    published = read_result(f"signals:{interval}", max_age=REFRESH_MIN_AGE if fresh else 2 * SIGNALS_EVERY)
+    watched = set(crypto_list)
+    if published and watched <= set(published["coins"]):
+        cache_result("results.signals", "hit")
+        return filter_signals(published["signals"], crypto_list, sentiment), [c for c in published.get("pending", []) if c in watched]
+    cache_result("results.signals", "miss")
+    fallback("inline_scan")
+    return stream_live_signals(crypto_list, sentiment, interval, placeholder)
+
+def get_universe_signals(sentiment="BOTH", interval="15m"):
+    # The worker publishes after every shard, so each read shows whatever part of the pass is done.
+    track([UNIVERSE], interval)
+    published = read_result(f"universe:{interval}", max_age=2 * UNIVERSE_EVERY + UNIVERSE_BUDGET)
+    if published is None: return [], None
+    return filter_signals(published["signals"], published["coins"], sentiment), published
+
+def universe_status(published):
+    if published is None: return st.info("🌐 Universe scan queued: the scan worker starts it within a few seconds.")
+    total = published["scanned"] + published["queued"]
+    text = f"🌐 {published['survivors']} of {published['markets']} USDT pairs passed the volume/volatility filter · {published['scanned']}/{total} scanned in {published['seconds']}s"
+    if published["deferred"]: text += f" · {published['deferred']} left for the next pass (time budget)"
+    if published["capped"]: text += f" · {published['capped']} wait for a later pass (API weight budget)"
+    st.progress(published["scanned"] / total if total else 1.0, text=text + (" · scanning…" if published["running"] else ""))
+
+def _keep_signal_tf(options):
+    st.session_state.signal_tf = options[st.session_state.sig_tf_main_radio]
+
+def process_auto_trades(live_signals, snapshot):
+    current_time_str = ist_now_str()
+    active_stocks = [t['Stock'] for t in load_active_trades()]
+
+    triggered, skipped = [], []
+    for sig in live_signals:
+        if sig['Stock'] not in active_stocks:
+            is_triggered = False
+            if sig['Signal'] == 'BUY' and sig['LTP'] >= sig['Entry']: is_triggered = True
+            elif sig['Signal'] == 'SHORT' and sig['LTP'] <= sig['Entry']: is_triggered = True
+            if is_triggered: triggered.append(sig)
+
+    if triggered:
+        # 🚨 NEW TRADES ARE SIZED TO THE SHARED RISK BUDGET; ONCE ITS HEAT OR MARGIN IS USED UP NOTHING NEW OPENS 🚨
+        budget = risk_budget()
+        book = portfolio_book(budget)
+        state = book.evaluate(np.array([snapshot.get(c)[0] for c in book.coins], dtype=float))
+        heat, margin = state["heat"], state["margin"]
+        # Sized one at a time against what is left: only a trade the journal accepted uses up room.
+        for sig in triggered:
+            if sig['Stock'] in active_stocks: continue
+            sig = size_signals([sig], budget, heat, margin)[0]
+            if sig['Qty'] <= 0:
+                skipped.append(sig)
+                continue
+            new_trade = {"Date": current_time_str, "Stock": sig['Stock'], "Signal": sig['Signal'], "Entry": float(sig['Entry']), "SL": float(sig['SL']), "Target": float(sig['Target']), "Status": "RUNNING", "Qty": sig['Qty']}
+            try: opened = open_trade(new_trade)
+            except:
+                error("auto_trade.open")
+                opened = False
+            if opened:
+                active_stocks.append(sig['Stock'])
+                heat, margin = heat + sig['Risk'], margin + sig['Margin']
+
+    # 🚨 EXITS ARE OWNED BY trade_monitor.py WHEN IT IS RUNNING; THIS IS THE NO-MONITOR FALLBACK 🚨
+    if not monitor_alive():
+        for trade in load_active_trades():
+            ltp = snapshot.get(trade['Stock'])[0]
+            if ltp == 0.0: continue
+            close_reason, exit_price = check_exit(trade, ltp)
+            if close_reason: close_trade(trade, exit_price, close_reason)
+    return skipped
+
+@shared_cached(ttl=120)
+def get_crypto_trends(item_list):
+    return crypto_trends(item_list)
+
+def get_live_trends(item_list, fresh=False):
+    published = read_result("trends", max_age=REFRESH_MIN_AGE if fresh else 2 * TRENDS_EVERY) or {"coins": [], "trends": []}
+    covered = set(published["coins"])
+    missing = [t for t in item_list if t not in covered]
+    cache_result("results.trends", "hit", len(item_list) - len(missing))
+    cache_result("results.trends", "miss", len(missing))
+    wanted_set = set(item_list)
+    return [t for t in published["trends"] if t['Stock'] in wanted_set] + (get_crypto_trends(missing) if missing else [])
+
+# --- Live panels ---
+# Prices, signals, trades and movers render inside st.fragment, so an auto-refresh tick reruns only
+# these functions from a browser-side timer: no server thread sleeps between ticks, and the CSS,
+# sidebar and TradingView widget above them are left alone.
+ORDER_REFRESH_SECS = 2
+STOP_ALERT_WINDOW = 86400
+UNIVERSE_REFRESH_SECS = 10
+
+def order_tracker():
+    exec_client = get_execution_client()
+    tracked = exec_client.orders()
+    if tracked:
+        st.markdown("<div style='color:#00ffd0; font-weight:bold; font-size:12px; margin-top:8px;'>📋 ORDERS & BRACKETS</div>", unsafe_allow_html=True)
+        order_cols = {"client_order_id": "Order ID", "coin": "Coin", "role": "Leg", "side": "Side", "order_type": "Type", "quantity": "Qty", "price": "Price",
+                      "status": "Status", "filled": "Filled", "avg_price": "Avg Fill", "latency_ms": "RTT ms", "error": "Error"}
+        st.dataframe(pd.DataFrame(tracked)[list(order_cols)].rename(columns=order_cols), use_container_width=True, hide_index=True)
+        cancellable = [o["client_order_id"] for o in tracked if o["status"] in ("open", "partially_filled") and o["role"] in ("ENTRY", "TP")]
+        if cancellable:
+            oc1, oc2 = st.columns([3, 1])
+            with oc1: to_cancel = st.selectbox("Cancel order (an entry also cancels its bracket)", cancellable, label_visibility="collapsed")
+            with oc2:
+                if st.button("✖ CANCEL", use_container_width=True):
+                    exec_client.cancel(to_cancel)
+                    st.toast(f"Cancel sent for {to_cancel}")
+
+def live_dashboard(all_crypto, working_sectors, current_watchlist, selected_sector, user_sentiment):
+    # 🚨 RUNS AS A FRAGMENT: AUTO-REFRESH RERUNS ONLY THESE PANELS, NOT THE CSS, SIDEBAR OR CHART 🚨
+    clock = Stopwatch()
+    force_fresh = st.session_state.pop('force_fresh', False)
+    # 🚨 ONE MARKET SNAPSHOT PER REFRESH, EVERY PANEL BELOW READS FROM IT 🚨
+    snapshot = build_market_snapshot(all_crypto + INDEX_ASSETS + [t['Stock'] for t in trade_state()[0]], force_fresh)
+    clock.lap("snapshot")
+    # ------------------ REGULAR DASHBOARD ------------------
+    # 🚨 TIMEFRAME SELECTOR FOR SIGNAL DASHBOARD MOVED TO MAIN UI 🚨
+    st.markdown("<div style='background: rgba(12, 14, 28, 0.95); padding: 10px; border-radius: 5px; border: 1px solid #b0c4de; margin-bottom: 15px;'>", unsafe_allow_html=True)
+    sig_tf_options = {"1m": "1m", "3m": "3m", "5m": "5m", "15m": "15m", "30m": "30m", "1H": "1h", "1D": "1d"}
+    # 🚨 THE CHOICE LIVES IN A NON-WIDGET KEY: STREAMLIT DROPS THE RADIO'S STATE ON PAGES THAT DO NOT DRAW IT 🚨
+    st.session_state.setdefault("signal_tf", "15m")
+    sig_tf_index = list(sig_tf_options.values()).index(st.session_state.signal_tf)
+    selected_sig_tf = st.radio("⏳ **SELECT SIGNAL & SCANNER TIMEFRAME:**", list(sig_tf_options.keys()), horizontal=True, index=sig_tf_index, key="sig_tf_main_radio",
+                               on_change=_keep_signal_tf, args=(sig_tf_options,))
+    sig_interval = sig_tf_options[selected_sig_tf]
+    # 🚨 ONE KLINE SUBSCRIPTION PER SESSION PANEL: SWITCHING SECTOR OR TIMEFRAME DROPS THE OLD STREAMS 🚨
+    stream_owner = st.session_state.setdefault("stream_owner", uuid.uuid4().hex)
+    get_market_stream().subscribe_klines([c.replace('-USD', 'USDT') for c in current_watchlist], base_interval(sig_interval), owner=(stream_owner, "watchlist"))
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    universe, pending = selected_sector == UNIVERSE_SECTOR, []
+    scan_slot = st.empty()
+    with st.spinner(f"Scanning {selected_sig_tf} Trend Breakouts (MDF + Donchian)..."): 
+        if universe: live_signals, universe_pass = get_universe_signals(user_sentiment, sig_interval)
+        else: live_signals, pending = get_live_signals(current_watchlist, user_sentiment, sig_interval, force_fresh, scan_slot)
+    scan_slot.empty()
+    skipped = process_auto_trades(live_signals, snapshot)
+    if skipped: st.warning(f"⚠️ {len(skipped)} triggered signal(s) not opened, the risk budget's heat or margin is used up: " + ", ".join(f"{s['Signal']} {s['Stock']}" for s in skipped))
+    active_trades, history_total = trade_state()
+    clock.lap("signals")
+    # 🚨 A STOP LOSS THE EXCHANGE KEPT REJECTING LEAVES A LIVE POSITION UNPROTECTED: SHOUT ABOUT IT 🚨
+    for leg in load_legs(["rejected"], role=STOP_LOSS, since=time.time() - STOP_ALERT_WINDOW):
+        st.error(f"🚨 STOP LOSS NOT PLACED: {leg['side']} {fmt_price(leg['quantity'])} {leg['coin']} @ {fmt_price(leg['price'])} ({leg['client_order_id']}). {leg['error']}. Close the position manually.")
+    throttled = blocked_hosts()
+    if throttled: st.warning("⚠️ Exchange rate limit hit, scans are paced and may show last stored bars: " + ", ".join(f"{h} ({s}s)" for h, s in throttled.items()))
+
+    breadth = get_market_stream().breadth
+    adv, dec, _ = breadth.advance_decline()
+    gainers, losers = breadth.gainers(5), breadth.losers(5)
+    trend_scan_list = list(set([s['Stock'] for s in live_signals] + current_watchlist + [g['Stock'] for g in gainers] + [l['Stock'] for l in losers]))
+    trends = get_live_trends(trend_scan_list, force_fresh)
+
+    important_assets = list(set([s['Stock'] for s in live_signals] + [g['Stock'] for g in gainers] + [l['Stock'] for l in losers] + current_watchlist))
+    filtered_trends = [t for t in trends if t['Stock'] in important_assets]
+    clock.lap("trends")
+
+    col1, col2, col3 = st.columns([1.25, 2.5, 1.25])
+
+    with col1:
+        st.markdown("<div class='section-title'>📊 SECTOR PERFORMANCE</div>", unsafe_allow_html=True)
+        with st.spinner("Fetching Sectors..."): real_sectors = calc_sector_perf(working_sectors, snapshot)
+        if real_sectors: st.markdown(panel("sectors", sectors_html, real_sectors), unsafe_allow_html=True)
+
+        st.markdown("<div class='section-title'>🔍 TREND CONTINUITY (CRYPTO)</div>", unsafe_allow_html=True)
+        if filtered_trends: st.markdown(panel("trends", trends_html, filtered_trends), unsafe_allow_html=True)
+        else: st.markdown("<p style='font-size:12px;text-align:center; color:#888;'>No 3-day trend found in active list.</p>", unsafe_allow_html=True)
+        clock.lap("sectors_panel")
+
+    with col2:
+        st.markdown("<div class='section-title'>📉 CRYPTO INDICES (LIVE)</div>", unsafe_allow_html=True)
+        indices = [(name, ticker, *snapshot.get(ticker)) for name, ticker in zip(INDEX_NAMES, INDEX_ASSETS)]
+        st.markdown(panel("indices", indices_html, indices), unsafe_allow_html=True)
+
+        st.markdown(f"<div class='section-title'>📊 ADVANCE/ DECLINE (CRYPTO {len(breadth)})</div>", unsafe_allow_html=True)
+        st.markdown(panel("adv_dec", adv_dec_html, adv, dec), unsafe_allow_html=True)
+
+        st.markdown(f"<div class='section-title'>🎯 LIVE SIGNALS: {selected_sector} ({selected_sig_tf} MDF + DONCHIAN)</div>", unsafe_allow_html=True)
+        if universe: universe_status(universe_pass)
+        if pending: st.caption(f"⏳ Still scanning {len(pending)} of {len(current_watchlist)} coins (candles not in yet): " + ", ".join(pending[:10]) + (" …" if len(pending) > 10 else ""))
+        if len(live_signals) > 0: st.markdown(panel("signals", signals_html, live_signals), unsafe_allow_html=True)
+        else: st.info(f"⏳ No trend breakouts matching MDF Phase on {selected_sig_tf} chart right now.")
+
+        st.markdown("<div class='section-title'>⏳ ACTIVE TRADES</div>", unsafe_allow_html=True)
+        if len(active_trades) > 0: st.markdown(panel("active", active_html, active_trades, [snapshot.get(t['Stock'])[0] for t in active_trades]), unsafe_allow_html=True)
+        else: st.info("No trades are currently active.")
+
+        st.markdown("<div class='section-title'>📚 AUTO TRADE HISTORY</div>", unsafe_allow_html=True)
+        if history_total > 0:
+            # 🚨 ONE PAGE OF THE JOURNAL PER RENDER, NEWEST FIRST, HOWEVER LONG THE HISTORY GROWS 🚨
+            pages = -(-history_total // HISTORY_PAGE_SIZE)
+            if st.session_state.get("hist_page", 1) > pages: st.session_state.hist_page = pages
+            hp1, hp2 = st.columns([1, 3])
+            with hp1: hist_page = st.number_input("History page", min_value=1, max_value=pages, value=1, step=1, key="hist_page", label_visibility="collapsed")
+            with hp2: st.caption(f"Page {hist_page} of {pages} · {history_total} closed trades, newest first")
+            st.markdown(panel("history", history_html, trade_history_page(hist_page - 1, HISTORY_PAGE_SIZE)), unsafe_allow_html=True)
+        else: st.info("No closed trades yet.")
+        clock.lap("signals_panel")
+
+    with col3:
+        st.markdown("<div class='section-title'>🚀 LIVE TOP GAINERS</div>", unsafe_allow_html=True)
+        if gainers: st.markdown(panel("gainers", movers_html, gainers), unsafe_allow_html=True)
+
+        st.markdown("<div class='section-title'>🔻 LIVE TOP LOSERS</div>", unsafe_allow_html=True)
+        if losers: st.markdown(panel("losers", movers_html, losers), unsafe_allow_html=True)
+
+        st.markdown("<div class='section-title'>📶 MARKET BREADTH</div>", unsafe_allow_html=True)
+        st.markdown(panel("buckets", buckets_html, breadth.buckets()), unsafe_allow_html=True)
+        for title, rows in (("💰 Volume Leaders", breadth.volume_leaders(5)), (f"🔝 At 24h High ({len(breadth.at_high)})", breadth.new_highs(5))):
+            if rows: st.markdown(panel("leaders", leaders_html, title, rows), unsafe_allow_html=True)
+        clock.lap("movers_panel")
+
+def render(ctx):
+    ALL_CRYPTO, render_clock = ctx["all_crypto"], ctx["clock"]
+    # 🚨 SCANS RUN IN THE BACKGROUND WORKER; THIS PAGE ONLY READS PUBLISHED RESULTS 🚨
+    get_scan_worker()
+
+    # 🚨 CLICK-TO-OPEN DEEP ANALYSIS CHART & ONE-CLICK EXECUTION 🚨
+    clicked_coin = st.query_params.get("coin")
+    if clicked_coin and clicked_coin in ALL_CRYPTO:
+        st.markdown(f"<div class='section-title' style='background: linear-gradient(90deg, #1e3c72 0%, #2a5298 100%); color: white; border-left: 5px solid #00ffd0;'>🔬 DEEP ANALYSIS & QUICK TRADE: {clicked_coin}</div>", unsafe_allow_html=True)
+        
+        da_c1, da_c2 = st.columns([1, 3])
+        with da_c1:
+            if st.button("❌ CLOSE CHART & RETURN", use_container_width=True, type="primary"):
+                get_market_stream().subscribe_klines([], "1m", owner=(st.session_state.get("stream_owner"), "chart"))
+                st.query_params.clear()
+                st.rerun()
+        with da_c2:
+            tf_options_chart = {"1m": ("1", "1m"), "5m": ("5", "5m"), "15m": ("15", "15m"), "1H": ("60", "1h"), "4H": ("240", "4h"), "1D": ("D", "1d")}
+            selected_chart_tf = st.radio("Chart Timeframe:", list(tf_options_chart.keys()), horizontal=True, index=2, key="tf_select_radio", label_visibility="collapsed")
+            tv_interval, binance_interval = tf_options_chart[selected_chart_tf]
+            get_market_stream().subscribe_klines([clicked_coin.replace('-USD', 'USDT')], base_interval(binance_interval), owner=(st.session_state.setdefault("stream_owner", uuid.uuid4().hex), "chart"))
+        
+        tv_symbol = f"BINANCE:{clicked_coin.replace('-USD', 'USDT')}"
+        col_chart, col_dash = st.columns([3, 1])
+
+        with col_chart:
+            tv_widget = f"""
+            <div class="tradingview-widget-container" style="height:500px;width:100%">
+              <div id="tradingview_dynamic" style="height:100%;width:100%"></div>
+              <script type="text/javascript" src="https://s3.tradingview.com/tv.js"></script>
+              <script type="text/javascript">
+              new TradingView.widget({{
+                "autosize": true,
+                "symbol": "{tv_symbol}",
+                "interval": "{tv_interval}",
+                "timezone": "Asia/Kolkata",
+                "theme": "dark",
+                "style": "1",
+                "locale": "en",
+                "enable_publishing": false,
+                "backgroundColor": "#0E1117",
+                "gridColor": "#1f293d",
+                "hide_top_toolbar": false,
+                "hide_legend": false,
+                "save_image": false,
+                "container_id": "tradingview_dynamic"
+              }});
+              </script>
+            </div>
+            """
+            components.html(tv_widget, height=500)
+
+        with col_dash:
+            with st.spinner("Analyzing Physics..."):
+                energy_pct, phase, e0, half_life, elp_bars, decay_eta, impulses, exhaustions, divergences = get_dynamic_momentum(clicked_coin, binance_interval)
+                
+                phase_color = "mdf-cyan" if phase == "BULL" else "mdf-orange"
+                filled_bars = int((energy_pct / 100.0) * 10)
+                energy_bar = "█" * filled_bars + "░" * (10 - filled_bars)
+                
+                e0_cls = "Extreme" if e0 > 3.5 else "Strong" if e0 > 2.5 else "Moderate" if e0 > 1.5 else "Light"
+                eta_blocks = int(min(decay_eta / 10.0, 1.0) * 8) if decay_eta > 0 else 0
+                eta_vis = "▮" * eta_blocks + "▯" * (8 - eta_blocks)
+                
+                spark = ""
+                for k in range(20):
+                    t = (k / 19.0) * (max(half_life, 1.0) * 3.0)
+                    s_e = e0 * np.exp(-(np.log(2)/max(half_life, 1.0)) * t)
+                    s_n = s_e / max(e0, 0.001) 
+                    spark += "▇" if s_n > 0.85 else "▆" if s_n > 0.7 else "▅" if s_n > 0.55 else "▄" if s_n > 0.4 else "▃" if s_n > 0.25 else "▂" if s_n > 0.1 else "▁" if s_n > 0.02 else "·"
+                
+                energy_color = 'rgb(65,195,115)' if phase == 'BULL' else 'rgb(255,130,40)'
+
+                mdf_dashboard = f"""
+                <table class="mdf-table">
+                    <colgroup><col width="30%"/><col width="45%"/><col width="25%"/></colgroup>
+                    <tr><td colspan="3" class="mdf-header">MOMENTUM DECAY FIELD</td></tr>
+                    <tr><td class="mdf-label">ENERGY</td><td class="mdf-value" style="color: {energy_color}">{energy_bar}</td><td class="mdf-right mdf-value" style="color: {energy_color}">{energy_pct}%</td></tr>
+                    <tr><td class="mdf-label">PHASE</td><td class="mdf-value" style="color: {energy_color}">CHARGED</td><td class="mdf-right {phase_color}">{phase}</td></tr>
+                    <tr><td class="mdf-label">E0 INITIAL</td><td class="mdf-white">{e0:.2f}</td><td class="mdf-right mdf-cyan">{e0_cls}</td></tr>
+                    <tr><td class="mdf-label">HALF-LIFE</td><td class="mdf-white">{half_life} bars</td><td class="mdf-right mdf-label">ELP {elp_bars}</td></tr>
+                    <tr><td class="mdf-label">ETA TO EXH</td><td class="mdf-orange">{decay_eta} bars</td><td class="mdf-right mdf-orange" style="font-size:10px;">{eta_vis}</td></tr>
+                    <tr><td class="mdf-label">DECAY CURVE</td><td class="mdf-value" style="font-size:10px; letter-spacing: -1px; color:{energy_color}">{spark}</td><td class="mdf-right mdf-label">NOW >></td></tr>
+                    <tr><td class="mdf-label" style="text-align:center !important;">IMPULSES</td><td class="mdf-label" style="text-align:center !important;">EXHAUSTIONS</td><td class="mdf-label" style="text-align:center !important;">DIVERGENCES</td></tr>
+                    <tr><td class="mdf-white">{impulses}</td><td style="color:rgb(255, 195, 0);">{exhaustions}</td><td style="color:rgb(255, 120, 0);">{divergences}</td></tr>
+                </table>
+                """
+                st.markdown(mdf_dashboard, unsafe_allow_html=True)
+
+            st.markdown("<div style='background: rgba(12, 14, 28, 0.95); padding: 10px; border-radius: 5px; border: 2px solid #00ffd0; margin-top: 15px;'>", unsafe_allow_html=True)
+            st.markdown(f"<div style='color:#00ffd0; font-weight:bold; font-size:13px; text-align:center; margin-bottom:8px;'>⚡ INSTANT ORDER: {clicked_coin}</div>", unsafe_allow_html=True)
+            
+            live_price = build_market_snapshot([clicked_coin]).get(clicked_coin)[0]
+            if live_price == 0: live_price = 10.0 
+            
+            with st.form("quick_trade_form"):
+                tc1, tc2, tc3 = st.columns(3)
+                with tc1:
+                    t_side = st.selectbox("Action", ["BUY", "SELL"])
+                    t_type = st.selectbox("Type", ["limit_order", "market_order"])
+                with tc2:
+                    t_price = st.number_input("Entry Price (USDT)", value=float(live_price), format="%.6f")
+                    # 🚨 EXPLICIT QUANTITY INPUT RESTORED 🚨
+                    t_qty = st.number_input("Quantity (Coins)", value=1.0, min_value=0.000001, format="%.6f")
+                with tc3:
+                    t_sl = st.number_input("Stop Loss (USDT)", value=float(live_price * 0.99), format="%.6f")
+                    t_tp = st.number_input("Take Profit (USDT)", value=float(live_price * 1.03), format="%.6f")
+                
+                trade_btn = st.form_submit_button("🚀 PLACE ORDER", use_container_width=True)
+                if trade_btn:
+                    exec_client = get_execution_client()
+                    if t_qty <= 0: st.error("Amount must be greater than 0")
+                    elif t_type == "limit_order" and t_price <= 0: st.error("Enter valid Price")
+                    elif bracket_error(t_side, t_price, t_sl, t_tp): st.error(bracket_error(t_side, t_price, t_sl, t_tp))
+                    elif exec_client is None: st.error("❌ Failed: API Keys not found in Streamlit Secrets.")
+                    else:
+                        # 🚨 THE CLIENT ORDER ID IS THE FORM CONTENTS PLUS A NONCE: A REPEATED SUBMIT OF THE SAME FORM NEVER REACHES THE EXCHANGE TWICE 🚨
+                        # The nonce only moves on once the exchange has answered the last order, so the same order can then be placed again on purpose.
+                        last = exec_client.order(st.session_state.get("order_coid", ""))
+                        if "order_nonce" not in st.session_state or (last and last["status"] != "pending"): st.session_state.order_nonce = new_client_order_id()
+                        coid = form_client_order_id(st.session_state.order_nonce, clicked_coin, t_side, t_type, t_price, t_qty, t_sl, t_tp)
+                        order = exec_client.submit(clicked_coin, t_side, t_type, t_price, t_qty, sl=t_sl, tp=t_tp, client_order_id=coid)
+                        st.session_state.order_coid = coid
+                        st.success(f"📨 Order {order['client_order_id']} sent: {t_side} {t_qty:.4f} {clicked_coin}. SL {t_sl} / TP {t_tp} bracket goes live on fill.")
+
+            # 🚨 FILLS AND BRACKET LEGS UPDATE ON THEIR OWN TIMER, THE CHART AND FORM STAY PUT 🚨
+            if get_execution_client() and get_execution_client().orders(): st.fragment(order_tracker, run_every=ORDER_REFRESH_SECS)()
+            st.markdown("</div>", unsafe_allow_html=True)
+            
+        st.markdown("<hr style='border: 2px solid #00ffd0; margin-top: 5px; margin-bottom: 20px;'>", unsafe_allow_html=True)
+
+
+    render_clock.lap("deep_analysis")
+    # 🚨 A UNIVERSE PASS STREAMS IN SHARD BY SHARD, SO ITS TABLE REFRESHES EVEN WITH AUTO-REFRESH OFF 🚨
+    run_every = ctx["refresh_secs"] or (UNIVERSE_REFRESH_SECS if ctx["sector"] == UNIVERSE_SECTOR else None)
+    st.fragment(live_dashboard, run_every=run_every)(ALL_CRYPTO, ctx["sectors"], ctx["watchlist"], ctx["sector"], ctx["sentiment"])
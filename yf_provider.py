@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+import pandas as pd
+from metrics import cache_result, error, stage
+
+# --- Batched yfinance Fallback ---
+# Coins Binance does not list (and anything else the exchanges cannot serve) are pulled from
+# yfinance here, never one Ticker at a time: every missing ticker of a (period, interval) goes
+# into one multi-ticker yf.download. Results, including "no data" answers, are kept in memory
+# and in a small SQLite cache so all consumers and sessions share them until they expire. A chunk
+# whose download fails is not cached as "no data": its tickers come back empty, and only after
+# YF_RETRY_AFTER seconds are they asked again, so an outage does not turn every rerun into a download.
+YF_CACHE_FILE = os.environ.get("YF_CACHE_FILE", "crypto_yf_cache.db")
+YF_BATCH_SIZE = 100
+YF_MAX_AGE = {"1m": 60, "2m": 60, "5m": 120, "15m": 300, "30m": 300, "60m": 600, "1h": 600, "1d": 900}
+DEFAULT_YF_MAX_AGE = 300
+YF_RETRY_AFTER = 45
+YF_COLUMNS = ['Open time', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+_local = threading.local()
+_mem_lock = threading.Lock()
+_fetch_lock = threading.Lock()
+_mem = {}
+_failed = {}
+
+def _conn():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(YF_CACHE_FILE, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS yf_cache (ticker TEXT NOT NULL, period TEXT NOT NULL, interval TEXT NOT NULL, "
+            "fetched_at REAL NOT NULL, data BLOB NOT NULL, PRIMARY KEY (ticker, period, interval)) WITHOUT ROWID"
+        )
+        _local.conn = conn
+    return conn
+
+def _frame(arr):
+    df = pd.DataFrame(arr, columns=YF_COLUMNS)
+    return df.astype({'Open time': 'int64'})
+
+def _to_array(df):
+    df = df.dropna(subset=['Close'])
+    if df.empty: return np.empty((0, len(YF_COLUMNS)))
+    idx = pd.DatetimeIndex(df.index)
+    idx = idx.tz_convert("UTC").tz_localize(None) if idx.tz is not None else idx
+    open_ms = (idx - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)
+    return np.column_stack([np.asarray(open_ms, dtype=float)] + [df[c].to_numpy(dtype=float) for c in YF_COLUMNS[1:]])
+
+def _download(tickers, period, interval):
+    # Only tickers whose answer was parsed are returned; yfinance or network failures leave theirs out.
+    # yfinance (and its bs4/requests stack) is imported on the first fallback, not at app start.
+    import yfinance as yf
+    out = {}
+    for i in range(0, len(tickers), YF_BATCH_SIZE):
+        chunk = tickers[i:i + YF_BATCH_SIZE]
+        try:
+            with stage("yf.download"): df = yf.download(chunk, period=period, interval=interval, group_by="ticker", progress=False, threads=True, auto_adjust=True)
+        except:
+            error("yf.download")
+            continue
+        if df is None or df.empty: continue
+        for t in chunk:
+            try: out[t] = _to_array(df[t] if isinstance(df.columns, pd.MultiIndex) else df)
+            except: error("yf.parse")
+    return out
+
+def _read_disk(tickers, period, interval, min_ts):
+    found = {}
+    for i in range(0, len(tickers), 500):
+        chunk = tickers[i:i + 500]
+        rows = _conn().execute(
+            f"SELECT ticker, fetched_at, data FROM yf_cache WHERE period=? AND interval=? AND fetched_at>=? AND ticker IN ({','.join('?' * len(chunk))})",
+            [period, interval, min_ts, *chunk]
+        ).fetchall()
+        for t, fetched_at, data in rows: found[t] = (fetched_at, np.frombuffer(data, dtype=float).reshape(-1, len(YF_COLUMNS)))
+    return found
+
+def _write_disk(results, period, interval, fetched_at):
+    conn = _conn()
+    conn.executemany("INSERT OR REPLACE INTO yf_cache VALUES (?,?,?,?,?)", [(t, period, interval, fetched_at, arr.astype(float).tobytes()) for t, arr in results.items()])
+    conn.commit()
+
+def get_history_arrays(tickers, period="5d", interval="1d", max_age=None):
+    # {ticker: (n x 6) array of open_time ms + OHLCV}; tickers without data map to an empty array.
+    max_age = YF_MAX_AGE.get(interval, DEFAULT_YF_MAX_AGE) if max_age is None else max_age
+    tickers = list(dict.fromkeys(tickers))
+    empty = np.empty((0, len(YF_COLUMNS)))
+    now = time.time()
+    result, missing = {}, []
+    with _mem_lock:
+        for t in tickers:
+            hit = _mem.get((t, period, interval))
+            if hit and now - hit[0] < max_age: result[t] = hit[1]
+            elif now - _failed.get((t, period, interval), 0.0) < YF_RETRY_AFTER: result[t] = empty
+            else: missing.append(t)
+    cache_result("yf", "memory", len(result))
+    if not missing: return result
+
+    with _fetch_lock:
+        # Another session may have fetched (or failed to) while we waited: check memory and disk again first.
+        with _mem_lock:
+            now = time.time()
+            for t in missing:
+                hit = _mem.get((t, period, interval))
+                if hit and now - hit[0] < max_age: result[t] = hit[1]
+                elif now - _failed.get((t, period, interval), 0.0) < YF_RETRY_AFTER: result[t] = empty
+        missing = [t for t in missing if t not in result]
+        disk = _read_disk(missing, period, interval, time.time() - max_age) if missing else {}
+        fetch = [t for t in missing if t not in disk]
+        cache_result("yf", "disk", len(disk))
+        cache_result("yf", "fetch", len(fetch))
+        fresh = _download(fetch, period, interval) if fetch else {}
+        fetched_at = time.time()
+        if fresh: _write_disk(fresh, period, interval, fetched_at)
+        failed = [t for t in fetch if t not in fresh]
+        with _mem_lock:
+            for t, (ts, arr) in disk.items(): _mem[(t, period, interval)] = (ts, arr)
+            for t, arr in fresh.items():
+                _mem[(t, period, interval)] = (fetched_at, arr)
+                _failed.pop((t, period, interval), None)
+            for t in failed: _failed[(t, period, interval)] = fetched_at
+    result.update({t: arr for t, (_, arr) in disk.items()})
+    result.update(fresh)
+    # Failed downloads: empty for this caller and for anyone asking within YF_RETRY_AFTER, never cached as "no data".
+    result.update(dict.fromkeys(failed, empty))
+    return result
+
+def get_history_many(tickers, period="5d", interval="1d", max_age=None):
+    return {t: _frame(arr) for t, arr in get_history_arrays(tickers, period, interval, max_age).items()}
+
+def get_history(ticker, period="5d", interval="1d", max_age=None):
+    return get_history_many([ticker], period, interval, max_age)[ticker]